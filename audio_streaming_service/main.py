@@ -1,7 +1,9 @@
 import asyncio
+from prometheus_client import start_http_server
 from src.infrastructure.grpc.server import serve_grpc
 from src.core.di import Container
 from src.core.logger import logger
+from src.core.config import settings
 from functools import wraps
 
 def di_raii(main_func):
@@ -33,6 +35,7 @@ def di_raii(main_func):
 async def main():
     container = Container()
     container.wire(modules=["src.infrastructure.grpc.server"])
+    start_http_server(settings.METRICS_PORT)
     
     await asyncio.gather(
         serve_grpc(),
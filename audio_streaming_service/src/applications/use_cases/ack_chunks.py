@@ -1,18 +1,31 @@
+from typing import Optional
+
 from src.core.logger import logger
 
 from src.domain.events.publisher import EventPublisher
 from src.domain.events.events import ChunksAckEvent
 from src.domain.stream.models import StreamSession
+from src.domain.stream.repository import StreamingRepository
 
 class AcknowledgeChunksUseCase:
     def __init__(
         self,
         event_publisher: EventPublisher,
+        session_repo: StreamingRepository,
     ):
         self._event_publisher = event_publisher
+        self._session_repo = session_repo
 
-    async def execute(self, received_count: int, session: StreamSession) -> None:
+    async def execute(self, received_count: int, session: StreamSession, last_chunk: Optional[int] = None) -> None:
         logger.info(f"in session {session.session_id} acknowledged {received_count} chunks")
+        session.pacer.on_ack(received_count * session.chunk_size)
+        session.credits.release(received_count)
+
+        if last_chunk is not None and last_chunk != session.last_acked_chunk:
+            # Точка возобновления при переподключении; запись схлопывается чекпоинтером
+            session.last_acked_chunk = last_chunk
+            await self._session_repo.save(session)
+
         await self._event_publisher.publish(
             event=ChunksAckEvent(
                 session_id=session.session_id,
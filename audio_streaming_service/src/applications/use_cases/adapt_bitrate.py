@@ -0,0 +1,53 @@
+from typing import Optional
+
+from src.core.logger import logger
+from src.core.monitoring.metrics import ABR_SWITCHES, ABR_SELECTED_BITRATE
+
+from src.applications.use_cases.control_session import ChangeSessionBitrateUseCase
+from src.domain.stream.models import StreamSession
+
+
+class AdaptBitrateUseCase:
+    """Автоматическая смена битрейта по измерениям из ChunkAck"""
+
+    def __init__(
+        self,
+        change_bitrate_use_case: ChangeSessionBitrateUseCase,
+    ):
+        self._change_bitrate_use_case = change_bitrate_use_case
+
+    async def execute(
+        self,
+        session: StreamSession,
+        queue_depth: Optional[int] = None,
+        send_latency_ms: Optional[float] = None,
+    ) -> bool:
+        """
+        :param queue_depth: чанков в очереди гейтвея
+        :param send_latency_ms: задержка отправки в вебсокет
+        :return: True, если битрейт переключён
+        """
+        if session.abr is None:
+            return False
+
+        old_bitrate = session.current_bitrate
+        target = session.abr.observe(
+            current_bitrate=old_bitrate,
+            available_bitrates=session.track.available_bitrates,
+            throughput=session.pacer.ack_rate,
+            send_rate=session.pacer.send_rate,
+            queue_depth=queue_depth,
+            send_latency_ms=send_latency_ms,
+        )
+        if target is None or target == old_bitrate:
+            return False
+
+        direction = "up" if int(target) > int(old_bitrate) else "down"
+        logger.info(
+            f"ABR: session {session.session_id} {old_bitrate} -> {target} "
+            f"(ack rate {session.pacer.ack_rate:.0f} B/s, queue {queue_depth}, latency {send_latency_ms})"
+        )
+        await self._change_bitrate_use_case.execute(target, session, reason="abr")
+        ABR_SWITCHES.labels(direction=direction).inc()
+        ABR_SELECTED_BITRATE.labels(bitrate=target).inc()
+        return True
@@ -1,17 +1,29 @@
+import asyncio
 from typing import AsyncGenerator
-from src.domain.stream.repository import AudioStreamer
 from src.domain.stream.models import StreamSession, AudioChunk
 from src.core.logger import logger
 
 class GetChunkGeneratorUseCase:
-    def __init__(self, audio_streamer: AudioStreamer):
-        self._audio_streamer = audio_streamer
-
     async def execute(self, session: StreamSession) -> AsyncGenerator[AudioChunk, None]:
-        await self._audio_streamer.switch_bitrate(session.current_bitrate)
-        session.track.total_chunks = self._audio_streamer.total_chunks
+        audio_streamer = session.audio_streamer
+        await audio_streamer.retarget(session.current_bitrate)
+        session.track.total_chunks = audio_streamer.total_chunks
+
+        # SEEK и смена битрейта переставляют курсор на месте, генератор не пересоздаётся
+        async for chunk in audio_streamer.chunks():
+            version = audio_streamer.position_version
+            await session.credits.acquire()
+            try:
+                await session.pacer.wait(len(chunk.data))
+            except asyncio.CancelledError:
+                # Чанк не уйдёт клиенту - кредит за него не вернётся по ack
+                session.credits.release(1)
+                raise
 
-        async for chunk in self._audio_streamer.chunks():
+            if version != audio_streamer.position_version:
+                # Позицию сменили, пока чанк ждал отправки
+                session.credits.release(1)
+                continue
             session.total_chunks_sent += 1
             session.current_chunk = chunk.number
             yield chunk
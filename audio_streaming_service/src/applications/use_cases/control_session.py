@@ -12,7 +12,8 @@ from src.domain.events.events import (
     SessionHistory
 )
 from src.domain.stream.models import StreamSession, StreamStatus
-from src.domain.stream.repository import StreamingRepository, AudioStreamer
+from src.domain.stream.repository import StreamingRepository
+from src.domain.stream.chunk_policy import ChunkSizePolicy
 
 
 class PauseSessionUseCase:
@@ -106,22 +107,48 @@ class StopSessionUseCase:
         )
 
 
+class DetachSessionUseCase:
+    """
+    Клиент отключился без STOP (обрыв, остановка пода): сессия не удаляется,
+    позиция сразу пишется в Redis, чтобы продолжить воспроизведение на другой реплике
+    """
+    def __init__(
+        self,
+        session_repo: StreamingRepository,
+    ):
+        self._session_repo = session_repo
+
+    async def execute(self, session: StreamSession) -> None:
+        session.detach()
+        await self._session_repo.save(session)
+        await self._session_repo.flush(session.session_id)
+
+
 class ChangeSessionBitrateUseCase:
     def __init__(
         self,
         session_repo: StreamingRepository,
-        audio_streamer: AudioStreamer,
         event_publisher: EventPublisher,
     ):
         self._event_publisher = event_publisher
         self._session_repo = session_repo
-        self._audio_streamer = audio_streamer
 
-    async def execute(self, new_bitrate: str, session: StreamSession) -> None:
-        
+    async def execute(self, new_bitrate: str, session: StreamSession, reason: str = "manual") -> None:
+        """
+        :param reason: "manual" - выбор клиента (отключает автовыбор), "abr" - автовыбор,
+        "congestion" - понижение гейтвеем при медленном клиенте
+        """
+        if session.abr is not None:
+            if reason == "manual":
+                session.abr.pin()
+            elif reason == "congestion":
+                # Автовыбор остаётся включён, но не переключает повторно сразу за гейтвеем
+                session.abr.note_switch()
+
         session.switch_bitrate(new_bitrate)
-        await self._audio_streamer.switch_bitrate(session.current_bitrate)
-        session.track.total_chunks = self._audio_streamer.total_chunks
+        session.current_chunk = await session.audio_streamer.retarget(session.current_bitrate)
+        session.track.total_chunks = session.audio_streamer.total_chunks
+        session.pacer.set_bitrate(session.current_bitrate)
         
         await self._session_repo.save(session)
 
@@ -130,6 +157,7 @@ class ChangeSessionBitrateUseCase:
                 session_id=session.session_id,
                 new_bitrate=int(session.current_bitrate),
                 timestamp=datetime.now(),
+                reason=reason,
             ),
             key=str(session.session_id)
         )
@@ -138,16 +166,16 @@ class ChangeSessionOffsetUseCase:
     def __init__(
         self,
         session_repo: StreamingRepository,
-        audio_streamer: AudioStreamer,
         event_publisher: EventPublisher,
     ):
         self._event_publisher = event_publisher
         self._session_repo = session_repo
-        self._audio_streamer = audio_streamer
 
     async def execute(self, new_chunk_offset: int, session: StreamSession) -> None:
         old_chunk_offset = session.current_chunk
-        session.current_chunk = new_chunk_offset       
+        session.current_chunk = session.audio_streamer.reposition(new_chunk_offset)
+        session.rewind()
+        session.pacer.reset()
         await self._session_repo.save(session)
 
         await self._event_publisher.publish(
@@ -159,3 +187,26 @@ class ChangeSessionOffsetUseCase:
             ),
             key=str(session.session_id)
         )
+
+
+class ChangeSessionChunkSizeUseCase:
+    def __init__(
+        self,
+        session_repo: StreamingRepository,
+        chunk_size_policy: ChunkSizePolicy,
+    ):
+        self._session_repo = session_repo
+        self._chunk_size_policy = chunk_size_policy
+
+    async def execute(self, chunk_size: int, session: StreamSession) -> None:
+        chunk_size = self._chunk_size_policy.normalize(chunk_size)
+        if chunk_size == session.chunk_size:
+            return
+
+        # Позиция в байтах не меняется, номера чанков пересчитываются под новый размер
+        session.current_chunk = session.audio_streamer.resize(chunk_size)
+        session.chunk_size = chunk_size
+        session.track.total_chunks = session.audio_streamer.total_chunks
+        logger.info(f"Session {session.session_id} chunk size changed to {chunk_size}")
+
+        await self._session_repo.save(session)
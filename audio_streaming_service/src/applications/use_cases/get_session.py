@@ -1,40 +1,88 @@
 import uuid
 import asyncio
-from typing import Optional
+from typing import Callable, Optional
 from datetime import datetime
 
 from src.core.logger import logger
+from src.core.exceptions import StreamingSessionError
 
 from src.domain.events.publisher import EventPublisher
 from src.domain.events.events import SessionStarted
 
 from src.domain.stream.models import StreamSession, StreamStatus, AudioTrack
-from src.domain.stream.repository import StreamingRepository, AudioStreamer
+from src.domain.stream.repository import StreamingRepository, AudioStreamerFactory
+from src.domain.stream.pacing import StreamPacer
+from src.domain.stream.flow_control import CreditWindow
+from src.domain.stream.chunk_policy import ChunkSizePolicy, NetworkType
+from src.domain.stream.abr import AbrController
 
 class GetSessionUseCase:
     def __init__(
         self,
         session_repo: StreamingRepository,
-        audio_streamer: AudioStreamer,
+        audio_streamer_factory: AudioStreamerFactory,
         event_publisher: EventPublisher,
+        pacer_factory: Callable[[], StreamPacer] = StreamPacer,
+        credit_window: int = 0,
+        chunk_size_policy: Optional[ChunkSizePolicy] = None,
+        abr_factory: Optional[Callable[[], AbrController]] = None,
     ):
         self._session_repo = session_repo 
-        self._audio_streamer = audio_streamer
+        self._audio_streamer_factory = audio_streamer_factory
         self._event_publisher = event_publisher
+        self._pacer_factory = pacer_factory
+        self._credit_window = credit_window
+        self._chunk_size_policy = chunk_size_policy
+        self._abr_factory = abr_factory
 
-    async def execute(self, track_id: str, user_id: str, bitrate: str, session_id: Optional[str]) -> StreamSession:
+    def _attach(self, session: StreamSession, audio_streamer) -> None:
+        session.audio_streamer = audio_streamer
+        session.pacer = self._pacer_factory()
+        session.pacer.set_bitrate(session.current_bitrate)
+        session.credits = CreditWindow(self._credit_window)
+        session.abr = self._abr_factory() if self._abr_factory is not None else None
+
+    async def execute(
+        self,
+        track_id: str,
+        user_id: str,
+        bitrate: str,
+        session_id: Optional[str],
+        network_type: NetworkType = NetworkType.UNKNOWN,
+        preferred_chunk_size: Optional[int] = None,
+        resume_chunk: Optional[int] = None,
+    ) -> StreamSession:
+        """
+        :param network_type: тип сети клиента (подсказка для размера чанка)
+        :param preferred_chunk_size: размер чанка, запрошенный клиентом
+        :param resume_chunk: первый недостающий клиенту чанк при переподключении
+            (None - следующий за последним подтверждённым)
+        """
         
+        audio_streamer = self._audio_streamer_factory.create()
+
         if session_id:
             session = await self._session_repo.get(session_id=session_id)
-            await self._audio_streamer.initialize(session.track.track_id, session.current_bitrate)
-            self._audio_streamer.seek(session.current_chunk * self._audio_streamer.chunk_size)
+            if session is None:
+                raise StreamingSessionError(f"Session {session_id} not found or expired")
+            await audio_streamer.initialize(session.track.track_id, session.current_bitrate)
+            audio_streamer.resize(session.chunk_size)
+            position = resume_chunk if resume_chunk is not None else session.resume_position()
+            session.current_chunk = audio_streamer.reposition(position)
+            logger.info(f"Session {session_id} resumed from chunk {session.current_chunk}")
+            self._attach(session, audio_streamer)
             return session
         
+        await audio_streamer.initialize(track_id, bitrate)
+        if self._chunk_size_policy is not None:
+            audio_streamer.resize(
+                self._chunk_size_policy.choose(network_type, bitrate, preferred_chunk_size)
+            )
         track = AudioTrack(
             track_id=track_id,
-            total_chunks=self._audio_streamer.total_chunks,
-            available_bitrates= await self._audio_streamer.get_bitrates(),
-            duration_ms=self._audio_streamer.duration / 1000, # source value in seconds
+            total_chunks=audio_streamer.total_chunks,
+            available_bitrates= await audio_streamer.get_bitrates(),
+            duration_ms=audio_streamer.duration / 1000, # source value in seconds
         )
 
         session = StreamSession(
@@ -42,12 +90,17 @@ class GetSessionUseCase:
             user_id=user_id,
             track=track,
             current_bitrate=bitrate,
-            chunk_size=self._audio_streamer.chunk_size,
+            chunk_size=audio_streamer.chunk_size,
             status=StreamStatus.STARTED,
             current_chunk=0,
             started_at=datetime.now(),
             message_queue=asyncio.Queue(),
         )
+        self._attach(session, audio_streamer)
+
+        # Сессия сразу доступна другим репликам (переподключение, передача между гейтвеями)
+        await self._session_repo.save(session)
+        await self._session_repo.flush(session.session_id)
 
         await self._event_publisher.publish(
             event=SessionStarted(
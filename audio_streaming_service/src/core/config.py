@@ -16,6 +16,7 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str = '1'
     REDIS_DB: int = 0
+    SESSION_CHECKPOINT_INTERVAL: float = 1.0  # период пакетной записи изменённых сессий в секундах
     
     # PostgreSQL
     POSTGRES_HOST: str = 'localhost'
@@ -52,6 +53,50 @@ class Settings(BaseSettings):
     MINIO_TRACK_BUCKET: str = "tracks"
     MINIO_TRACK_PATH: str = ""
     MINIO_DEFAULT_CHUNK_SIZE: int = 32768
+    MINIO_READAHEAD_WINDOW_SIZE: int = 2 * 1024 * 1024  # 0 - читать по одному чанку на запрос
+    MINIO_READAHEAD_DEPTH: int = 2  # сколько окон держать в полёте впереди текущего
+    MINIO_BUFFER_POOL_MAX_IDLE: int = 64  # свободные буферы окон read-ahead для переиспользования
+    MINIO_MAX_POOL_CONNECTIONS: int = 512  # под число одновременных слушателей на под
+    MINIO_KEEPALIVE_TIMEOUT: float = 60.0  # сколько держать простаивающее соединение
+    MINIO_CONNECT_TIMEOUT: float = 2.0
+    MINIO_READ_TIMEOUT: float = 10.0
+    MINIO_REQUEST_TIMEOUT: float = 15.0  # на весь вызов, включая чтение тела
+    MINIO_MAX_RETRIES: int = 2
+    TRACK_METADATA_CACHE_TTL: int = 600  # метаданные объектов трека (размер, длительность, etag)
+    TRACK_METADATA_REDIS_ENABLED: bool = True
+    TRACK_METADATA_REFRESH_INTERVAL: float = 30.0  # не чаще перечитывать трек из S3 при запросе отсутствующего битрейта
+    MP3_SEEK_INDEX_ENABLED: bool = True  # перемотка по индексу фреймов вместо формулы CBR
+    MP3_SEEK_INDEX_INTERVAL: float = 0.5  # шаг индекса в секундах
+
+    # Локальный кэш популярных треков
+    DISK_CACHE_ENABLED: bool = True
+    DISK_CACHE_DIR: str = "/tmp/audio_streaming_cache"
+    DISK_CACHE_MAX_BYTES: int = 10 * 1024 ** 3
+    DISK_CACHE_ADMISSION_THRESHOLD: int = 3  # открытий за CacheTTL.POPULAR
+
+    # Темп отправки чанков
+    STREAM_INITIAL_BURST_SECONDS: float = 10.0  # отправляются сразу для быстрого старта
+    STREAM_PACING_MARGIN: float = 1.5  # дальше - во столько раз быстрее реального времени
+    STREAM_MAX_AHEAD_SECONDS: float = 60.0  # предел неподтверждённого клиентом аудио
+    STREAM_CREDIT_WINDOW: int = 64  # максимум неподтверждённых чанков в полёте (0 - без ограничения)
+
+    # Размер чанка по подсказкам клиента (StartStream.network_type)
+    STREAM_LARGE_CHUNK_MIN_BITRATE: int = 256  # wifi/ethernet от этого битрейта - ChunkSize.LARGE
+    STREAM_MICRO_CHUNK_MAX_BITRATE: int = 96  # cellular до этого битрейта - ChunkSize.MICRO
+
+    # Автовыбор битрейта (ABR)
+    ABR_ENABLED: bool = True
+    ABR_SAFETY: float = 0.8  # доля измеренной скорости под новый битрейт при понижении
+    ABR_UPGRADE_HOLD_SECONDS: float = 15.0
+    ABR_DOWNGRADE_HOLD_SECONDS: float = 3.0
+    ABR_MIN_SWITCH_INTERVAL: float = 10.0
+    ABR_QUEUE_HIGH: int = 24  # чанков в очереди гейтвея - перегрузка
+    ABR_QUEUE_LOW: int = 4
+    ABR_LATENCY_HIGH_MS: float = 500.0  # задержка отправки в вебсокет - перегрузка
+    ABR_LATENCY_LOW_MS: float = 100.0
+
+    # Prometheus
+    METRICS_PORT: int = 8006
     
     @property
     def REDIS_URL(self) -> str:
@@ -7,19 +7,29 @@ from src.applications.use_cases.get_session import GetSessionUseCase
 from src.applications.use_cases.save_session import SaveSessionUseCase
 from src.applications.use_cases.chunk_generator import GetChunkGeneratorUseCase
 from src.applications.use_cases.ack_chunks import AcknowledgeChunksUseCase
+from src.applications.use_cases.adapt_bitrate import AdaptBitrateUseCase
 from src.applications.use_cases.control_session import (
     PauseSessionUseCase,
     ResumeSessionUseCase,
     StopSessionUseCase,
+    DetachSessionUseCase,
     ChangeSessionBitrateUseCase,
     ChangeSessionOffsetUseCase,
-
+    ChangeSessionChunkSizeUseCase,
 )
-from src.infrastructure.storage.audio_streamer import S3AudioStreamer
+from src.infrastructure.storage.audio_streamer import S3AudioStreamerFactory, ChunkSize
+from src.infrastructure.storage.s3_client import S3ClientManager
+from src.infrastructure.storage.disk_cache import DiskTrackCache
+from src.infrastructure.storage.metadata_cache import TrackMetadataCache
+from src.infrastructure.storage.seek_index_cache import SeekIndexCache
 from src.infrastructure.database.redis_repository import RedisStreamingRepository
+from src.infrastructure.database.checkpoint_repository import CheckpointedStreamingRepository
 from src.infrastructure.kafka.publisher import KafkaEventPublisher
 from src.infrastructure.database.redis_client import RedisClient
 from src.infrastructure.events.converters import SessionEventConverters
+from src.domain.stream.pacing import StreamPacer
+from src.domain.stream.abr import AbrController
+from src.domain.stream.chunk_policy import ChunkSizePolicy
 # from src.infrastructure.cache.user_serializer import UserSerializer, SimpleSerializer
 
 from src.core.config import settings
@@ -58,21 +68,94 @@ class Container(containers.DeclarativeContainer):
         RedisClient
     )
 
-    session_repo = providers.Factory(
+    redis_session_repo = providers.Singleton(
         RedisStreamingRepository,
         redis_client=redis_client
     )
+
+    # Сохранения сессий копятся и пишутся в Redis пакетами вне цикла отправки чанков
+    session_repo = providers.Singleton(
+        CheckpointedStreamingRepository,
+        repository=redis_session_repo,
+        interval=settings.SESSION_CHECKPOINT_INTERVAL,
+    )
     
 
-    # minio 
-    audio_streamer = providers.Singleton(
-        S3AudioStreamer,
-        bucket_name=settings.MINIO_TRACK_BUCKET,
+    # minio: общий клиент, курсор на каждую сессию
+    s3_client = providers.Singleton(
+        S3ClientManager,
         aws_access_key_id=settings.MINIO_USER,
         aws_secret_access_key=settings.MINIO_PASSWORD,
         endpoint_url=settings.MINIO_URL,
+        max_pool_connections=settings.MINIO_MAX_POOL_CONNECTIONS,
+        keepalive_timeout=settings.MINIO_KEEPALIVE_TIMEOUT,
+        connect_timeout=settings.MINIO_CONNECT_TIMEOUT,
+        read_timeout=settings.MINIO_READ_TIMEOUT,
+        request_timeout=settings.MINIO_REQUEST_TIMEOUT,
+        max_retries=settings.MINIO_MAX_RETRIES,
+    )
+
+    disk_track_cache = providers.Singleton(
+        DiskTrackCache,
+        redis_client=redis_client,
+        cache_dir=settings.DISK_CACHE_DIR,
+        max_bytes=settings.DISK_CACHE_MAX_BYTES,
+        admission_threshold=settings.DISK_CACHE_ADMISSION_THRESHOLD,
+    )
+
+    track_metadata_cache = providers.Singleton(
+        TrackMetadataCache,
+        ttl_seconds=settings.TRACK_METADATA_CACHE_TTL,
+        redis_client=redis_client if settings.TRACK_METADATA_REDIS_ENABLED else None,
+        refresh_interval=settings.TRACK_METADATA_REFRESH_INTERVAL,
+    )
+
+    seek_index_cache = providers.Singleton(
+        SeekIndexCache,
+        redis_client=redis_client,
+        interval=settings.MP3_SEEK_INDEX_INTERVAL,
+    )
+
+    audio_streamer_factory = providers.Singleton(
+        S3AudioStreamerFactory,
+        s3=s3_client,
+        bucket_name=settings.MINIO_TRACK_BUCKET,
         chunk_size=settings.MINIO_DEFAULT_CHUNK_SIZE,
         path=settings.MINIO_TRACK_PATH,
+        readahead_window=settings.MINIO_READAHEAD_WINDOW_SIZE,
+        readahead_depth=settings.MINIO_READAHEAD_DEPTH,
+        buffer_pool_max_idle=settings.MINIO_BUFFER_POOL_MAX_IDLE,
+        disk_cache=disk_track_cache if settings.DISK_CACHE_ENABLED else None,
+        metadata_cache=track_metadata_cache,
+        seek_index_cache=seek_index_cache if settings.MP3_SEEK_INDEX_ENABLED else None,
+    )
+
+
+    chunk_size_policy = providers.Singleton(
+        ChunkSizePolicy,
+        sizes=[ChunkSize.MICRO, ChunkSize.SMALL, ChunkSize.DEFAULT, ChunkSize.LARGE],
+        default_size=settings.MINIO_DEFAULT_CHUNK_SIZE,
+        high_bitrate=settings.STREAM_LARGE_CHUNK_MIN_BITRATE,
+        low_bitrate=settings.STREAM_MICRO_CHUNK_MAX_BITRATE,
+    )
+
+    abr_controller = providers.Factory(
+        AbrController,
+        safety=settings.ABR_SAFETY,
+        upgrade_hold=settings.ABR_UPGRADE_HOLD_SECONDS,
+        downgrade_hold=settings.ABR_DOWNGRADE_HOLD_SECONDS,
+        min_switch_interval=settings.ABR_MIN_SWITCH_INTERVAL,
+        queue_high=settings.ABR_QUEUE_HIGH,
+        queue_low=settings.ABR_QUEUE_LOW,
+        latency_high_ms=settings.ABR_LATENCY_HIGH_MS,
+        latency_low_ms=settings.ABR_LATENCY_LOW_MS,
+    )
+
+    stream_pacer = providers.Factory(
+        StreamPacer,
+        initial_burst_seconds=settings.STREAM_INITIAL_BURST_SECONDS,
+        margin=settings.STREAM_PACING_MARGIN,
+        max_ahead_seconds=settings.STREAM_MAX_AHEAD_SECONDS,
     )
 
 
@@ -85,8 +168,12 @@ class Container(containers.DeclarativeContainer):
     get_session_use_case = providers.Factory(
         GetSessionUseCase, 
         session_repo=session_repo,  
-        audio_streamer=audio_streamer,
+        audio_streamer_factory=audio_streamer_factory,
         event_publisher=kafka_publisher,
+        pacer_factory=stream_pacer.provider,
+        credit_window=settings.STREAM_CREDIT_WINDOW,
+        chunk_size_policy=chunk_size_policy,
+        abr_factory=abr_controller.provider if settings.ABR_ENABLED else None,
     )
     
     get_save_session_use_case = providers.Factory(
@@ -96,12 +183,12 @@ class Container(containers.DeclarativeContainer):
 
     get_chunk_generator_use_case = providers.Factory(
         GetChunkGeneratorUseCase,
-        audio_streamer=audio_streamer
     )
 
     get_ack_chunks_use_case = providers.Factory(
         AcknowledgeChunksUseCase,
         event_publisher=kafka_publisher,
+        session_repo=session_repo,
     )
 
     get_pause_session_use_case = providers.Factory(
@@ -123,31 +210,63 @@ class Container(containers.DeclarativeContainer):
         history_event_publisher=history_kafka_publisher,
     )
 
+    get_detach_session_use_case = providers.Factory(
+        DetachSessionUseCase,
+        session_repo=session_repo,
+    )
+
     get_change_session_bitrate_use_case = providers.Factory(
         ChangeSessionBitrateUseCase,
         session_repo=session_repo, 
-        audio_streamer=audio_streamer,
         event_publisher=kafka_publisher,
     )
 
     get_change_session_offset_use_case = providers.Factory(
         ChangeSessionOffsetUseCase,
         session_repo=session_repo, 
-        audio_streamer=audio_streamer,
         event_publisher=kafka_publisher,
     )
 
+    get_change_session_chunk_size_use_case = providers.Factory(
+        ChangeSessionChunkSizeUseCase,
+        session_repo=session_repo,
+        chunk_size_policy=chunk_size_policy,
+    )
+
+    get_adapt_bitrate_use_case = providers.Factory(
+        AdaptBitrateUseCase,
+        change_bitrate_use_case=get_change_session_bitrate_use_case,
+    )
+
     @classmethod
     async def init_resources(cls):
         # publisher = cls.kafka_publisher()
         # await publisher.connect()
         redis = cls.redis_client()
         await redis.connect()
+        await cls.session_repo().start()
+
+        s3_client = cls.s3_client()
+        await s3_client.start()
+
+        if settings.DISK_CACHE_ENABLED:
+            cls.disk_track_cache().load()
 
     @classmethod
     async def shutdown_resources(cls):
+        await cls.session_repo().close()
+
         redis = cls.redis_client()
         await redis.disconnect()
+
+        if settings.DISK_CACHE_ENABLED:
+            await cls.disk_track_cache().close()
+
+        if settings.MP3_SEEK_INDEX_ENABLED:
+            await cls.seek_index_cache().close()
+
+        s3_client = cls.s3_client()
+        await s3_client.close()
         
         # publisher = cls.kafka_publisher()
         # if publisher:
@@ -13,6 +13,9 @@ class StreamingSessionError(DomainError):
 class AccessFail(ValueError):
     pass
 
+class StorageObjectChanged(Exception):
+    pass
+
 class UnknownMessageReceived(ValueError):
     pass
 
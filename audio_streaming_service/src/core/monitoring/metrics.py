@@ -0,0 +1,63 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# S3 / MinIO
+S3_POOL_MAX_CONNECTIONS = Gauge(
+    's3_pool_max_connections',
+    'Configured size of the shared S3 connection pool'
+)
+
+S3_POOL_CONNECTIONS_IN_USE = Gauge(
+    's3_pool_connections_in_use',
+    'S3 requests currently holding a pooled connection'
+)
+
+S3_POOL_UTILIZATION = Gauge(
+    's3_pool_utilization_ratio',
+    'Share of the S3 connection pool currently in use'
+)
+
+S3_REQUEST_DURATION = Histogram(
+    's3_request_duration_seconds',
+    'S3 request duration including body read',
+    ['operation']
+)
+
+S3_REQUEST_ERRORS = Counter(
+    's3_request_errors_total',
+    'Failed S3 requests',
+    ['operation']
+)
+
+# Локальный кэш треков
+DISK_CACHE_HITS = Counter(
+    'disk_track_cache_hits_total',
+    'Track objects served from the local disk cache'
+)
+
+DISK_CACHE_MISSES = Counter(
+    'disk_track_cache_misses_total',
+    'Track objects not found in the local disk cache'
+)
+
+DISK_CACHE_EVICTIONS = Counter(
+    'disk_track_cache_evictions_total',
+    'Track objects evicted from the local disk cache'
+)
+
+DISK_CACHE_BYTES = Gauge(
+    'disk_track_cache_bytes',
+    'Bytes currently stored in the local disk cache'
+)
+
+# Автовыбор битрейта
+ABR_SWITCHES = Counter(
+    'abr_bitrate_switches_total',
+    'Automatic bitrate switches',
+    ['direction']
+)
+
+ABR_SELECTED_BITRATE = Counter(
+    'abr_selected_bitrate_total',
+    'Bitrates chosen by the automatic bitrate controller',
+    ['bitrate']
+)
@@ -23,6 +23,7 @@ class BitrateChangedEvent(SessionEvent):
     session_id: str
     new_bitrate: int
     timestamp: datetime
+    reason: str = "manual"  # "manual" - команда клиента, "abr" - автовыбор, "congestion" - понижение гейтвеем
 
 @dataclass
 class OffsetChangedEvent(SessionEvent):
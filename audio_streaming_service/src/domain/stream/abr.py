@@ -0,0 +1,138 @@
+import time
+from typing import Callable, Optional, Sequence
+
+
+class AbrController:
+    """
+    Автоматический выбор битрейта сессии по измерениям доставки.
+
+    Пропускная способность - сглаженная скорость подтверждений (ChunkAck),
+    перегрузку дополнительно выдают глубина очереди гейтвея и задержка
+    отправки в вебсокет. Понижение - до ступени, которая укладывается в
+    измеренную скорость с запасом; повышение - на одну ступень после
+    устойчиво хорошей доставки. Оба решения требуют, чтобы условие держалось
+    заданное время, и не чаще min_switch_interval, чтобы битрейт не скакал.
+    Ручная смена битрейта закрепляет его до конца сессии, понижение
+    гейтвеем при медленном клиенте автовыбор не отключает.
+    """
+
+    def __init__(
+        self,
+        safety: float = 0.8,
+        upgrade_hold: float = 15.0,
+        downgrade_hold: float = 3.0,
+        min_switch_interval: float = 10.0,
+        queue_high: int = 24,
+        queue_low: int = 4,
+        latency_high_ms: float = 500.0,
+        latency_low_ms: float = 100.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param safety: доля измеренной скорости, которую может занять новый битрейт при понижении
+        :param upgrade_hold: сколько секунд доставка должна быть хорошей перед повышением
+        :param downgrade_hold: сколько секунд должна длиться перегрузка перед понижением
+        :param min_switch_interval: минимальный интервал между переключениями (и после старта)
+        :param queue_high: глубина очереди гейтвея (чанков), считающаяся перегрузкой
+        :param queue_low: глубина очереди, при которой можно повышать
+        :param latency_high_ms: задержка отправки в вебсокет, считающаяся перегрузкой
+        :param latency_low_ms: задержка отправки, при которой можно повышать
+        :param clock: источник монотонного времени
+        """
+        self._safety = safety
+        self._upgrade_hold = upgrade_hold
+        self._downgrade_hold = downgrade_hold
+        self._min_switch_interval = min_switch_interval
+        self._queue_high = queue_high
+        self._queue_low = queue_low
+        self._latency_high_ms = latency_high_ms
+        self._latency_low_ms = latency_low_ms
+        self._clock = clock
+
+        self._pinned = False
+        self._last_switch = clock()
+        self._congested_since: Optional[float] = None
+        self._healthy_since: Optional[float] = None
+
+    @property
+    def pinned(self) -> bool:
+        return self._pinned
+
+    def pin(self) -> None:
+        """Отключает автовыбор (клиент выбрал битрейт сам)"""
+        self._pinned = True
+
+    def note_switch(self) -> None:
+        """Учитывает смену битрейта в обход автовыбора: отсчёт интервалов начинается заново"""
+        self._last_switch = self._clock()
+        self._congested_since = self._healthy_since = None
+
+    def observe(
+        self,
+        current_bitrate: str,
+        available_bitrates: Sequence[str],
+        throughput: float,
+        send_rate: float,
+        queue_depth: Optional[int] = None,
+        send_latency_ms: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        Учитывает очередное измерение
+
+        :param current_bitrate: текущий битрейт ("128")
+        :param available_bitrates: битрейты трека
+        :param throughput: скорость доставки клиенту, байт/с
+        :param send_rate: скорость, с которой сервер отдаёт чанки, байт/с
+        :param queue_depth: чанков в очереди гейтвея
+        :param send_latency_ms: задержка отправки в вебсокет
+        :return: битрейт, на который нужно переключиться, или None
+        """
+        if self._pinned or throughput <= 0 or not current_bitrate.isdigit():
+            return None
+
+        now = self._clock()
+        current = int(current_bitrate)
+        congested = (
+            throughput < current * 125
+            or (queue_depth is not None and queue_depth >= self._queue_high)
+            or (send_latency_ms is not None and send_latency_ms >= self._latency_high_ms)
+        )
+        healthy = (
+            not congested
+            and throughput >= send_rate * 0.9
+            and (queue_depth is None or queue_depth <= self._queue_low)
+            and (send_latency_ms is None or send_latency_ms <= self._latency_low_ms)
+        )
+
+        if congested:
+            self._healthy_since = None
+            if self._congested_since is None:
+                self._congested_since = now
+        elif healthy:
+            self._congested_since = None
+            if self._healthy_since is None:
+                self._healthy_since = now
+        else:
+            self._congested_since = self._healthy_since = None
+
+        if now - self._last_switch < self._min_switch_interval:
+            return None
+
+        ladder = {int(b): b for b in available_bitrates if b.isdigit()}
+        target = None
+        if self._congested_since is not None and now - self._congested_since >= self._downgrade_hold:
+            lower = sorted(b for b in ladder if b < current)
+            fitting = [b for b in lower if b * 125 <= throughput * self._safety]
+            if lower:
+                target = fitting[-1] if fitting else lower[0]
+        elif self._healthy_since is not None and now - self._healthy_since >= self._upgrade_hold:
+            higher = sorted(b for b in ladder if b > current)
+            if higher:
+                target = higher[0]
+
+        if target is None:
+            return None
+
+        self._last_switch = now
+        self._congested_since = self._healthy_since = None
+        return ladder[target]
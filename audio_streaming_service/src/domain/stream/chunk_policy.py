@@ -0,0 +1,68 @@
+from enum import Enum, auto
+from typing import Optional, Sequence
+
+
+class NetworkType(Enum):
+    UNKNOWN = auto()
+    WIFI = auto()
+    ETHERNET = auto()
+    CELLULAR = auto()
+
+
+class ChunkSizePolicy:
+    """
+    Выбор размера чанка для сессии по подсказкам клиента.
+
+    Стационарным клиентам на высоком битрейте - крупные чанки (меньше
+    сообщений gRPC на секунду аудио), мобильным - мелкие, чтобы каждый
+    чанк быстрее доходил по сети с большой задержкой.
+    """
+
+    def __init__(
+        self,
+        sizes: Sequence[int],
+        default_size: int,
+        high_bitrate: int = 256,
+        low_bitrate: int = 96,
+    ):
+        """
+        :param sizes: допустимые размеры чанка в байтах
+        :param default_size: размер, если подсказок нет
+        :param high_bitrate: битрейт (кбит/с), с которого стационарным клиентам даётся крупный чанк
+        :param low_bitrate: битрейт (кбит/с), до которого мобильным клиентам даётся минимальный чанк
+        """
+        self._sizes = sorted(set(sizes) | {default_size})
+        self._default_size = default_size
+        self._high_bitrate = high_bitrate
+        self._low_bitrate = low_bitrate
+
+    @property
+    def default_size(self) -> int:
+        return self._default_size
+
+    def normalize(self, chunk_size: int) -> int:
+        """Ближайший допустимый размер (при равенстве - меньший)"""
+        return min(self._sizes, key=lambda size: (abs(size - chunk_size), size))
+
+    def choose(
+        self,
+        network_type: NetworkType = NetworkType.UNKNOWN,
+        bitrate: Optional[str] = None,
+        preferred_size: Optional[int] = None,
+    ) -> int:
+        """
+        :param network_type: тип сети клиента
+        :param bitrate: битрейт сессии ("128", "320")
+        :param preferred_size: размер, запрошенный клиентом явно
+        :return: размер чанка в байтах
+        """
+        if preferred_size:
+            return self.normalize(preferred_size)
+
+        kbps = int(bitrate) if bitrate and bitrate.isdigit() else 0
+        if network_type == NetworkType.CELLULAR:
+            size = self._sizes[0] if kbps and kbps <= self._low_bitrate else self._sizes[min(1, len(self._sizes) - 1)]
+            return min(size, self._default_size)
+        if network_type in (NetworkType.WIFI, NetworkType.ETHERNET) and kbps >= self._high_bitrate:
+            return self._sizes[-1]
+        return self._default_size
@@ -0,0 +1,39 @@
+import asyncio
+
+
+class CreditWindow:
+    """
+    Кредитное окно сессии: не более size отправленных, но не подтверждённых
+    клиентом (ChunkAck) чанков. Когда кредиты кончаются, генератор чанков ждёт.
+    """
+
+    def __init__(self, size: int):
+        """
+        :param size: размер окна в чанках (0 - без ограничения)
+        """
+        self._size = size
+        self._in_flight = 0
+        self._released = asyncio.Event()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def exhausted(self) -> bool:
+        return self._size > 0 and self._in_flight >= self._size
+
+    async def acquire(self) -> None:
+        """Занимает кредит под очередной чанк"""
+        while self.exhausted():
+            self._released.clear()
+            await self._released.wait()
+        self._in_flight += 1
+
+    def release(self, count: int) -> None:
+        """Возвращает кредиты за подтверждённые чанки"""
+        self._in_flight = max(0, self._in_flight - count)
+        self._released.set()
@@ -1,12 +1,18 @@
 import asyncio
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Optional
+from typing import Optional, Union, TYPE_CHECKING
 from datetime import datetime
 
 import uuid
 
 from src.core.exceptions import BitrateNotFound
+from src.domain.stream.pacing import StreamPacer
+from src.domain.stream.flow_control import CreditWindow
+from src.domain.stream.abr import AbrController
+
+if TYPE_CHECKING:
+    from src.domain.stream.repository import AudioStreamer
 
 class StreamStatus(Enum):
     STARTED = auto()
@@ -32,12 +38,18 @@ class StreamSession:
     session_id: str = field(default_factory=lambda: str(uuid.uuid4()))
     status: StreamStatus = StreamStatus.STARTED
     current_chunk: int = 0
+    last_acked_chunk: int = -1  # последний подтверждённый клиентом чанк (-1 - подтверждений не было)
     total_chunks_sent: int = 0 
     started_at: datetime = datetime.now()
     paused_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
     message_queue: asyncio.Queue = field(default_factory=asyncio.Queue)
     reader_task: Optional[asyncio.Task] = field(default=None, init=False)
+    audio_streamer: Optional["AudioStreamer"] = field(default=None, init=False)  # курсор сессии
+    pacer: StreamPacer = field(default_factory=StreamPacer, init=False)
+    credits: CreditWindow = field(default_factory=lambda: CreditWindow(0), init=False)
+    abr: Optional[AbrController] = field(default=None, init=False)  # None - автовыбор битрейта выключен
+    flow_paused: bool = field(default=False, init=False)  # гейтвей не успевает разгружать очередь
 
     def pause(self):
         if self.status == StreamStatus.STARTED:
@@ -49,23 +61,48 @@ class StreamSession:
             self.status = StreamStatus.STARTED
             self.paused_at = None
 
+    def flow_pause(self):
+        """Приостановка отправки по перегрузке гейтвея; статус сессии (и пауза пользователя) не меняется"""
+        self.flow_paused = True
+
+    def flow_resume(self):
+        self.flow_paused = False
+
     def stop(self):
         self.status = StreamStatus.STOPPED
 
     def prestop(self):
         self.status = StreamStatus.ARTIFICIAL_CHUNK
 
+    def rewind(self):
+        """Отменяет завершение, если после последнего чанка перемотали назад"""
+        if self.status == StreamStatus.ARTIFICIAL_CHUNK:
+            self.status = StreamStatus.STARTED
+
     def should_stop(self) -> bool:
         return self.status == StreamStatus.ARTIFICIAL_CHUNK
     
     def should_continue(self) -> bool:
         """Проверяет, можно ли продолжать отправку чанков"""
+        if self.flow_paused:
+            return False
         return self.status in (StreamStatus.STARTED, StreamStatus.SHOULD_RESTART, StreamStatus.ARTIFICIAL_CHUNK)
 
     def is_active(self) -> bool:
         """Проверяет, активна ли сессия (не остановлена и не завершена)"""
         return self.status != StreamStatus.STOPPED
 
+    def resume_position(self) -> int:
+        """С какого чанка продолжать после переподключения"""
+        if self.last_acked_chunk >= 0:
+            return self.last_acked_chunk + 1
+        return self.current_chunk
+
+    def detach(self):
+        """Отключение клиента без завершения сессии"""
+        if self.reader_task and not self.reader_task.done():
+            self.reader_task.cancel()
+
     def cleanup(self):
         """Корректное завершение сессии"""
         if self.reader_task and not self.reader_task.done():
@@ -82,7 +119,8 @@ class StreamSession:
 
 @dataclass
 class AudioChunk:
-    data: bytes
+    data: Union[bytes, memoryview]  # memoryview - срез буфера стримера без копирования
     number: int  # Порядковый номер (соответствует current_chunk сессии)
     is_last: bool
-    bitrate: str 
\ No newline at end of file
+    bitrate: str
+    offset: int = 0  # смещение данных в файле битрейта 
\ No newline at end of file
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class StreamPacer:
+    """
+    Темп отправки чанков сессии (token bucket).
+
+    Первые initial_burst_seconds аудио уходят без задержек для быстрого
+    старта, дальше - со скоростью воспроизведения, умноженной на margin.
+    Если по ChunkAck клиент накопил больше max_ahead_seconds неподтверждённого
+    аудио, отправка ждёт подтверждений.
+    """
+
+    ACK_RATE_SMOOTHING = 0.3
+
+    def __init__(
+        self,
+        initial_burst_seconds: float = 10.0,
+        margin: float = 1.5,
+        max_ahead_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param initial_burst_seconds: сколько секунд аудио отправить сразу
+        :param margin: во сколько раз отправка быстрее воспроизведения
+        :param max_ahead_seconds: предел неподтверждённого аудио в секундах
+        :param clock: источник монотонного времени
+        """
+        self._burst_seconds = initial_burst_seconds
+        self._margin = margin
+        self._max_ahead_seconds = max_ahead_seconds
+        self._clock = clock
+
+        self._bytes_per_second = 0.0
+        self._tokens = 0.0
+        self._last_refill = clock()
+        self._sent_bytes = 0
+        self._acked_bytes = 0
+        self._acks_seen = False
+        self._ack_event = asyncio.Event()
+        self._ack_rate = 0.0
+        self._last_ack_at: Optional[float] = None
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self._bytes_per_second
+
+    @property
+    def send_rate(self) -> float:
+        """Скорость отправки вне стартового буфера, байт/с"""
+        return self._bytes_per_second * self._margin
+
+    @property
+    def ack_rate(self) -> float:
+        """Сглаженная скорость подтверждений клиентом, байт/с"""
+        return self._ack_rate
+
+    @property
+    def ahead_seconds(self) -> float:
+        """Сколько секунд отправленного аудио клиент ещё не подтвердил"""
+        if not self._bytes_per_second:
+            return 0.0
+        return max(0, self._sent_bytes - self._acked_bytes) / self._bytes_per_second
+
+    def set_bitrate(self, bitrate: str) -> None:
+        """Пересчитывает темп под битрейт, сохраняя запас в секундах"""
+        self._refill()
+        bytes_per_second = int(bitrate) * 1000 / 8
+        if self._bytes_per_second:
+            self._tokens *= bytes_per_second / self._bytes_per_second
+        else:
+            self._tokens = self._burst_seconds * bytes_per_second
+        self._bytes_per_second = bytes_per_second
+
+    def reset(self) -> None:
+        """Начинает темп заново (после перемотки буфер клиента пуст)"""
+        self._tokens = self._burst_seconds * self._bytes_per_second
+        self._last_refill = self._clock()
+        self._sent_bytes = self._acked_bytes
+
+    def on_ack(self, acked_bytes: int) -> None:
+        now = self._clock()
+        if self._last_ack_at is not None and now > self._last_ack_at:
+            rate = acked_bytes / (now - self._last_ack_at)
+            self._ack_rate += self.ACK_RATE_SMOOTHING * (rate - self._ack_rate)
+        self._last_ack_at = now
+
+        self._acked_bytes += acked_bytes
+        self._acks_seen = True
+        self._ack_event.set()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        capacity = self._burst_seconds * self._bytes_per_second
+        self._tokens = min(
+            capacity,
+            self._tokens + (now - self._last_refill) * self._bytes_per_second * self._margin,
+        )
+        self._last_refill = now
+
+    async def wait(self, nbytes: int) -> None:
+        """Ждёт, пока можно отправить nbytes"""
+        if not self._bytes_per_second:
+            return
+
+        # Без подтверждений (старые клиенты) ограничиваемся только темпом
+        while self._acks_seen and self.ahead_seconds > self._max_ahead_seconds:
+            self._ack_event.clear()
+            await self._ack_event.wait()
+
+        self._refill()
+        if self._tokens < nbytes:
+            await asyncio.sleep((nbytes - self._tokens) / (self._bytes_per_second * self._margin))
+            self._refill()
+
+        self._tokens -= nbytes
+        self._sent_bytes += nbytes
@@ -28,6 +28,10 @@ class StreamingRepository(ABC):
         """Удалить сессию (возвращает True если сессия существовала)"""
         raise NotImplementedError
 
+    async def flush(self, session_id: Optional[str] = None) -> None:
+        """Дописать отложенные сохранения (одной сессии или всех); по умолчанию их нет"""
+        return None
+
 
 class AbstractTrackService(ABC):
     """Абстракция для сервиса треков"""
@@ -55,7 +59,32 @@ class AudioStreamer(ABC):
     @abstractmethod
     def seek(self, offset_bytes: int): 
         raise NotImplementedError
+
+    @abstractmethod
+    def reposition(self, chunk_num: int) -> int:
+        """Переставляет курсор на чанк, не прерывая chunks(); возвращает номер следующего чанка"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def retarget(self, new_bitrate: str) -> int:
+        """Меняет битрейт на лету с сохранением позиции; возвращает номер следующего чанка"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def resize(self, chunk_size: int) -> int:
+        """Меняет размер чанка с сохранением позиции; возвращает номер следующего чанка"""
+        raise NotImplementedError
+
+    @abstractproperty
+    def position_version(self) -> int:
+        """Растёт при каждой смене позиции или битрейта"""
+        raise NotImplementedError
     
+    @abstractmethod
+    async def close(self) -> None:
+        """Освобождает ресурсы курсора"""
+        raise NotImplementedError
+
     @abstractmethod
     async def chunks(
         self, 
@@ -81,3 +110,11 @@ class AudioStreamer(ABC):
     @abstractproperty
     def chunk_size(self) -> int:
         raise NotImplementedError
+
+
+class AudioStreamerFactory(ABC):
+    """Фабрика курсоров AudioStreamer: по одному на стриминговую сессию"""
+
+    @abstractmethod
+    def create(self) -> AudioStreamer:
+        raise NotImplementedError
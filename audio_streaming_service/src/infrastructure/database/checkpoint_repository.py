@@ -0,0 +1,96 @@
+import asyncio
+from typing import Dict, Optional
+
+from src.core.logger import logger
+from src.domain.stream.models import StreamSession
+from src.domain.stream.repository import StreamingRepository
+from src.infrastructure.database.redis_repository import RedisStreamingRepository
+
+
+class CheckpointedStreamingRepository(StreamingRepository):
+    """
+    Отложенная запись сессий в Redis.
+
+    save() только помечает сессию изменённой; фоновая задача раз в interval
+    секунд пишет все изменённые сессии одним pipeline. Повторные сохранения
+    одной сессии между сбросами схлопываются в одну запись.
+    """
+
+    def __init__(self, repository: RedisStreamingRepository, interval: float = 1.0):
+        """
+        :param repository: репозиторий, в который сбрасываются сессии
+        :param interval: период сброса в секундах
+        """
+        self._repository = repository
+        self._interval = interval
+        self._dirty: Dict[str, StreamSession] = {}
+        self._writing: Dict[str, StreamSession] = {}  # пишутся в Redis прямо сейчас
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Останавливает фоновый сброс и дописывает всё накопленное"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Session checkpoint failed: {str(e)}")
+
+    async def get(self, session_id: str) -> Optional[StreamSession]:
+        # Версия, ещё не записанная или записываемая прямо сейчас, должна дойти до Redis раньше чтения
+        if session_id in self._dirty or session_id in self._writing:
+            await self.flush(session_id)
+        return await self._repository.get(session_id)
+
+    async def save(self, session: StreamSession) -> None:
+        self._dirty[session.session_id] = session
+
+    async def delete(self, session_id: str) -> bool:
+        self._dirty.pop(session_id, None)
+        # Ждём идущий сброс, чтобы он не записал сессию обратно после удаления
+        async with self._lock:
+            self._dirty.pop(session_id, None)  # могла вернуться после неудачного сброса
+            return await self._repository.delete(session_id)
+
+    async def flush(self, session_id: Optional[str] = None) -> None:
+        """
+        Пишет изменённые сессии одним pipeline
+
+        :param session_id: сбросить только эту сессию (None - все)
+        """
+        # Пачку забираем под блокировкой: пока идёт предыдущий сброс, сессии
+        # остаются в _dirty, а записываемые видны в _writing до конца save_many
+        async with self._lock:
+            if session_id is not None:
+                session = self._dirty.pop(session_id, None)
+                batch = {session_id: session} if session is not None else {}
+            else:
+                batch, self._dirty = self._dirty, {}
+            if not batch:
+                return
+
+            self._writing = batch
+            try:
+                await self._repository.save_many(list(batch.values()))
+            except Exception:
+                # Вернём в очередь то, что не успели перезаписать более свежей версией
+                for pending_id, session in batch.items():
+                    self._dirty.setdefault(pending_id, session)
+                raise
+            finally:
+                self._writing = {}
@@ -1,7 +1,7 @@
 import json
 import pickle
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import asdict, is_dataclass
@@ -17,6 +17,7 @@ from src.core.exceptions import (
 from src.domain.stream.models import StreamSession, AudioTrack, StreamStatus
 from src.domain.stream.repository import StreamingRepository
 from src.infrastructure.database.redis_client import RedisClient
+from src.core.protos.generated.session_state_pb2 import StoredSession, StoredTrack
 
 class CacheTTL:
     UNPOPULAR = 600
@@ -24,6 +25,11 @@ class CacheTTL:
     POPULAR = 86400
 
 class RedisStreamingRepository(StreamingRepository):
+    # Версия формата хранения; смена формата - новый префикс ключа
+    KEY_VERSION = "v2"
+    FORMAT_FIELD = b"v"
+    COLD_FIELD = b"cold"
+
     def __init__(self, redis_client: RedisClient, ttl_seconds: int = CacheTTL.DEFAULT):
         """
         :param redis_client: клиент Redis
@@ -35,38 +41,76 @@ class RedisStreamingRepository(StreamingRepository):
     def _connect(self):
         self._redis.connect()
 
-    def _serialize_session(self, session: StreamSession) -> bytes:
-        """Сериализация сессии в bytes для Redis, исключая несериализуемые поля"""
+    def _cold_state(self, session: StreamSession) -> bytes:
+        """Неизменяемая часть сессии: пишется один раз при первом сохранении"""
         try:
-            # Создаем копию данных, исключая несериализуемые поля
-            session_dict = {
-                'session_id': session.session_id,
-                'user_id': session.user_id,
-                'current_bitrate': session.current_bitrate,
-                'chunk_size': session.chunk_size,
-                'status': session.status.name,
-                'current_chunk': session.current_chunk,
-                'started_at': session.started_at.isoformat(),
-                'track': {
-                    'track_id': session.track.track_id,
-                    'total_chunks': session.track.total_chunks,
-                    'available_bitrates': session.track.available_bitrates,
-                    'duration_ms': session.track.duration_ms
-                }
-            }
-            
-            # Добавляем опциональные поля
-            if session.paused_at:
-                session_dict['paused_at'] = session.paused_at.isoformat()
-            if session.finished_at:
-                session_dict['finished_at'] = session.finished_at.isoformat()
-            
-            return json.dumps(session_dict).encode('utf-8')
+            return StoredSession(
+                session_id=session.session_id,
+                user_id=session.user_id,
+                track=StoredTrack(
+                    track_id=session.track.track_id,
+                    available_bitrates=session.track.available_bitrates,
+                    duration_ms=session.track.duration_ms,
+                ),
+                started_at=session.started_at.timestamp(),
+            ).SerializeToString()
         except Exception as e:
             logger.error(f"Session serialization error: {str(e)}")
             raise SessionSerializationError("Failed to serialize session")
 
-    def _deserialize_session(self, data: bytes) -> Optional[StreamSession]:
+    def _hot_state(self, session: StreamSession) -> Dict[bytes, bytes]:
+        """Часто меняющиеся поля: каждое - отдельное поле хеша"""
+        return {
+            b"current_chunk": str(session.current_chunk).encode(),
+            b"last_acked_chunk": str(session.last_acked_chunk).encode(),
+            b"current_bitrate": session.current_bitrate.encode(),
+            b"chunk_size": str(session.chunk_size).encode(),
+            b"total_chunks": str(session.track.total_chunks).encode(),
+            b"status": session.status.name.encode(),
+            b"paused_at": self._encode_time(session.paused_at),
+            b"finished_at": self._encode_time(session.finished_at),
+        }
+
+    @staticmethod
+    def _encode_time(value: Optional[datetime]) -> bytes:
+        return repr(value.timestamp()).encode() if value else b""
+
+    @staticmethod
+    def _decode_time(value: Optional[bytes]) -> Optional[datetime]:
+        return datetime.fromtimestamp(float(value)) if value else None
+
+    def _deserialize_session(self, fields: Dict[bytes, bytes]) -> Optional[StreamSession]:
+        if not fields:
+            return None
+
+        try:
+            cold = StoredSession.FromString(fields[self.COLD_FIELD])
+            track = AudioTrack(
+                track_id=cold.track.track_id,
+                total_chunks=int(fields[b"total_chunks"]),
+                available_bitrates=list(cold.track.available_bitrates),
+                duration_ms=cold.track.duration_ms,
+            )
+            session = StreamSession(
+                session_id=cold.session_id,
+                user_id=cold.user_id,
+                track=track,
+                chunk_size=int(fields[b"chunk_size"]),
+                current_bitrate=fields[b"current_bitrate"].decode(),
+                status=StreamStatus[fields[b"status"].decode()],
+                current_chunk=int(fields[b"current_chunk"]),
+                started_at=datetime.fromtimestamp(cold.started_at),
+            )
+            session.last_acked_chunk = int(fields.get(b"last_acked_chunk", b"-1"))
+            session.paused_at = self._decode_time(fields.get(b"paused_at"))
+            session.finished_at = self._decode_time(fields.get(b"finished_at"))
+            return session
+        except Exception as e:
+            logger.error(f"Session deserialization error: {str(e)}")
+            raise SessionDeserializationError("Failed to deserialize session")
+
+    def _deserialize_legacy_session(self, data: bytes) -> Optional[StreamSession]:
+        """Сессии, сохранённые до перехода на хеш (JSON в stream_session:{id})"""
         if not data:
             return None
             
@@ -99,10 +143,6 @@ class RedisStreamingRepository(StreamingRepository):
             if 'finished_at' in session_dict:
                 session.finished_at = datetime.fromisoformat(session_dict['finished_at'])
             
-            # Несериализуемые поля инициализируем заново
-            session.message_queue = asyncio.Queue()
-            session.reader_task = None
-            
             return session
         except Exception as e:
             logger.error(f"Session deserialization error: {str(e)}")
@@ -110,15 +150,37 @@ class RedisStreamingRepository(StreamingRepository):
 
     def _get_redis_key(self, session_id: str) -> str:
         """Генерирует ключ для Redis"""
+        return f"stream_session:{self.KEY_VERSION}:{session_id}"
+
+    def _get_legacy_redis_key(self, session_id: str) -> str:
         return f"stream_session:{session_id}"
 
+    def _queue_save(self, pipe, session: StreamSession, full: bool) -> None:
+        """
+        Добавляет в pipeline запись сессии
+
+        :param full: перезаписать и неизменяемую часть; иначе она пишется, только если её ещё нет
+        """
+        key = self._get_redis_key(session.session_id)
+        cold = self._cold_state(session)
+        if full:
+            pipe.hset(key, mapping={self.FORMAT_FIELD: self.KEY_VERSION, self.COLD_FIELD: cold})
+        else:
+            pipe.hsetnx(key, self.FORMAT_FIELD, self.KEY_VERSION)
+            pipe.hsetnx(key, self.COLD_FIELD, cold)
+        pipe.hset(key, mapping=self._hot_state(session))
+        pipe.expire(key, self._ttl)
+
     async def get(self, session_id: str) -> Optional[StreamSession]:
         """Получить сессию по ID"""
         try:
             self._connect()
-            key = self._get_redis_key(session_id)
-            data = await self._redis.client.get(key)
-            return self._deserialize_session(data) if data else None
+            fields = await self._redis.client.hgetall(self._get_redis_key(session_id))
+            if fields:
+                return self._deserialize_session(fields)
+
+            data = await self._redis.client.get(self._get_legacy_redis_key(session_id))
+            return self._deserialize_legacy_session(data) if data else None
         except Exception as e:
             logger.error(f"Failed to get session {session_id}: {str(e)}")
             raise SessionRepositoryError("Failed to get session")
@@ -127,18 +189,37 @@ class RedisStreamingRepository(StreamingRepository):
         """Сохранить или обновить сессию"""
         try:
             self._connect()
-            key = self._get_redis_key(session.session_id)
-            data = self._serialize_session(session)
-            await self._redis.client.set(key, data, ex=self._ttl)
+            pipe = self._redis.client.pipeline(transaction=True)
+            self._queue_save(pipe, session, full=True)
+            pipe.delete(self._get_legacy_redis_key(session.session_id))
+            await pipe.execute()
         except Exception as e:
             logger.error(f"Failed to save session {session.session_id}: {str(e)}")
             raise SessionRepositoryError("Failed to save session")
 
+    async def save_many(self, sessions: List[StreamSession]) -> None:
+        """
+        Сохранить несколько сессий одним pipeline: HSET изменяемых полей,
+        неизменяемая часть - только если её ещё нет
+        """
+        if not sessions:
+            return
+        try:
+            pipe = self._redis.client.pipeline(transaction=False)
+            for session in sessions:
+                self._queue_save(pipe, session, full=False)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to save {len(sessions)} sessions: {str(e)}")
+            raise SessionRepositoryError("Failed to save sessions")
+
     async def delete(self, session_id: str) -> bool:
         """Удалить сессию (возвращает True если сессия существовала)"""
         try:
-            key = self._get_redis_key(session_id)
-            deleted = await self._redis.client.delete(key)
+            deleted = await self._redis.client.delete(
+                self._get_redis_key(session_id),
+                self._get_legacy_redis_key(session_id),
+            )
             return deleted > 0
         except Exception as e:
             logger.error(f"Failed to delete session {session_id}: {str(e)}")
@@ -65,7 +65,8 @@ class SessionEventConverters(BaseEventConverter):
         return BitrateChangedEventProto(
             session_id=event.session_id,
             new_bitrate=event.new_bitrate,
-            timestamp=SessionEventConverters._convert_datetime_to_proto(event.timestamp)
+            timestamp=SessionEventConverters._convert_datetime_to_proto(event.timestamp),
+            reason=event.reason,
         )
 
     @to_proto.register
@@ -18,7 +18,11 @@ from src.applications.use_cases.control_session import (
     StopSessionUseCase,
     ChangeSessionBitrateUseCase,
     ChangeSessionOffsetUseCase,
+    ChangeSessionChunkSizeUseCase,
+    DetachSessionUseCase,
 )
+from src.applications.use_cases.adapt_bitrate import AdaptBitrateUseCase
+from src.domain.stream.chunk_policy import NetworkType
 from src.core.protos.generated import streaming_pb2, streaming_pb2_grpc
 from src.domain.stream.models import StreamSession, StreamStatus, AudioChunk
 from src.core.exceptions import UnknownMessageReceived, AccessFail
@@ -27,13 +31,32 @@ from src.core.logger import logger
 from src.core.config import settings
 
 
-class _StreamRestartException(Exception):
-    """Требует перезапуска генератора чанков"""
-    pass
+class _StreamRepositioned(Exception):
+    """Позиция или битрейт сменились: клиенту нужен новый SessionInfo"""
+
+    def __init__(self, message: str = "", adaptive: bool = False):
+        """
+        :param adaptive: смена по решению ABR, а не по команде клиента
+        """
+        super().__init__(message)
+        self.adaptive = adaptive
 
 class _StreamCloseException(Exception):
     pass
 
+class _StreamDetachException(Exception):
+    """Клиент уходит без STOP: сессия остаётся в Redis для переподключения"""
+
+    def __init__(self, message: str, confirm: bool = False):
+        """
+        :param confirm: клиент ждёт SessionInfo после сохранения сессии (DETACH)
+        """
+        super().__init__(message)
+        self.confirm = confirm
+
+# Признак обрыва потока запросов в очереди сообщений (None - клиент закрыл поток штатно)
+_CLIENT_LOST = object()
+
 class StreamInitError(Exception):
     pass
 
@@ -50,7 +73,10 @@ class StreamingService(streaming_pb2_grpc.StreamingServiceServicer):
             stop_session_use_case:             StopSessionUseCase =             Provide[Container.get_stop_session_use_case],
             change_session_bitrate_use_case:   ChangeSessionBitrateUseCase =    Provide[Container.get_change_session_bitrate_use_case],
             change_session_offset_use_case:    ChangeSessionOffsetUseCase =     Provide[Container.get_change_session_offset_use_case],
-            update_session_use_case:           SaveSessionUseCase =             Provide[Container.get_save_session_use_case]
+            update_session_use_case:           SaveSessionUseCase =             Provide[Container.get_save_session_use_case],
+            change_session_chunk_size_use_case: ChangeSessionChunkSizeUseCase = Provide[Container.get_change_session_chunk_size_use_case],
+            detach_session_use_case:           DetachSessionUseCase =           Provide[Container.get_detach_session_use_case],
+            adapt_bitrate_use_case:            AdaptBitrateUseCase =            Provide[Container.get_adapt_bitrate_use_case],
         ):
 
         self._get_session_use_case = get_session_use_case
@@ -62,6 +88,9 @@ class StreamingService(streaming_pb2_grpc.StreamingServiceServicer):
         self._change_session_bitrate_use_case = change_session_bitrate_use_case
         self._change_session_offset_use_case = change_session_offset_use_case
         self._update_session_use_case = update_session_use_case
+        self._change_session_chunk_size_use_case = change_session_chunk_size_use_case
+        self._detach_session_use_case = detach_session_use_case
+        self._adapt_bitrate_use_case = adapt_bitrate_use_case
 
     async def StreamAudio(
             self, 
@@ -69,64 +98,126 @@ class StreamingService(streaming_pb2_grpc.StreamingServiceServicer):
             context: grpc.aio.ServicerContext
         ):
         session = None
+        finished = False
+        confirm_detach = False
+        chunk_generator = None
+        chunk_task = None
+        message_task = None
         try:
             logger.info(f"Connection received{context}")
             session = await self._init_session(request_iterator)
             yield self._create_session_info_message(session)
-            
+
+            # Ждём одновременно следующий чанк и следующее сообщение клиента:
+            # управление применяется сразу, а на паузе цикл спит без опроса очереди
             while session.is_active():
-                try:
+                if chunk_generator is None:
                     chunk_generator = self._get_chunk_generator_use_case.execute(
                         session=session
                     )
-                    
-                    async for chunk in chunk_generator:
-                        # Обрабатываем все накопленные сообщения
-                        if await self._is_connection_aborted(context):
-                            logger.info(f"Connection aborted for session {session.session_id}")
-                            return
-
-                        await self._process_client_messages(session)
-                        
-                        # Проверяем статус после обработки сообщений
-                        if not session.should_continue():
-                            if session.status == StreamStatus.PAUSED:
-                                await self._wait_for_resume(session, context)
-                            break
-                                
-                        # Отправляем чанк и обновляем состояние
-                        logger.debug(f"Chunks sent: {chunk.number}/{session.track.total_chunks - 1}, {chunk.number}")
-                        yield self._create_chunk_message(chunk)
-
-                        if session.should_stop():
-                            session.stop()
-                            break
-
-                        session.current_chunk = chunk.number + 1
-                        
-                        if session.total_chunks_sent % 30 == 0:
-                            await self._update_session_use_case.execute(session)
-
-                        if chunk.is_last:
-                            session.prestop()
-
-                except _StreamRestartException:
-                    yield self._create_session_info_message(session)
-                    continue  # Перезапускаем цикл с новыми параметрами audio streamer
+                if chunk_task is None:
+                    chunk_task = asyncio.ensure_future(anext(chunk_generator))
+                if message_task is None:
+                    message_task = asyncio.ensure_future(session.message_queue.get())
+
+                # На паузе готовый чанк остаётся в chunk_task до возобновления
+                waiting = {message_task}
+                if session.should_continue():
+                    waiting.add(chunk_task)
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+                if message_task in done:
+                    request = message_task.result()
+                    message_task = None
+                    try:
+                        await self._handle_message(request, session)
+                    except _StreamRepositioned as e:
+                        # Курсор переставлен на месте; чанк, прочитанный до этого, не отправляем
+                        if self._drop_ready_chunk(session, chunk_task):
+                            chunk_task = None
+                        yield self._create_session_info_message(session, adaptive=e.adaptive)
+                    continue
+
+                try:
+                    chunk = chunk_task.result()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    chunk_task = None
+
+                if await self._is_connection_aborted(context):
+                    logger.info(f"Connection aborted for session {session.session_id}")
+                    return
+
+                # Отправляем чанк и обновляем состояние
+                logger.debug(f"Chunks sent: {chunk.number}/{session.track.total_chunks - 1}, {chunk.number}")
+                yield self._create_chunk_message(chunk)
+
+                if session.should_stop():
+                    session.stop()
+                    break
+
+                session.current_chunk = chunk.number + 1
+
+                if session.total_chunks_sent % 30 == 0:
+                    await self._update_session_use_case.execute(session)
 
+                if chunk.is_last:
+                    session.prestop()
+
+            finished = True
             logger.warn(f"Session {session.session_id} finished")
         except _StreamCloseException:
+            finished = True
             logger.info(f"Stream for session {session.session_id} closed")
+        except _StreamDetachException as e:
+            confirm_detach = e.confirm
+            logger.info(f"Client detached from session {session.session_id}")
         except AccessFail as e:
             logger.error(f"No such file {str(e)}")
             await context.abort(StatusCode.NOT_FOUND, str(e))
         except Exception as e:
             await context.abort(StatusCode.INTERNAL, str(e))
         finally:
+            if message_task is not None:
+                message_task.cancel()
             if session:
-                await self._stop_session_use_case.execute(session)
-                yield self._create_session_info_message(session)
-                session.cleanup()
+                await self._close_chunk_generator(session, chunk_task, chunk_generator)
+                if finished:
+                    await self._stop_session_use_case.execute(session)
+                    yield self._create_session_info_message(session)
+                    session.cleanup()
+                else:
+                    # Обрыв, отмена RPC при остановке пода или ошибка: позиция
+                    # сохраняется, клиент переподключится к любой реплике
+                    try:
+                        await self._detach_session_use_case.execute(session)
+                        if confirm_detach:
+                            # Сессия записана: новый владелец может её открывать
+                            yield self._create_session_info_message(session)
+                    except Exception as e:
+                        logger.error(f"Failed to detach session {session.session_id}: {str(e)}")
+                if session.audio_streamer:
+                    await session.audio_streamer.close()
+
+    async def _close_chunk_generator(self, session: StreamSession, chunk_task, chunk_generator):
+        """Отменяет ожидание чанка и закрывает генератор"""
+        if chunk_task is not None:
+            self._drop_ready_chunk(session, chunk_task)
+            chunk_task.cancel()
+            await asyncio.gather(chunk_task, return_exceptions=True)
+        if chunk_generator is not None:
+            await chunk_generator.aclose()
+
+    def _drop_ready_chunk(self, session: StreamSession, chunk_task) -> bool:
+        """Отбрасывает готовый, но не отправленный чанк и возвращает занятый им кредит"""
+        if chunk_task is None or not chunk_task.done() or chunk_task.cancelled():
+            return False
+        if chunk_task.exception() is not None:
+            return False
+        session.credits.release(1)
+        session.total_chunks_sent -= 1
+        return True
 
     async def _is_connection_aborted(self, context) -> bool:
         return False
@@ -150,16 +241,14 @@ class StreamingService(streaming_pb2_grpc.StreamingServiceServicer):
             if start.HasField("session_id"):
                 session_id = start.session_id
 
-            await self._get_session_use_case._audio_streamer.initialize(
-                track_id=start.track_id,
-                initial_bitrate=start.bitrate,
-            )
-
             session = await self._get_session_use_case.execute(
                 track_id=start.track_id,
                 user_id=start.user_id,
                 bitrate=start.bitrate,
                 session_id=session_id,
+                network_type=self._convert_network_type(start.network_type),
+                preferred_chunk_size=start.preferred_chunk_size if start.HasField("preferred_chunk_size") else None,
+                resume_chunk=start.resume_chunk if start.HasField("resume_chunk") else None,
             )
             
             # Запускаем фоновую задачу чтения сообщений
@@ -177,14 +266,16 @@ class StreamingService(streaming_pb2_grpc.StreamingServiceServicer):
     def _create_chunk_message(self, chunk: AudioChunk) -> streaming_pb2.ServerMessage:
         return streaming_pb2.ServerMessage(
             chunk=streaming_pb2.AudioChunk(
-                data=chunk.data,
+                # Единственная копия данных чанка до сериализации: protobuf принимает только bytes
+                data=bytes(chunk.data),
                 number=chunk.number,
                 is_last=chunk.is_last,
                 bitrate=chunk.bitrate,
+                offset=chunk.offset,
             )
         )
 
-    def _create_session_info_message(self, session: StreamSession) -> streaming_pb2.ServerMessage:
+    def _create_session_info_message(self, session: StreamSession, adaptive: bool = False) -> streaming_pb2.ServerMessage:
         logger.info(f"Notifying client about session changes")
         return streaming_pb2.ServerMessage(
             session=streaming_pb2.SessionInfo(
@@ -195,9 +286,21 @@ class StreamingService(streaming_pb2_grpc.StreamingServiceServicer):
                 total_chunks=session.track.total_chunks,
                 chunk_size=session.chunk_size,
                 status=self._convert_status_proto(session.status),
+                credit_window=session.credits.size,
+                adaptive=adaptive,
             )
         )
 
+    def _convert_network_type(self, network_type) -> NetworkType:
+        if network_type == streaming_pb2.StartStream.NetworkType.WIFI:
+            return NetworkType.WIFI
+        elif network_type == streaming_pb2.StartStream.NetworkType.ETHERNET:
+            return NetworkType.ETHERNET
+        elif network_type == streaming_pb2.StartStream.NetworkType.CELLULAR:
+            return NetworkType.CELLULAR
+        else:
+            return NetworkType.UNKNOWN
+
     def _convert_status_proto(self, status: StreamStatus):
         if status == StreamStatus.PAUSED:
             return streaming_pb2.SessionInfo.Status.PAUSED
@@ -209,35 +312,32 @@ class StreamingService(streaming_pb2_grpc.StreamingServiceServicer):
 
     async def _read_client_messages(self, request_iterator, message_queue: asyncio.Queue):
         """Читает сообщения от клиента и помещает в очередь сессии"""
+        closed = False
         try:
             async for request in request_iterator:
                 logger.info(f"Received message: {request}")
                 await message_queue.put(request)
+            closed = True
         except Exception as e:
             logger.error(f"Error reading client messages: {str(e)}")
         finally:
+            # Штатное закрытие потока клиентом завершает сессию, обрыв - отсоединяет её
+            message_queue.put_nowait(None if closed else _CLIENT_LOST)
             logger.info(f"Client message reader stopped {message_queue.qsize()}")
 
 
-    async def _wait_for_resume(self, session: StreamSession, context):
-        while session.status == StreamStatus.PAUSED and session.is_active():
-            if await self._is_connection_aborted(context):
-                return
-                
-            await asyncio.sleep(0.5)
-            await self._process_client_messages(session)
-
-
-    async def _process_client_messages(self, session):
-        """Обрабатывает все сообщения в очереди"""
-        while not session.message_queue.empty():
-            request = await session.message_queue.get()
-            if request.HasField("control"):
-                await self._handle_control(request.control, session)
-            elif request.HasField("ack"):
-                await self._handle_ack(request.ack, session)
-            else:
-                raise UnknownMessageReceived(f"Received unknown msg: {request}")
+    async def _handle_message(self, request: streaming_pb2.ClientMessage, session: StreamSession):
+        """Обрабатывает сообщение клиента"""
+        if request is None:
+            raise _StreamCloseException("Client closed request stream")
+        if request is _CLIENT_LOST:
+            raise _StreamDetachException("Client request stream failed")
+        if request.HasField("control"):
+            await self._handle_control(request.control, session)
+        elif request.HasField("ack"):
+            await self._handle_ack(request.ack, session)
+        else:
+            raise UnknownMessageReceived(f"Received unknown msg: {request}")
 
     async def _handle_control(self, request: streaming_pb2.ClientMessage, session: StreamSession):
         try:
@@ -250,20 +350,34 @@ class StreamingService(streaming_pb2_grpc.StreamingServiceServicer):
             elif request.action == streaming_pb2.StreamControl.STOP:
                 # await self._stop_session_use_case.execute(session)
                 raise _StreamCloseException("Control action: STOP stream")
+
+            elif request.action == streaming_pb2.StreamControl.FLOW_PAUSE:
+                session.flow_pause()
+
+            elif request.action == streaming_pb2.StreamControl.FLOW_RESUME:
+                session.flow_resume()
+
+            elif request.action == streaming_pb2.StreamControl.DETACH:
+                raise _StreamDetachException("Control action: DETACH stream", confirm=True)
                 
             elif request.action == streaming_pb2.StreamControl.CHANGE_BITRATE:
-                await self._change_session_bitrate_use_case.execute(request.bitrate, session)
-                raise _StreamRestartException("Bitrate changed, chunk gen restart required")
+                reason = "congestion" if request.congestion else "manual"
+                await self._change_session_bitrate_use_case.execute(request.bitrate, session, reason=reason)
+                raise _StreamRepositioned("Bitrate changed")
             
             elif request.action == streaming_pb2.StreamControl.SEEK:
                 await self._change_session_offset_use_case.execute(request.chunk_num, session)
-                raise _StreamRestartException("Offset changed, chunk gen restart required")
+                raise _StreamRepositioned("Offset changed")
+
+            elif request.action == streaming_pb2.StreamControl.CHANGE_CHUNK_SIZE:
+                await self._change_session_chunk_size_use_case.execute(request.chunk_size, session)
+                raise _StreamRepositioned("Chunk size changed")
             
             else:
                 raise UnknownMessageReceived(f"Unknown control action: {request}")
         except _StreamCloseException:
             raise
-        except _StreamRestartException:
+        except (_StreamRepositioned, _StreamDetachException):
             raise
         except Exception as e:
             logger.error(f"Control action failed: {str(e)}")
@@ -271,7 +385,18 @@ class StreamingService(streaming_pb2_grpc.StreamingServiceServicer):
 
     
     async def _handle_ack(self, request, session):
-        await self._acknowledge_chunks_use_case.execute(request.received_count, session)
+        await self._acknowledge_chunks_use_case.execute(
+            request.received_count,
+            session,
+            last_chunk=request.last_chunk if request.HasField("last_chunk") else None,
+        )
+        switched = await self._adapt_bitrate_use_case.execute(
+            session,
+            queue_depth=request.queue_depth if request.HasField("queue_depth") else None,
+            send_latency_ms=request.send_latency_ms if request.HasField("send_latency_ms") else None,
+        )
+        if switched:
+            raise _StreamRepositioned("Bitrate adapted", True)
 
 
 
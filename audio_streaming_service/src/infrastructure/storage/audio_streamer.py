@@ -1,42 +1,131 @@
 import asyncio
+import mmap
 from typing import Generator, Optional, Union, List, AsyncGenerator
 from dependency_injector.wiring import inject, Provide
-from aiobotocore.session import get_session
+from botocore.exceptions import ClientError
 
 from src.core.logger import logger
 from src.core.exceptions import BitrateNotFound
 from src.core.exceptions import AccessFail
-from src.domain.stream.repository import AudioStreamer, AudioChunk
+from src.core.exceptions import StorageObjectChanged
+from src.domain.stream.repository import AudioStreamer, AudioStreamerFactory, AudioChunk
+from src.infrastructure.storage.prefetcher import PrefetchCancelled, RangePrefetcher
+from src.infrastructure.storage.buffer_pool import BufferPool
+from src.infrastructure.storage.s3_client import S3ClientManager
+from src.infrastructure.storage.disk_cache import DiskTrackCache
+from src.infrastructure.storage.metadata_cache import ObjectInfo, TrackMetadataCache, TrackObjects
+from src.infrastructure.storage.mp3_index import Mp3SeekIndex
+from src.infrastructure.storage.seek_index_cache import SeekIndexCache
 
 class ChunkSize:
+    LARGE: int = 131072
     DEFAULT: int = 32768
     SMALL: int = 16384
     MICRO: int = 8192
 
+class S3AudioStreamerFactory(AudioStreamerFactory):
+    """
+    Выдаёт каждой сессии собственный курсор S3AudioStreamer.
+    Все курсоры работают через один общий клиент S3 (и его пул соединений).
+    """
+
+    def __init__(
+        self,
+        s3: S3ClientManager,
+        bucket_name: str,
+        chunk_size: int = ChunkSize.MICRO,
+        path: str = "",
+        readahead_window: int = 0,
+        readahead_depth: int = 2,
+        disk_cache: Optional[DiskTrackCache] = None,
+        metadata_cache: Optional[TrackMetadataCache] = None,
+        seek_index_cache: Optional[SeekIndexCache] = None,
+        buffer_pool_max_idle: int = 64,
+    ):
+        """
+        :param s3: общий клиент S3/MinIO
+        :param bucket_name: имя бакета
+        :param chunk_size: размер чанка в байтах
+        :param path: базовый путь к трекам
+        :param readahead_window: размер окна read-ahead в байтах (0 - без read-ahead)
+        :param readahead_depth: количество окон, загружаемых впереди текущего
+        :param disk_cache: локальный кэш популярных треков (None - без кэша)
+        :param metadata_cache: кэш метаданных объектов трека (None - без кэша)
+        :param seek_index_cache: индексы перемотки MP3 (None - позиция по формуле CBR)
+        :param buffer_pool_max_idle: сколько свободных буферов окон держать для переиспользования
+        """
+        self._s3 = s3
+        self.bucket_name = bucket_name
+        self._chunk_size = chunk_size
+        self.path = path
+        self._readahead_window = readahead_window
+        self._readahead_depth = readahead_depth
+        self._disk_cache = disk_cache
+        self._metadata_cache = metadata_cache
+        self._seek_index_cache = seek_index_cache
+        window = S3AudioStreamer._align_window(readahead_window, chunk_size)
+        # Общий для всех курсоров пул буферов под окна read-ahead
+        self._buffer_pool = BufferPool(window, max_idle=buffer_pool_max_idle) if window else None
+
+    def create(self) -> "S3AudioStreamer":
+        return S3AudioStreamer(
+            s3=self._s3,
+            bucket_name=self.bucket_name,
+            chunk_size=self._chunk_size,
+            path=self.path,
+            readahead_window=self._readahead_window,
+            readahead_depth=self._readahead_depth,
+            disk_cache=self._disk_cache,
+            metadata_cache=self._metadata_cache,
+            seek_index_cache=self._seek_index_cache,
+            buffer_pool=self._buffer_pool,
+        )
+
+
 class S3AudioStreamer(AudioStreamer):
+    """
+    Курсор по объекту трека в S3/MinIO. Хранит позицию одной сессии,
+    поэтому экземпляр создаётся на каждую сессию через S3AudioStreamerFactory.
+    """
+
+    READ_BLOCK_SIZE = 64 * 1024  # чтение тела ответа S3 в буфер окна
+
     def __init__(
         self,
+        s3: S3ClientManager,
         bucket_name: str,
-        aws_access_key_id: str,
-        aws_secret_access_key: str,
-        endpoint_url: str,
         chunk_size: int = ChunkSize.MICRO,
         path: str = "",
+        readahead_window: int = 0,
+        readahead_depth: int = 2,
+        disk_cache: Optional[DiskTrackCache] = None,
+        metadata_cache: Optional[TrackMetadataCache] = None,
+        seek_index_cache: Optional[SeekIndexCache] = None,
+        buffer_pool: Optional[BufferPool] = None,
     ):
         """
+        :param s3: общий клиент S3/MinIO
         :param bucket_name: имя бакета
-        :param aws_access_key_id: AWS access key (или MinIO access key)
-        :param aws_secret_access_key: AWS secret key (или MinIO secret key)
-        :param endpoint_url: URL endpoint S3/MinIO
         :param chunk_size: размер чанка в байтах
         :param path: базовый путь к трекам
+        :param readahead_window: размер окна read-ahead в байтах (0 - без read-ahead)
+        :param readahead_depth: количество окон, загружаемых впереди текущего
+        :param disk_cache: локальный кэш популярных треков (None - без кэша)
+        :param metadata_cache: кэш метаданных объектов трека (None - без кэша)
+        :param seek_index_cache: индексы перемотки MP3 (None - позиция по формуле CBR)
+        :param buffer_pool: пул буферов под окна read-ahead (None - новый буфер на окно)
         """
+        self._s3 = s3
+        self._disk_cache = disk_cache
+        self._metadata_cache = metadata_cache
+        self._seek_index_cache = seek_index_cache
         self.bucket_name = bucket_name
         self._chunk_size = chunk_size
         self.path = path
-        self.aws_access_key_id = aws_access_key_id
-        self.aws_secret_access_key = aws_secret_access_key 
-        self.endpoint_url = endpoint_url
+        self._requested_window = readahead_window
+        self._readahead_window = self._align_window(readahead_window, chunk_size)
+        self._readahead_depth = readahead_depth
+        self._buffer_pool = buffer_pool
         
         # Поля, которые будут инициализированы после вызова initialize()
         self.track_id: Optional[str] = None
@@ -44,30 +133,28 @@ class S3AudioStreamer(AudioStreamer):
         self.available_bitrates: List[str] = []
         self.object_stat = None
         self.object_size = 0
+        self.object_etag: Optional[str] = None
         self.duration_seconds = 0.0
         self.current_offset = 0
         self.chunk_counter = 0
         self._initialized = False
-        self._s3_client = None
-
-    async def _get_client(self):
-        """Ленивая инициализация клиента"""
-        if self._s3_client is None:
-            session = get_session()
-            self._s3_client = await session.create_client(
-                's3',
-                aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key,
-                endpoint_url=self.endpoint_url,
-                region_name='us-east-1',
-            ).__aenter__()
-        return self._s3_client
+        self._objects: TrackObjects = {}
+        self._position_version = 0
+        self._prefetcher: Optional[RangePrefetcher] = None
+        self._mapped: Optional[mmap.mmap] = None  # объект из дискового кэша
+        self._seek_index: Optional[Mp3SeekIndex] = None
+
+    @staticmethod
+    def _align_window(window: int, chunk_size: int) -> int:
+        """Выравнивает окно read-ahead вверх до целого числа чанков"""
+        if window <= 0:
+            return 0
+        return max(1, (window + chunk_size - 1) // chunk_size) * chunk_size
 
     async def close(self):
-        """Закрытие клиента"""
-        if self._s3_client is not None:
-            await self._s3_client.close()
-            self._s3_client = None
+        """Освобождает ресурсы курсора (общий клиент остаётся открытым)"""
+        self._release_object()
+        self._initialized = False
 
 
     async def initialize(self, track_id: str, initial_bitrate: str) -> None:
@@ -87,87 +174,293 @@ class S3AudioStreamer(AudioStreamer):
         if not self._initialized:
             raise RuntimeError("AsyncS3AudioStreamer not initialized. Call initialize() first")
 
-    def _get_object_name(self) -> str:
+    def _get_object_name(self, bitrate: Optional[str] = None) -> str:
         """Генерирует имя объекта в S3/MinIO"""
-        return f"{self.path}/{self.track_id}/{self.current_bitrate}.mp3"
+        return f"{self.path}/{self.track_id}/{bitrate or self.current_bitrate}.mp3"
 
     async def _refresh_object_info(self):
         self.object_name = self._get_object_name()
         try:
-            client = await self._get_client()
-            self.available_bitrates = await self.get_bitrates()
-            
-            head_response = await client.head_object(
-                Bucket=self.bucket_name,
-                Key=self.object_name
-            )
-            
-            self.object_size = head_response['ContentLength']
-            self.duration_seconds = float(head_response.get(
-                'Metadata', {}
-            ).get('duration', self._estimate_duration()))
-            
+            objects = await self._get_track_objects()
+            objects[self.current_bitrate]
         except Exception as e:
             logger.warning(f"No such file {self.object_name}")
             raise AccessFail(f"Error accessing {self.object_name}: {str(e)}")
 
-    def _estimate_duration(self) -> float:
+        self._objects = objects
+        self.available_bitrates = self._sort_bitrates(objects)
+        await self._open_object()
+
+    async def _open_object(self, position: Optional[float] = None):
+        """
+        Переключает курсор на объект текущего битрейта по уже загруженным метаданным
+
+        :param position: позиция в секундах, на которую встать в новом объекте
+        """
+        self.object_name = self._get_object_name()
+        info = self._objects[self.current_bitrate]
+        self.object_size = info.size
+        self.object_etag = info.etag
+        self.duration_seconds = info.duration
+
+        # До первого await: чтение, начатое по старому объекту, должно увидеть
+        # смену версии, а не ошибку отменённого окна
+        self._release_object()
+        self._seek_index = None
+        if position is not None:
+            self.set_current_time(position)
+        self._position_version += 1
+
+        if self._seek_index_cache is not None:
+            self._seek_index = await self._seek_index_cache.get(self.object_name, self.object_etag)
+
+        if self._disk_cache is not None:
+            await self._attach_disk_cache()
+
+        self._create_prefetcher()
+
+    def _create_prefetcher(self):
+        if self._mapped is None and self._readahead_window:
+            pool = self._buffer_pool
+            if pool is not None and pool.buffer_size != self._readahead_window:
+                pool = None
+            self._prefetcher = RangePrefetcher(
+                fetch=self._fetch_range_into,
+                object_size=self.object_size,
+                window_size=self._readahead_window,
+                depth=self._readahead_depth,
+                pool=pool,
+            )
+
+    async def _attach_disk_cache(self):
+        """
+        Открывает объект из дискового кэша или ставит его на загрузку, если он популярен.
+        Индекс перемотки строится только из этих же байт: ради него объект из S3 не читается
+        """
+        object_name, size, etag = self.object_name, self.object_size, self.object_etag
+        self._mapped = self._disk_cache.open(object_name, size)
+        if self._mapped is not None:
+            self._build_seek_index(object_name, etag, lambda: asyncio.to_thread(self._disk_cache.read, object_name))
+            return
+        if not size:
+            return
+
+        if await self._disk_cache.should_admit(object_name):
+            async def download() -> bytes:
+                data = await self._s3.call("get_object", self._get_range(object_name, 0, size - 1, etag))
+
+                async def downloaded() -> bytes:
+                    return data
+
+                self._build_seek_index(object_name, etag, downloaded)
+                return data
+
+            self._disk_cache.admit(object_name, size, download)
+
+    def _build_seek_index(self, object_name: str, etag: Optional[str], load) -> None:
+        """Ставит индекс перемотки на сборку в фоне, если его ещё нет"""
+        if self._seek_index_cache is not None and self._seek_index_cache.peek(object_name, etag) is None:
+            self._seek_index_cache.build(object_name, etag, load)
+
+    def _current_index(self) -> Optional[Mp3SeekIndex]:
+        """Индекс текущего объекта, если он уже построен (в том числе после открытия)"""
+        if self._seek_index is None and self._seek_index_cache is not None:
+            self._seek_index = self._seek_index_cache.peek(self.object_name, self.object_etag)
+        return self._seek_index
+
+    def _release_object(self):
+        """Отменяет read-ahead и закрывает mmap предыдущего объекта"""
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+        if self._mapped is not None:
+            try:
+                self._mapped.close()
+            except BufferError:
+                pass  # на mmap ещё ссылаются чанки: закроется сборщиком мусора
+            self._mapped = None
+
+    @staticmethod
+    def _estimate_duration(object_size: int, bitrate: str) -> float:
         """Оценивает длительность на основе битрейта и размера файла"""
-        bitrate_kbps = int(self.current_bitrate)
-        return (self.object_size * 8) / (bitrate_kbps * 1000)
-    
+        bitrate_kbps = int(bitrate)
+        return (object_size * 8) / (bitrate_kbps * 1000)
+
+    @staticmethod
+    def _sort_bitrates(objects: TrackObjects) -> List[str]:
+        return sorted(objects, key=lambda x: int(x), reverse=True)
+
+    async def _get_track_objects(self) -> TrackObjects:
+        """Метаданные всех битрейтов трека: из кэша или одним LIST + HEAD по объектам"""
+        if self._metadata_cache is None:
+            return await self._load_track_objects()
+
+        objects = await self._metadata_cache.get_or_load(self.track_id, self._load_track_objects)
+        if self.current_bitrate not in objects:
+            # Битрейт мог появиться после заполнения кэша; чаще refresh_interval трек не перечитывается
+            objects = await self._metadata_cache.refresh(self.track_id, self._load_track_objects)
+        return objects
+
+    async def _load_track_objects(self) -> TrackObjects:
+        track_id, requested_bitrate = self.track_id, self.current_bitrate
+        try:
+            bitrates = await self._s3.call("list_objects_v2", self._list_bitrates(track_id))
+        except Exception as e:
+            logger.info(f"Error getting available bitrates: {str(e)}")
+            bitrates = []
+        if requested_bitrate and requested_bitrate not in bitrates:
+            bitrates.append(requested_bitrate)
+
+        heads = await asyncio.gather(
+            *(
+                self._s3.call(
+                    "head_object",
+                    self._s3.client.head_object(
+                        Bucket=self.bucket_name,
+                        Key=f"{self.path}/{track_id}/{bitrate}.mp3",
+                    ),
+                )
+                for bitrate in bitrates
+            ),
+            return_exceptions=True,
+        )
+
+        objects: TrackObjects = {}
+        for bitrate, head in zip(bitrates, heads):
+            if isinstance(head, BaseException):
+                if bitrate == requested_bitrate:
+                    raise head
+                continue
+            size = head['ContentLength']
+            objects[bitrate] = ObjectInfo(
+                size=size,
+                duration=float(head.get('Metadata', {}).get(
+                    'duration', self._estimate_duration(size, bitrate)
+                )),
+                etag=head.get('ETag', ''),
+            )
+        return objects
+
     async def get_bitrates(self) -> List[str]:
         try:
-            client = await self._get_client()
-            prefix = f"{self.path}{self.track_id}/"
-            
-            paginator = client.get_paginator('list_objects_v2')
-            async for result in paginator.paginate(
-                Bucket=self.bucket_name,
-                Prefix=prefix,
-                Delimiter='/'
-            ):
-                bitrates = []
-                for obj in result.get('Contents', []):
-                    key = obj['Key']
-                    if key.endswith('.mp3'):
-                        filename = key.split('/')[-1]
-                        bitrate = filename.replace('.mp3', '')
-                        if bitrate.isdigit():
-                            bitrates.append(bitrate)
-                
-                return sorted(bitrates, key=lambda x: int(x), reverse=True)
-            
-            return []
+            return self._sort_bitrates(await self._get_track_objects())
         except Exception as e:
             logger.info(f"Error getting available bitrates: {str(e)}")
             return []
 
+    async def _list_bitrates(self, track_id: str) -> List[str]:
+        prefix = f"{self.path}{track_id}/"
+
+        paginator = self._s3.client.get_paginator('list_objects_v2')
+        async for result in paginator.paginate(
+            Bucket=self.bucket_name,
+            Prefix=prefix,
+            Delimiter='/'
+        ):
+            bitrates = []
+            for obj in result.get('Contents', []):
+                key = obj['Key']
+                if key.endswith('.mp3'):
+                    filename = key.split('/')[-1]
+                    bitrate = filename.replace('.mp3', '')
+                    if bitrate.isdigit():
+                        bitrates.append(bitrate)
+
+            return bitrates
+
+        return []
+
     async def switch_bitrate(self, new_bitrate: str):
         """
         Переключает битрейт с сохранением временной позиции
         
         :param new_bitrate: новый битрейт ('128k', '320k' и т.д.)
         """
+        await self.retarget(new_bitrate)
+
+    async def retarget(self, new_bitrate: str) -> int:
+        """
+        Переключает битрейт на лету: метаданные берутся из уже загруженных,
+        без LIST/HEAD; сбрасываются только окна read-ahead старого объекта.
+        Работающий chunks() продолжает с новой позиции.
+
+        :param new_bitrate: новый битрейт ('128k', '320k' и т.д.)
+        :return: номер следующего чанка
+        """
         self._validate_initialized()
         if new_bitrate == self.current_bitrate:
-            return
+            return self.current_offset // self._chunk_size
 
         logger.info(f"Current position in file: {self.current_offset}")
 
-        if new_bitrate not in self.available_bitrates:
+        if new_bitrate not in self._objects:
             raise BitrateNotFound("No such bitrate found")
 
         # Сохраняем текущую позицию в секундах
         current_time = self.get_current_time()
         
-        # Переключаемся на новый битрейт
+        # Переключаемся на новый битрейт; до конца переключения chunks()
+        # читает уже новый объект с примерной позиции
         self.current_bitrate = new_bitrate
-        await self._refresh_object_info()
-        
-        # Восстанавливаем позицию в новом файле
+        await self._open_object(position=current_time)
+
+        # Окончательная позиция (по индексу перемотки, если он подгрузился);
+        # чанк, прочитанный во время переключения, вызывающий отбрасывает
         self.set_current_time(current_time)
+        self._position_version += 1
         logger.info(f"Updated position in file: {self.current_offset}")
+        return self.current_offset // self._chunk_size
+
+    def reposition(self, chunk_num: int) -> int:
+        """
+        Переставляет курсор на чанк. Окна read-ahead, попадающие
+        в новую позицию, переиспользуются; работающий chunks() продолжает с неё.
+
+        :param chunk_num: номер чанка (за концом трека - конец трека)
+        :return: номер следующего чанка
+        """
+        self._validate_initialized()
+        chunk_num = max(0, min(chunk_num, self.total_chunks))
+        offset = min(chunk_num * self._chunk_size, self.object_size)
+
+        # Начинаем с границы фрейма, а не с середины
+        index = self._current_index()
+        if index is not None and offset < self.object_size:
+            offset = index.frame_start(offset)
+
+        self.current_offset = offset
+        self._position_version += 1
+        return offset // self._chunk_size
+
+    def resize(self, chunk_size: int) -> int:
+        """
+        Меняет размер чанка на лету. Позиция в байтах сохраняется,
+        номера чанков дальше считаются как offset // chunk_size.
+
+        :param chunk_size: новый размер чанка в байтах
+        :return: номер следующего чанка
+        """
+        self._validate_initialized()
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        if chunk_size == self._chunk_size:
+            return self.current_offset // chunk_size
+
+        self._chunk_size = chunk_size
+        window = self._align_window(self._requested_window, chunk_size)
+        if window != self._readahead_window:
+            self._readahead_window = window
+            if self._prefetcher is not None:
+                self._prefetcher.close()
+                self._prefetcher = None
+            self._create_prefetcher()
+
+        self._position_version += 1
+        return self.current_offset // chunk_size
+
+    @property
+    def position_version(self) -> int:
+        return self._position_version
 
     def get_current_time(self) -> float:
         """
@@ -176,6 +469,10 @@ class S3AudioStreamer(AudioStreamer):
         :return: позиция в секундах с плавающей точкой
         """
         self._validate_initialized()
+        index = self._current_index()
+        if index is not None:
+            return index.time_at(self.current_offset)
+
         bitrate_kbps = int(self.current_bitrate)
         bytes_per_second = (bitrate_kbps * 1000) / 8
         return self.current_offset / bytes_per_second
@@ -188,15 +485,23 @@ class S3AudioStreamer(AudioStreamer):
         """
         self._validate_initialized()
 
-        bitrate_kbps = int(self.current_bitrate)
-        bytes_per_second = (bitrate_kbps * 1000) / 8
-        new_offset = int(seconds * bytes_per_second)
+        index = self._current_index()
+        if index is not None:
+            # Смещение начала фрейма: точно и для VBR
+            new_offset = index.offset_at(seconds)
+        else:
+            bitrate_kbps = int(self.current_bitrate)
+            bytes_per_second = (bitrate_kbps * 1000) / 8
+            new_offset = int(seconds * bytes_per_second)
         
         # Обеспечиваем, чтобы позиция была в пределах файла
         self.current_offset = max(0, min(new_offset, self.object_size - 1))
 
-    async def read_chunk(self, offset: Optional[Union[int, float]] = None) -> bytes:
-        """Читает один чанк с текущей позиции без изменения состояния"""
+    async def read_chunk(self, offset: Optional[Union[int, float]] = None) -> Union[bytes, memoryview]:
+        """
+        Читает один чанк с текущей позиции без изменения состояния.
+        Из окна read-ahead или mmap чанк отдаётся memoryview без копирования
+        """
         self._validate_initialized()
 
         if offset is not None:
@@ -208,20 +513,104 @@ class S3AudioStreamer(AudioStreamer):
         if self.current_offset >= self.object_size:
             return b''
 
+        for attempt in range(2):
+            try:
+                return await self._read_current_chunk()
+            except StorageObjectChanged as e:
+                if attempt:
+                    raise RuntimeError(f"Error reading chunk: {str(e)}")
+                logger.info(f"{self.object_name} was replaced in storage, reloading metadata")
+                await self._reload_object_info()
+            except PrefetchCancelled:
+                raise
+            except Exception as e:
+                raise RuntimeError(f"Error reading chunk: {str(e)}")
+
+    async def _read_current_chunk(self) -> Union[bytes, memoryview]:
+        # Читаем до границы чанка: после перемотки на фрейм или смены размера
+        # первый чанк короче, зато номер чанка всегда равен offset // chunk_size
+        length = self._chunk_size - self.current_offset % self._chunk_size
+
+        if self._mapped is not None:
+            return memoryview(self._mapped)[self.current_offset:self.current_offset + length]
+
+        if self._prefetcher is not None:
+            return await self._prefetcher.read(self.current_offset, length)
+
+        range_end = min(self.current_offset + length - 1, self.object_size - 1)
+        return await self._fetch_range(self.current_offset, range_end)
+
+    async def _reload_object_info(self):
+        """Перечитывает метаданные, минуя кэш (объект перезалили)"""
+        if self._metadata_cache is not None:
+            await self._metadata_cache.invalidate(self.track_id)
+        await self._refresh_object_info()
+
+    async def _fetch_range(self, start: int, end: int) -> bytes:
+        """Читает диапазон байт [start, end] текущего объекта одним GET"""
+        return await self._s3.call(
+            "get_object",
+            self._get_range(self.object_name, start, end, self.object_etag),
+        )
+
+    async def _fetch_range_into(self, start: int, end: int, buffer: bytearray) -> int:
+        """Читает диапазон байт [start, end] текущего объекта в buffer одним GET"""
+        return await self._s3.call(
+            "get_object",
+            self._get_range_into(self.object_name, start, end, buffer, self.object_etag),
+        )
+
+    async def _get_range(self, object_name: str, start: int, end: int, etag: Optional[str] = None) -> bytes:
+        response = await self._open_range(object_name, start, end, etag)
+        async with response['Body'] as stream:
+            return await stream.read()
+
+    async def _get_range_into(
+        self,
+        object_name: str,
+        start: int,
+        end: int,
+        buffer: bytearray,
+        etag: Optional[str] = None,
+    ) -> int:
+        """Range GET прямо в buffer, без склейки тела ответа в новый bytes"""
+        response = await self._open_range(object_name, start, end, etag)
+        view = memoryview(buffer)
+        filled = 0
         try:
-            client = await self._get_client()
-            range_end = min(self.current_offset + self.chunk_size - 1, self.object_size - 1)
-            response = await client.get_object(
+            async with response['Body'] as stream:
+                while True:
+                    part = await stream.read(self.READ_BLOCK_SIZE)
+                    if not part:
+                        break
+                    if filled + len(part) > len(view):
+                        raise ValueError(f"Range {start}-{end} of {object_name} does not fit into buffer")
+                    view[filled:filled + len(part)] = part
+                    filled += len(part)
+        finally:
+            view.release()
+        return filled
+
+    async def _open_range(self, object_name: str, start: int, end: int, etag: Optional[str] = None):
+        """
+        Range GET; с etag запрос выполняется только для той версии объекта,
+        метаданные которой закэшированы
+        """
+        params = {}
+        if etag:
+            params['IfMatch'] = etag
+        try:
+            response = await self._s3.client.get_object(
                 Bucket=self.bucket_name,
-                Key=self.object_name,
-                Range=f"bytes={self.current_offset}-{range_end}"
+                Key=object_name,
+                Range=f"bytes={start}-{end}",
+                **params,
             )
-            
-            async with response['Body'] as stream:
-                return await stream.read()
-                
-        except Exception as e:
-            raise RuntimeError(f"Error reading chunk: {str(e)}")
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('PreconditionFailed', '412'):
+                raise StorageObjectChanged(f"{object_name} changed since metadata was cached")
+            raise
+        return response
 
     def seek(self, offset_bytes: int):
         """
@@ -234,6 +623,7 @@ class S3AudioStreamer(AudioStreamer):
         if not 0 <= offset_bytes < self.object_size:
             raise ValueError(f"Offset must be between 0 and {self.object_size - 1}")
         self.current_offset = offset_bytes
+        self._position_version += 1
         logger.warn(f"current offset switched to {self.current_offset}")
         
     async def chunks(self, start_pos: Union[int, float, None] = None) -> AsyncGenerator[AudioChunk, None]:
@@ -246,37 +636,49 @@ class S3AudioStreamer(AudioStreamer):
         elif isinstance(start_pos, int):
             self.seek(start_pos)
 
-        chunk_number = self.current_offset // self.chunk_size
-        remaining_bytes = self.object_size - self.current_offset
+        # Позиция и битрейт могут смениться между чанками (reposition/retarget),
+        # поэтому номер чанка каждый раз считается от текущего смещения
+        while True:
+            while self.current_offset < self.object_size:
+                version = self._position_version
+                chunk_number = self.current_offset // self.chunk_size
+                try:
+                    chunk_data = await self.read_chunk()  # Читаем без изменения offset
+                except PrefetchCancelled:
+                    continue  # окно отменено (смена объекта или вытеснение) - читаем заново с текущей позиции
+                except Exception:
+                    if version != self._position_version:
+                        continue  # чтение прервано сменой объекта
+                    raise
+                if version != self._position_version:
+                    continue  # прочитано со старой позиции
+                if not chunk_data:
+                    break
 
-        while remaining_bytes > 0:
-            chunk_data = await self.read_chunk()  # Читаем без изменения offset
-            if not chunk_data:
-                break
+                chunk_offset = self.current_offset
+                self.current_offset += len(chunk_data)
                 
-            # Фиксируем текущую позицию для этого чанка
-            chunk_start = self.current_offset
-            self.current_offset += len(chunk_data)
-            
-            is_last = (self.current_offset >= self.object_size)
-            
+                is_last = (self.current_offset >= self.object_size)
+                
+                yield AudioChunk(
+                    data=chunk_data,
+                    number=chunk_number,
+                    is_last=is_last,
+                    bitrate=self.current_bitrate,
+                    offset=chunk_offset,
+                )
+
+            # last artificial chunk
+            version = self._position_version
             yield AudioChunk(
-                data=chunk_data,
-                number=chunk_number,
-                is_last=is_last,
+                data=b"",
+                number=self.total_chunks,
+                is_last=False,
                 bitrate=self.current_bitrate,
+                offset=self.object_size,
             )
-            await asyncio.sleep(.025)
-            chunk_number += 1
-            remaining_bytes = self.object_size - self.current_offset
-
-        # last artificial chunk
-        yield AudioChunk(
-            data=b"",
-            number=chunk_number,
-            is_last=False,
-            bitrate=self.current_bitrate
-        )
+            if version == self._position_version:
+                return
 
     @property
     def bitrate(self) -> str:
@@ -288,6 +690,9 @@ class S3AudioStreamer(AudioStreamer):
     def duration(self) -> float:
         """Возвращает длительность трека в секундах"""
         self._validate_initialized()
+        index = self._current_index()
+        if index is not None:
+            return index.duration
         return self.duration_seconds
     
     @property
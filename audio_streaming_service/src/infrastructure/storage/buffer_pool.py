@@ -0,0 +1,74 @@
+import weakref
+from typing import List, Optional
+
+
+class BufferLease:
+    """
+    Владение буфером окна read-ahead со счётчиком ссылок.
+
+    Одну ссылку держит prefetcher, пока окно у него, ещё по одной - каждый
+    отданный срез (чанк). Ссылка среза отпускается, когда срез собран
+    сборщиком мусора; после последней буфер возвращается в пул. Срезы
+    потребители копируют (bytes) и не дробят дальше.
+    """
+
+    def __init__(self, buffer: bytearray, pool: Optional["BufferPool"] = None):
+        """
+        :param buffer: буфер окна
+        :param pool: пул, куда вернуть буфер (None - отпустить сборщику мусора)
+        """
+        self.buffer = buffer
+        self._pool = pool
+        self._refs = 1
+
+    @property
+    def refs(self) -> int:
+        return self._refs
+
+    def view(self, start: int, end: int) -> memoryview:
+        """Срез буфера [start, end) без копирования; держит буфер, пока жив"""
+        view = memoryview(self.buffer)[start:end]
+        self._refs += 1
+        weakref.finalize(view, self.release)
+        return view
+
+    def release(self) -> None:
+        """Отпускает одну ссылку"""
+        self._refs -= 1
+        if self._refs == 0 and self._pool is not None:
+            self._pool.release(self.buffer)
+
+
+class BufferPool:
+    """
+    Пул переиспользуемых bytearray под окна read-ahead.
+
+    Буфер выдаётся в аренду (BufferLease) и возвращается в пул, когда
+    отпущены окно и все отданные из него чанки.
+    """
+
+    def __init__(self, buffer_size: int, max_idle: int = 128):
+        """
+        :param buffer_size: размер буфера в байтах
+        :param max_idle: сколько свободных буферов держать в пуле
+        """
+        self._buffer_size = buffer_size
+        self._max_idle = max_idle
+        self._idle: List[bytearray] = []
+
+    @property
+    def buffer_size(self) -> int:
+        return self._buffer_size
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def lease(self) -> BufferLease:
+        buffer = self._idle.pop() if self._idle else bytearray(self._buffer_size)
+        return BufferLease(buffer, self)
+
+    def release(self, buffer: bytearray) -> None:
+        if len(self._idle) >= self._max_idle or len(buffer) != self._buffer_size:
+            return
+        self._idle.append(buffer)
@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import mmap
+import os
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.core.logger import logger
+from src.core.monitoring.metrics import (
+    DISK_CACHE_HITS,
+    DISK_CACHE_MISSES,
+    DISK_CACHE_EVICTIONS,
+    DISK_CACHE_BYTES,
+)
+from src.infrastructure.database.redis_client import RedisClient
+from src.infrastructure.database.redis_repository import CacheTTL
+
+
+class DiskTrackCache:
+    """
+    LRU-кэш целых объектов {path}/{track_id}/{bitrate}.mp3 на локальном диске.
+
+    Объект попадает в кэш, когда его открыли не меньше admission_threshold раз
+    за окно популярности (CacheTTL.POPULAR). Счётчик живёт в Redis и поэтому
+    общий для всех подов. Чтение из кэша идёт через mmap.
+    """
+
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        cache_dir: str,
+        max_bytes: int,
+        admission_threshold: int = 3,
+        popularity_ttl: int = CacheTTL.POPULAR,
+    ):
+        """
+        :param redis_client: клиент Redis для счётчиков популярности
+        :param cache_dir: директория кэша
+        :param max_bytes: предельный размер кэша в байтах
+        :param admission_threshold: сколько открытий нужно для попадания в кэш
+        :param popularity_ttl: окно подсчёта популярности в секундах
+        """
+        self._redis = redis_client
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        self._admission_threshold = admission_threshold
+        self._popularity_ttl = popularity_ttl
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # file name -> size, в порядке LRU
+        self._total_bytes = 0
+        self._downloads: Dict[str, asyncio.Task] = {}
+
+    def load(self) -> None:
+        """Поднимает индекс по уже лежащим на диске файлам (старые - первыми на вытеснение)"""
+        os.makedirs(self._cache_dir, exist_ok=True)
+        files = []
+        for entry in os.scandir(self._cache_dir):
+            if entry.is_file() and entry.name.endswith(".mp3"):
+                stat = entry.stat()
+                files.append((stat.st_atime, entry.name, stat.st_size))
+
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+        self._evict()
+        DISK_CACHE_BYTES.set(self._total_bytes)
+        logger.info(f"Disk track cache loaded: {len(self._entries)} objects, {self._total_bytes} bytes")
+
+    @staticmethod
+    def _file_name(object_name: str) -> str:
+        return hashlib.sha1(object_name.encode()).hexdigest() + ".mp3"
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self._cache_dir, file_name)
+
+    def open(self, object_name: str, expected_size: int) -> Optional[mmap.mmap]:
+        """
+        Отображает закэшированный объект в память
+
+        :param object_name: ключ объекта в S3
+        :param expected_size: размер объекта в S3; при расхождении копия считается устаревшей
+        :return: mmap только для чтения или None при промахе
+        """
+        file_name = self._file_name(object_name)
+        size = self._entries.get(file_name)
+        if size is None:
+            DISK_CACHE_MISSES.inc()
+            return None
+
+        if size != expected_size or size == 0:
+            self._remove(file_name)
+            DISK_CACHE_MISSES.inc()
+            return None
+
+        try:
+            with open(self._path(file_name), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError as e:
+            logger.warning(f"Disk cache entry {file_name} is unreadable: {str(e)}")
+            self._remove(file_name)
+            DISK_CACHE_MISSES.inc()
+            return None
+
+        self._entries.move_to_end(file_name)
+        DISK_CACHE_HITS.inc()
+        return mapped
+
+    def read(self, object_name: str) -> bytes:
+        """Содержимое закэшированного объекта целиком (блокирующее чтение, вызывать в потоке)"""
+        with open(self._path(self._file_name(object_name)), "rb") as f:
+            return f.read()
+
+    async def should_admit(self, object_name: str) -> bool:
+        """Учитывает открытие объекта и решает, стоит ли класть его в кэш"""
+        key = f"track_popularity:{object_name}"
+        try:
+            count = await self._redis.client.incr(key)
+            if count == 1:
+                await self._redis.client.expire(key, self._popularity_ttl)
+        except Exception as e:
+            logger.warning(f"Failed to update popularity for {object_name}: {str(e)}")
+            return False
+        return count >= self._admission_threshold
+
+    def admit(self, object_name: str, size: int, download: Callable[[], Awaitable[bytes]]) -> None:
+        """
+        Загружает объект в кэш в фоне (не более одной загрузки на объект)
+
+        :param object_name: ключ объекта в S3
+        :param size: размер объекта в байтах
+        :param download: корутина, читающая объект целиком
+        """
+        file_name = self._file_name(object_name)
+        if file_name in self._entries or file_name in self._downloads or size > self._max_bytes:
+            return
+        task = asyncio.create_task(self._store(file_name, size, download))
+        self._downloads[file_name] = task
+        task.add_done_callback(lambda _: self._downloads.pop(file_name, None))
+
+    async def _store(self, file_name: str, size: int, download: Callable[[], Awaitable[bytes]]) -> None:
+        try:
+            data = await download()
+            if len(data) != size:
+                raise ValueError(f"expected {size} bytes, got {len(data)}")
+            await asyncio.to_thread(self._write, file_name, data)
+        except Exception as e:
+            logger.warning(f"Failed to cache {file_name}: {str(e)}")
+            return
+
+        self._entries[file_name] = size
+        self._total_bytes += size
+        self._evict()
+        DISK_CACHE_BYTES.set(self._total_bytes)
+
+    def _write(self, file_name: str, data: bytes) -> None:
+        os.makedirs(self._cache_dir, exist_ok=True)
+        tmp_path = self._path(file_name) + ".part"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(file_name))
+
+    def _remove(self, file_name: str) -> None:
+        size = self._entries.pop(file_name, 0)
+        self._total_bytes -= size
+        try:
+            # Уже открытые mmap остаются валидными после unlink
+            os.unlink(self._path(file_name))
+        except FileNotFoundError:
+            pass
+        DISK_CACHE_BYTES.set(self._total_bytes)
+
+    def _evict(self) -> None:
+        while self._total_bytes > self._max_bytes and self._entries:
+            file_name = next(iter(self._entries))
+            self._remove(file_name)
+            DISK_CACHE_EVICTIONS.inc()
+
+    async def close(self) -> None:
+        for task in list(self._downloads.values()):
+            task.cancel()
+        self._downloads.clear()
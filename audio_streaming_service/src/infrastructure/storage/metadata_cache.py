@@ -0,0 +1,184 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from src.core.logger import logger
+from src.infrastructure.database.redis_client import RedisClient
+
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    size: int
+    duration: float  # секунды
+    etag: str
+
+
+TrackObjects = Dict[str, ObjectInfo]  # bitrate -> ObjectInfo
+
+
+class TrackMetadataCache:
+    """
+    TTL-кэш метаданных объектов трека {bitrate -> (size, duration, etag)}.
+
+    Первый уровень - в памяти процесса, второй (опционально) - Redis, общий
+    для всех подов. Параллельные промахи по одному треку схлопываются в одну
+    загрузку; она идёт в отдельной задаче, и отмена первого запроса не роняет остальные.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        redis_client: Optional[RedisClient] = None,
+        max_entries: int = 10000,
+        refresh_interval: float = 30.0,
+    ):
+        """
+        :param ttl_seconds: время жизни записи в секундах
+        :param redis_client: клиент Redis для общего уровня кэша (None - только память)
+        :param max_entries: предельное число треков в памяти
+        :param refresh_interval: как часто refresh() может перечитывать трек из S3
+        """
+        self._ttl = ttl_seconds
+        self._redis = redis_client
+        self._max_entries = max_entries
+        self._refresh_interval = refresh_interval
+        # track_id -> (истекает, последняя сверка с S3, метаданные)
+        self._entries: "OrderedDict[str, Tuple[float, float, TrackObjects]]" = OrderedDict()
+        self._loading: Dict[Tuple[str, bool], asyncio.Task] = {}
+
+    @staticmethod
+    def _redis_key(track_id: str) -> str:
+        return f"track_objects:{track_id}"
+
+    async def get_or_load(
+        self,
+        track_id: str,
+        loader: Callable[[], Awaitable[TrackObjects]],
+    ) -> TrackObjects:
+        """
+        Возвращает метаданные трека, при промахе загружает их через loader
+
+        :param track_id: ID трека
+        :param loader: корутина, читающая метаданные из S3
+        """
+        cached = self._get_local(track_id)
+        if cached is not None:
+            return cached
+        return await self._load_once(track_id, loader, use_redis=True)
+
+    async def refresh(
+        self,
+        track_id: str,
+        loader: Callable[[], Awaitable[TrackObjects]],
+    ) -> TrackObjects:
+        """
+        Перечитывает метаданные из S3 мимо кэша (например, ищем битрейт, которого
+        в записи нет), но не чаще раза в refresh_interval на трек: иначе запросы
+        несуществующего битрейта каждый раз стоили бы LIST + HEAD. Запись
+        заменяется, а не удаляется, так что остальные читатели её не теряют.
+
+        :param track_id: ID трека
+        :param loader: корутина, читающая метаданные из S3
+        """
+        entry = self._entries.get(track_id)
+        now = time.monotonic()
+        if entry is not None and entry[0] >= now:
+            expires_at, checked_at, objects = entry
+            if now - checked_at < self._refresh_interval:
+                return objects
+            # Сверку засчитываем и при неудачной загрузке
+            self._entries[track_id] = (expires_at, now, objects)
+        return await self._load_once(track_id, loader, use_redis=False)
+
+    async def _load_once(
+        self,
+        track_id: str,
+        loader: Callable[[], Awaitable[TrackObjects]],
+        use_redis: bool,
+    ) -> TrackObjects:
+        """Одна загрузка на трек для всех ждущих; отмена ожидающего её не прерывает"""
+        key = (track_id, use_redis)
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(track_id, loader, use_redis))
+            self._loading[key] = task
+            task.add_done_callback(lambda done: self._load_done(key, done))
+        return await asyncio.shield(task)
+
+    def _load_done(self, key: Tuple[str, bool], task: asyncio.Task) -> None:
+        if self._loading.get(key) is task:
+            del self._loading[key]
+        if not task.cancelled():
+            task.exception()  # ожидающих может не остаться
+
+    async def _load(
+        self,
+        track_id: str,
+        loader: Callable[[], Awaitable[TrackObjects]],
+        use_redis: bool,
+    ) -> TrackObjects:
+        objects = await self._get_redis(track_id) if use_redis else None
+        if objects is None:
+            objects = await loader()
+            if objects:
+                await self._set_redis(track_id, objects)
+        if objects:
+            self._set_local(track_id, objects)
+        return objects
+
+    async def invalidate(self, track_id: str) -> None:
+        """Сбрасывает метаданные трека (например, после перезаливки файлов)"""
+        self._entries.pop(track_id, None)
+        if self._redis is not None:
+            try:
+                await self._redis.client.delete(self._redis_key(track_id))
+            except Exception as e:
+                logger.warning(f"Failed to invalidate track metadata {track_id}: {str(e)}")
+
+    def _get_local(self, track_id: str) -> Optional[TrackObjects]:
+        entry = self._entries.get(track_id)
+        if entry is None:
+            return None
+        expires_at, _, objects = entry
+        if expires_at < time.monotonic():
+            del self._entries[track_id]
+            return None
+        self._entries.move_to_end(track_id)
+        return objects
+
+    def _set_local(self, track_id: str, objects: TrackObjects) -> None:
+        now = time.monotonic()
+        self._entries[track_id] = (now + self._ttl, now, objects)
+        self._entries.move_to_end(track_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def _get_redis(self, track_id: str) -> Optional[TrackObjects]:
+        if self._redis is None:
+            return None
+        try:
+            data = await self._redis.client.get(self._redis_key(track_id))
+            if not data:
+                return None
+            return {
+                bitrate: ObjectInfo(size=size, duration=duration, etag=etag)
+                for bitrate, (size, duration, etag) in json.loads(data).items()
+            }
+        except Exception as e:
+            logger.warning(f"Failed to read track metadata {track_id} from Redis: {str(e)}")
+            return None
+
+    async def _set_redis(self, track_id: str, objects: TrackObjects) -> None:
+        if self._redis is None:
+            return
+        try:
+            data = json.dumps({
+                bitrate: [info.size, info.duration, info.etag]
+                for bitrate, info in objects.items()
+            })
+            await self._redis.client.set(self._redis_key(track_id), data, ex=self._ttl)
+        except Exception as e:
+            logger.warning(f"Failed to store track metadata {track_id} in Redis: {str(e)}")
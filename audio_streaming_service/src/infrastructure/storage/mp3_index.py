@@ -0,0 +1,203 @@
+import json
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Битрейты в кбит/с по (версия MPEG: 1 или 2/2.5, layer) и индексу из заголовка
+_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# Частоты дискретизации по битам версии: 3 - MPEG1, 2 - MPEG2, 0 - MPEG2.5
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+
+@dataclass(frozen=True)
+class FrameHeader:
+    length: int  # байт, включая заголовок
+    samples: int  # сэмплов на канал
+    sample_rate: int
+    mpeg1: bool
+    mono: bool
+
+    @property
+    def duration(self) -> float:
+        return self.samples / self.sample_rate
+
+
+def parse_frame_header(data, pos: int) -> Optional[FrameHeader]:
+    """Разбирает заголовок MPEG-фрейма по смещению pos; None, если там не фрейм"""
+    if pos < 0 or pos + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[pos], data[pos + 1], data[pos + 2], data[pos + 3]
+    if b0 != 0xFF or b1 & 0xE0 != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    # free format (0) не поддерживаем: длину фрейма не вычислить по заголовку
+    if version == 1 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    layer = 4 - layer_bits
+    bitrate = _BITRATES[(1 if mpeg1 else 2, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if layer == 2 or mpeg1 else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+
+    return FrameHeader(
+        length=length,
+        samples=samples,
+        sample_rate=sample_rate,
+        mpeg1=mpeg1,
+        mono=(b3 >> 6) == 0x03,
+    )
+
+
+def skip_id3v2(data) -> int:
+    """Возвращает смещение первого байта после ID3v2-тегов в начале файла"""
+    pos = 0
+    while len(data) >= pos + 10 and data[pos:pos + 3] == b"ID3":
+        size = 0
+        for byte in data[pos + 6:pos + 10]:
+            size = (size << 7) | (byte & 0x7F)  # syncsafe integer
+        footer = 10 if data[pos + 5] & 0x10 else 0
+        pos += 10 + size + footer
+    return pos
+
+
+def _find_frame(data, pos: int) -> Optional[int]:
+    """Ищет ближайший фрейм начиная с pos; за ним должен идти ещё один фрейм или конец файла"""
+    size = len(data)
+    while True:
+        pos = data.find(b"\xff", pos)
+        if pos < 0:
+            return None
+        header = parse_frame_header(data, pos)
+        if header is not None:
+            next_pos = pos + header.length
+            if next_pos >= size or parse_frame_header(data, next_pos) is not None:
+                return pos
+        pos += 1
+
+
+def _is_info_frame(data, pos: int, header: FrameHeader) -> bool:
+    """Фрейм с заголовком Xing/Info (LAME) или VBRI (Fraunhofer): метаданные, а не звук"""
+    if header.mpeg1:
+        side_info = 17 if header.mono else 32
+    else:
+        side_info = 9 if header.mono else 17
+    xing = pos + 4 + side_info
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        return True
+    return data[pos + 36:pos + 40] == b"VBRI"
+
+
+@dataclass(frozen=True)
+class Mp3SeekIndex:
+    """
+    Индекс перемотки MP3: offsets[i] - смещение первого фрейма,
+    начинающегося не раньше i * interval секунд. Подходит и для VBR.
+    """
+
+    interval: float
+    offsets: Tuple[int, ...]
+    duration: float
+
+    def offset_at(self, seconds: float) -> int:
+        """Смещение начала фрейма для позиции в секундах (с точностью до interval)"""
+        index = int(max(0.0, seconds) / self.interval)
+        return self.offsets[min(index, len(self.offsets) - 1)]
+
+    def frame_start(self, offset: int) -> int:
+        """Ближайшая к offset точка индекса не правее его (граница фрейма)"""
+        index = bisect_right(self.offsets, offset) - 1
+        return self.offsets[max(index, 0)]
+
+    def time_at(self, offset: int) -> float:
+        """Позиция в секундах для смещения в байтах, O(log n)"""
+        index = bisect_right(self.offsets, offset) - 1
+        if index < 0:
+            return 0.0
+        seconds = index * self.interval
+        if index + 1 < len(self.offsets):
+            span = self.offsets[index + 1] - self.offsets[index]
+            if span > 0:
+                seconds += self.interval * (offset - self.offsets[index]) / span
+        return min(seconds, self.duration)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "interval": self.interval,
+            "duration": self.duration,
+            "offsets": list(self.offsets),
+        })
+
+    @classmethod
+    def from_json(cls, data: str) -> "Mp3SeekIndex":
+        raw = json.loads(data)
+        return cls(
+            interval=raw["interval"],
+            offsets=tuple(raw["offsets"]),
+            duration=raw["duration"],
+        )
+
+
+def build_seek_index(data, interval: float = 0.5) -> Optional[Mp3SeekIndex]:
+    """
+    Строит индекс перемотки, проходя по всем фреймам файла.
+    Пропускает ID3v2 и служебный фрейм Xing/Info/VBRI, после потери
+    синхронизации ищет следующий фрейм.
+
+    :param data: содержимое MP3 (bytes или mmap)
+    :param interval: шаг индекса в секундах
+    :return: индекс или None, если фреймы не найдены
+    """
+    size = len(data)
+    offsets: List[int] = []
+    seconds = 0.0
+    next_mark = 0.0
+    first = True
+
+    pos = _find_frame(data, skip_id3v2(data))
+    while pos is not None and pos < size:
+        header = parse_frame_header(data, pos)
+        if header is None:
+            pos = _find_frame(data, pos + 1)
+            continue
+        if pos + header.length > size:
+            break  # обрезанный последний фрейм
+
+        if first:
+            first = False
+            if _is_info_frame(data, pos, header):
+                pos += header.length
+                continue
+
+        while seconds >= next_mark:
+            offsets.append(pos)
+            next_mark += interval
+        seconds += header.duration
+        pos += header.length
+
+    if not offsets:
+        return None
+    return Mp3SeekIndex(interval=interval, offsets=tuple(offsets), duration=seconds)
@@ -0,0 +1,145 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from src.infrastructure.storage.buffer_pool import BufferLease, BufferPool
+
+# fetch(start, end, buffer) -> сколько байт записано в buffer; end включительно (как в HTTP Range)
+RangeFetcher = Callable[[int, int, bytearray], Awaitable[int]]
+
+
+class PrefetchCancelled(Exception):
+    """Окно отменено самим prefetcher'ом (close или вытеснение) во время чтения"""
+
+
+class RangePrefetcher:
+    """
+    Read-ahead поверх Range-запросов.
+
+    Объект читается окнами по window_size байт (один GET на окно) в буферы
+    из пула, чанки отдаются memoryview-срезами окна без копирования; буфер
+    возвращается в пул, когда отпущены окно и все его срезы (BufferLease).
+    Впереди текущего окна держится не более depth окон, так что следующее
+    окно уже загружается, пока отдаётся текущее.
+    """
+
+    def __init__(
+        self,
+        fetch: RangeFetcher,
+        object_size: int,
+        window_size: int,
+        depth: int = 2,
+        pool: Optional[BufferPool] = None,
+    ):
+        """
+        :param fetch: корутина чтения диапазона байт объекта в буфер
+        :param object_size: размер объекта в байтах
+        :param window_size: размер окна в байтах
+        :param depth: количество окон, загружаемых впереди текущего
+        :param pool: пул буферов размером window_size (None - новый буфер на окно)
+        """
+        if window_size <= 0:
+            raise ValueError("window_size must be positive")
+        if pool is not None and pool.buffer_size != window_size:
+            raise ValueError("pool buffer size must match window_size")
+
+        self._fetch = fetch
+        self._object_size = object_size
+        self._window_size = window_size
+        self._depth = max(0, depth)
+        self._pool = pool
+        self._windows: Dict[int, asyncio.Task] = {}
+
+    @property
+    def window_size(self) -> int:
+        return self._window_size
+
+    def _window_count(self) -> int:
+        return (self._object_size + self._window_size - 1) // self._window_size
+
+    def _schedule(self, index: int) -> None:
+        if index in self._windows or not 0 <= index < self._window_count():
+            return
+        start = index * self._window_size
+        end = min(start + self._window_size, self._object_size) - 1
+        self._windows[index] = asyncio.create_task(self._load(start, end))
+
+    async def _load(self, start: int, end: int) -> Tuple[BufferLease, int]:
+        """Загружает окно; возвращает аренду буфера и число прочитанных байт"""
+        lease = self._pool.lease() if self._pool is not None else BufferLease(bytearray(self._window_size))
+        try:
+            filled = await self._fetch(start, end, lease.buffer)
+        except BaseException:
+            lease.release()
+            raise
+        return lease, filled
+
+    def _discard(self, task: asyncio.Task) -> None:
+        if not task.done():
+            task.cancel()
+            return
+        if task.cancelled() or task.exception() is not None:  # помечаем исключение как обработанное
+            return
+        # Буфер вернётся в пул, когда отпустят и отданные из окна чанки
+        lease, _ = task.result()
+        lease.release()
+
+    def _evict_outside(self, first: int, last: int) -> None:
+        """Отбрасывает окна вне [first, last]"""
+        for index in [i for i in self._windows if i < first or i > last]:
+            self._discard(self._windows.pop(index))
+
+    async def _window(self, index: int) -> Tuple[BufferLease, int]:
+        task = self._windows[index]
+        try:
+            # shield: отмена читающего не должна отменять общее окно
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            if self._windows.get(index) is task:
+                del self._windows[index]
+            raise PrefetchCancelled(f"Window {index} was cancelled")
+        except Exception:
+            # Неудачное окно выбрасываем, чтобы следующий read() перезапросил его
+            if self._windows.get(index) is task:
+                del self._windows[index]
+            raise
+
+    async def read(self, offset: int, length: int) -> Union[memoryview, bytes]:
+        """
+        Возвращает до length байт начиная с offset: срез окна без копирования
+        или bytes, если диапазон пересекает границу окон
+
+        :param offset: смещение в байтах
+        :param length: сколько байт прочитать
+        """
+        if offset >= self._object_size or length <= 0:
+            return b''
+
+        end = min(offset + length, self._object_size)
+        first = offset // self._window_size
+        last = (end - 1) // self._window_size
+        horizon = max(last, first + self._depth)
+
+        self._evict_outside(first, horizon)
+        for index in range(first, horizon + 1):
+            self._schedule(index)
+
+        parts = []
+        for index in range(first, last + 1):
+            lease, filled = await self._window(index)
+            window_start = index * self._window_size
+            part_start = max(offset, window_start) - window_start
+            part_end = min(end - window_start, filled)
+            if first == last:
+                return lease.view(part_start, part_end)
+            # На стыке окон копируем сразу: следующее ожидание может вытеснить это окно
+            parts.append(lease.buffer[part_start:part_end])
+
+        return b"".join(parts)
+
+    def close(self) -> None:
+        """Отменяет все загрузки и освобождает окна"""
+        for task in self._windows.values():
+            self._discard(task)
+        self._windows.clear()
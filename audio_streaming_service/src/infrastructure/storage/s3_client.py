@@ -0,0 +1,118 @@
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from typing import Awaitable, Optional, TypeVar
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+
+from src.core.logger import logger
+from src.core.monitoring.metrics import (
+    S3_POOL_MAX_CONNECTIONS,
+    S3_POOL_CONNECTIONS_IN_USE,
+    S3_POOL_UTILIZATION,
+    S3_REQUEST_DURATION,
+    S3_REQUEST_ERRORS,
+)
+
+T = TypeVar("T")
+
+
+class S3ClientManager:
+    """
+    Общий на процесс клиент S3/MinIO с настроенным пулом соединений.
+    Запускается в Container.init_resources и закрывается в shutdown_resources.
+    """
+
+    def __init__(
+        self,
+        aws_access_key_id: str,
+        aws_secret_access_key: str,
+        endpoint_url: str,
+        max_pool_connections: int = 512,
+        keepalive_timeout: float = 60.0,
+        connect_timeout: float = 2.0,
+        read_timeout: float = 10.0,
+        request_timeout: float = 15.0,
+        max_retries: int = 2,
+    ):
+        """
+        :param aws_access_key_id: AWS access key (или MinIO access key)
+        :param aws_secret_access_key: AWS secret key (или MinIO secret key)
+        :param endpoint_url: URL endpoint S3/MinIO
+        :param max_pool_connections: размер пула соединений
+        :param keepalive_timeout: время жизни простаивающего соединения в секундах
+        :param connect_timeout: таймаут установки соединения в секундах
+        :param read_timeout: таймаут чтения из сокета в секундах
+        :param request_timeout: таймаут на весь вызов в секундах
+        :param max_retries: количество повторов botocore
+        """
+        self._aws_access_key_id = aws_access_key_id
+        self._aws_secret_access_key = aws_secret_access_key
+        self._endpoint_url = endpoint_url
+        self._max_pool_connections = max_pool_connections
+        self._request_timeout = request_timeout
+        self._config = AioConfig(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            tcp_keepalive=True,
+            retries={'max_attempts': max_retries, 'mode': 'standard'},
+            connector_args={'keepalive_timeout': keepalive_timeout},
+        )
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._client = None
+        self._in_use = 0
+
+    async def start(self):
+        if self._client is not None:
+            return
+        self._exit_stack = AsyncExitStack()
+        self._client = await self._exit_stack.enter_async_context(
+            get_session().create_client(
+                's3',
+                aws_access_key_id=self._aws_access_key_id,
+                aws_secret_access_key=self._aws_secret_access_key,
+                endpoint_url=self._endpoint_url,
+                region_name='us-east-1',
+                config=self._config,
+            )
+        )
+        S3_POOL_MAX_CONNECTIONS.set(self._max_pool_connections)
+        logger.info(f"S3 client started for {self._endpoint_url} (pool={self._max_pool_connections})")
+
+    async def close(self):
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+        self._exit_stack = None
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            raise RuntimeError("S3 client not started")
+        return self._client
+
+    def _track_usage(self, delta: int):
+        self._in_use += delta
+        S3_POOL_CONNECTIONS_IN_USE.set(self._in_use)
+        S3_POOL_UTILIZATION.set(self._in_use / self._max_pool_connections)
+
+    async def call(self, operation: str, request: Awaitable[T]) -> T:
+        """
+        Выполняет запрос к S3 с общим таймаутом и учётом занятых соединений.
+        request должен включать чтение тела ответа: соединение занято до его конца.
+
+        :param operation: имя операции для метрик
+        :param request: корутина запроса
+        """
+        self._track_usage(1)
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(request, timeout=self._request_timeout)
+        except Exception:
+            S3_REQUEST_ERRORS.labels(operation=operation).inc()
+            raise
+        finally:
+            self._track_usage(-1)
+            S3_REQUEST_DURATION.labels(operation=operation).observe(time.perf_counter() - started)
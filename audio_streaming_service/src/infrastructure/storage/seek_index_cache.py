@@ -0,0 +1,125 @@
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.core.logger import logger
+from src.infrastructure.database.redis_client import RedisClient
+from src.infrastructure.database.redis_repository import CacheTTL
+from src.infrastructure.storage.mp3_index import Mp3SeekIndex, build_seek_index
+
+
+class SeekIndexCache:
+    """
+    Индексы перемотки MP3-объектов: в памяти процесса и в Redis.
+
+    Индекс строится один раз на версию объекта (etag) в фоне из байт, которые
+    уже прочитаны для дискового кэша; пока его нет (в том числе для непопулярных
+    объектов), стример считает позицию по формуле CBR. Блокировка в Redis не даёт
+    нескольким подам одновременно строить индекс одного объекта.
+    """
+
+    BUILD_LOCK_TTL = 120
+
+    def __init__(
+        self,
+        redis_client: Optional[RedisClient] = None,
+        interval: float = 0.5,
+        ttl_seconds: int = CacheTTL.POPULAR,
+        max_entries: int = 1000,
+    ):
+        """
+        :param redis_client: клиент Redis для общего хранения индексов (None - только память)
+        :param interval: шаг индекса в секундах
+        :param ttl_seconds: время жизни индекса в Redis
+        :param max_entries: предельное число индексов в памяти
+        """
+        self._redis = redis_client
+        self._interval = interval
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Mp3SeekIndex]" = OrderedDict()
+        self._builds: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(object_name: str, etag: Optional[str]) -> str:
+        version = (etag or '').strip('"')
+        return f"mp3_seek_index:{object_name}:{version}"
+
+    def peek(self, object_name: str, etag: Optional[str]) -> Optional[Mp3SeekIndex]:
+        """Индекс из памяти процесса без обращения к Redis"""
+        key = self._key(object_name, etag)
+        index = self._entries.get(key)
+        if index is not None:
+            self._entries.move_to_end(key)
+        return index
+
+    async def get(self, object_name: str, etag: Optional[str]) -> Optional[Mp3SeekIndex]:
+        """Индекс из памяти или Redis; None, если он ещё не построен"""
+        index = self.peek(object_name, etag)
+        if index is not None or self._redis is None:
+            return index
+
+        key = self._key(object_name, etag)
+        try:
+            data = await self._redis.client.get(key)
+        except Exception as e:
+            logger.warning(f"Failed to read seek index {key}: {str(e)}")
+            return None
+        if not data:
+            return None
+
+        index = Mp3SeekIndex.from_json(data)
+        self._set_local(key, index)
+        return index
+
+    def build(self, object_name: str, etag: Optional[str], load: Callable[[], Awaitable[bytes]]) -> None:
+        """
+        Строит индекс в фоне (не более одной сборки на объект в процессе)
+
+        :param object_name: ключ объекта в S3
+        :param etag: версия объекта
+        :param load: корутина, отдающая содержимое объекта целиком (из дискового кэша или уже скачанное)
+        """
+        key = self._key(object_name, etag)
+        if key in self._entries or key in self._builds:
+            return
+        task = asyncio.create_task(self._build(key, load))
+        self._builds[key] = task
+        task.add_done_callback(lambda _: self._builds.pop(key, None))
+
+    async def _build(self, key: str, load: Callable[[], Awaitable[bytes]]) -> None:
+        lock_key = f"{key}:lock"
+        try:
+            if self._redis is not None:
+                locked = await self._redis.client.set(lock_key, 1, nx=True, ex=self.BUILD_LOCK_TTL)
+                if not locked:
+                    return  # индекс строит другой под
+
+            data = await load()
+            index = await asyncio.to_thread(build_seek_index, data, self._interval)
+            if index is None:
+                logger.warning(f"No MPEG frames found for {key}")
+                return
+
+            self._set_local(key, index)
+            if self._redis is not None:
+                await self._redis.client.set(key, index.to_json(), ex=self._ttl)
+            logger.info(f"Seek index built for {key}: {len(index.offsets)} points, {index.duration:.1f}s")
+        except Exception as e:
+            logger.warning(f"Failed to build seek index {key}: {str(e)}")
+            if self._redis is not None:
+                try:
+                    await self._redis.client.delete(lock_key)
+                except Exception:
+                    pass
+
+    def _set_local(self, key: str, index: Mp3SeekIndex) -> None:
+        self._entries[key] = index
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def close(self) -> None:
+        for task in list(self._builds.values()):
+            task.cancel()
+        self._builds.clear()
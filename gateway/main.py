@@ -1,5 +1,6 @@
 from src.core.middleware.auth import AuthMiddleware
 import random
+from contextlib import asynccontextmanager
 
 from src.core.middleware.metrics import metrics_middleware
 
@@ -10,15 +11,28 @@ from src.core.container import Container
 from src.api.v1.auth import router as auth_router
 from src.api.v1.users import router as users_router
 from src.api.v1.tracks import router as tracks_router
-from src.api.v1.streaming import router as streaming_router
+from src.api.v1.streaming import router as streaming_router, handle_forwarded_command
 from src.api.v1.playlists import router as playlists_router
 from src.api.v1.likes import router as users_likes_router
 
 import uvicorn
 from src.api import metrics
 
-app = FastAPI(title="API Gateway")
 container = Container()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await container.init_resources()
+    registry = container.session_registry()
+    await registry.start(handle_forwarded_command)
+    yield
+    await registry.close()
+    await container.streaming_channel_pool().close()
+    await container.shutdown_resources()
+
+
+app = FastAPI(title="API Gateway", lifespan=lifespan)
 app.container = container
 app.include_router(auth_router)
 app.include_router(users_router)
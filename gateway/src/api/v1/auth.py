@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from dependency_injector.wiring import inject, Provide
 from src.core.jwt_utils import create_access_token, verify_token
 from src.core.container import Container
+from src.core.exceptions import PasswordHashingOverloaded
 from src.services.user_service import register_user, authenticate_user
 from src.schemas.user import RegisterUserRequest, RegisterUserResponse, LoginUserRequest, LoginUserResponse
 import grpc
@@ -12,10 +13,9 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 @inject
 async def register_user_endpoint(
     req: RegisterUserRequest,
-    stub=Depends(Provide[Container.user_stub]),  # если нужен stub из DI
 ):
     try:
-        user_id = register_user(req.username, req.email, req.password)
+        user_id = await register_user(req.username, req.email, req.password)
         resp = RegisterUserResponse(
             status="created",
             user_id=user_id
@@ -31,6 +31,9 @@ async def register_user_endpoint(
             http_code = status.HTTP_409_CONFLICT
         raise HTTPException(status_code=http_code, detail=detail)
 
+    except PasswordHashingOverloaded as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
     except grpc.RpcError as e:
         # любые необработанные gRPC-ошибки
         code = e.code()
@@ -50,9 +53,9 @@ async def register_user_endpoint(
         raise HTTPException(status_code=500, detail="Unexpected error")
 
 @router.post("/login", summary="Authenticate user and return JWT")
-def login(req: LoginUserRequest):
+async def login(req: LoginUserRequest):
     try:
-        user_id = authenticate_user(req.username, req.password)
+        user_id = await authenticate_user(req.username, req.password)
         token = create_access_token(user_id)
         resp = LoginUserResponse(
             access_token=token,
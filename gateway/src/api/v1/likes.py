@@ -24,7 +24,7 @@ async def get_user_likes_endpoint(
 ):
     try:
         user_id = request.state.user_id
-        result = get_user_likes(user_id=int(user_id), limit=int(payload.limit), offset=int(payload.offset))
+        result = await get_user_likes(user_id=int(user_id), limit=int(payload.limit), offset=int(payload.offset))
         return GetUserLikesResponse(tracks=result['tracks'])
         
     except ValueError as e:
@@ -47,7 +47,7 @@ async def get_user_history_endpoint(
 ):
     try:
         user_id = request.state.user_id
-        grpc_response = get_user_history(user_id=int(user_id), limit=int(payload.limit), offset=int(payload.offset))
+        grpc_response = await get_user_history(user_id=int(user_id), limit=int(payload.limit), offset=int(payload.offset))
         
         return GetUserHistoryResponse(
             tracks=[
@@ -75,7 +75,7 @@ async def like_track_endpoint(
     request: Request,
 ):
     try:
-        like_track(
+        await like_track(
             user_id=request.state.user_id,
             track_id=track_id
         )
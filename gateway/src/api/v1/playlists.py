@@ -19,7 +19,7 @@ async def add_playlist_endpoint(
 ):
     user_id: str = request.state.user_id
     try:
-        add_playlist(
+        await add_playlist(
             user_id=user_id,
             playlist_id=payload.playlist_id
         )
@@ -53,7 +53,7 @@ async def create_playlist_endpoint(
 ):
     user_id: str = request.state.user_id
     try:
-        playlist_id = create_playlist(
+        playlist_id = await create_playlist(
             user_id=user_id,
             title=payload.title,
             is_public=payload.is_public
@@ -1,10 +1,19 @@
 import asyncio
+import time
 from typing import Dict, List, Optional
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request
 from fastapi import APIRouter, Depends, status
 from fastapi.websockets import WebSocketState
 import grpc
 from pydantic import BaseModel
+from dependency_injector.wiring import inject, Provide
+
+from src.core.container import Container
+from src.services.session_registry import StreamSessionRegistry, SessionForwardError
+from src.core.dependencies.channel_pool import GrpcChannelPool
+from src.services.audio_frames import encode_frame
+from src.services.chunk_queue import ChunkQueue
+from src.core.monitoring import SLOW_CONSUMER_ACTIONS
 
 from src.core.logger import logger
 from src.core.config import settings
@@ -16,7 +25,7 @@ router = APIRouter(tags=["audio_streaming"])
 class SessionState:
     def __init__(self):
         self.active_sessions: Dict[str, Dict] = {}  # session_id -> session_data
-        self.chunk_queues: Dict[str, asyncio.Queue] = {}  # session_id -> queue of chunks
+        self.chunk_queues: Dict[str, ChunkQueue] = {}  # session_id -> queue of chunks
         self.control_queues: Dict[str, asyncio.Queue] = {}  # session_id -> queue of controls
         self.websockets: Dict[str, WebSocket] = {}  # session_id -> websocket
 
@@ -24,11 +33,27 @@ session_state = SessionState()
 
 # gRPC клиентclass GRPCAudioClient:
 class GRPCAudioClient:
-    def __init__(self):
-        self.channel = grpc.aio.insecure_channel(settings.STREAMING_SERVICE_GRPC_URL)
-        self.stub = pb2_grpc.StreamingServiceStub(self.channel)
+    # Обрыв потока, после которого сессию можно продолжить на другой реплике
+    RECONNECT_CODES = frozenset({
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.CANCELLED,
+        grpc.StatusCode.ABORTED,
+        grpc.StatusCode.UNKNOWN,
+    })
+
+    def __init__(self, channel_pool: GrpcChannelPool):
+        """
+        :param channel_pool: общий пул каналов; клиент занимает один канал на время сессии
+        """
+        self._channel_pool = channel_pool
+        self.channel = None
+        self.stub = None
         self.stream = None
         self._receive_task = None
+        self.start_args: Dict = {}
+        self.session_id: Optional[str] = None  # сессия, поток которой ведёт клиент
+        self.last_chunk = -1  # номер последнего полученного чанка
+        self._internal_replies = 0  # SessionInfo на команды гейтвея, которых не ждёт control_stream
 
     def _parse_session_info(self, session_info):
         available_bitrates = [bitrate for bitrate in session_info.available_bitrates]
@@ -39,65 +64,211 @@ class GRPCAudioClient:
             "current_chunk": session_info.current_chunk,
             "chunk_size": session_info.chunk_size,
             "total_chunks": session_info.total_chunks,
-            "status": pb2.SessionInfo.Status.Name(session_info.status)
+            "status": pb2.SessionInfo.Status.Name(session_info.status),
+            "credit_window": session_info.credit_window,
         }
 
+    @staticmethod
+    def _network_type(network_type: Optional[str]) -> int:
+        """Тип сети для StartStream; незнакомое значение - NETWORK_UNKNOWN (это лишь подсказка)"""
+        name = (network_type or "").upper()
+        if name in pb2.StartStream.NetworkType.keys():
+            return pb2.StartStream.NetworkType.Value(name)
+        return pb2.StartStream.NETWORK_UNKNOWN
+
     async def _init_stream_connection(self):
-        """Инициализация gRPC соединения"""
+        """Открывает поток сессии на канале из пула"""
+        if self.channel is None:
+            self.channel = self._channel_pool.acquire()
+            self.stub = pb2_grpc.StreamingServiceStub(self.channel)
         if self.stream is None:
             self.stream = self.stub.StreamAudio()
 
+    def _release_channel(self):
+        """Возвращает канал в пул (сам канал остаётся открытым для других сессий)"""
+        if self.channel is not None:
+            self._channel_pool.release(self.channel)
+            self.channel = None
+            self.stub = None
+
     async def _start_background_receiver(self, session_id: str):
         """Запуск фоновой задачи для приема сообщений"""
         if session_id not in session_state.control_queues:
             session_state.control_queues[session_id] = asyncio.Queue()
         if session_id not in session_state.chunk_queues:
-            session_state.chunk_queues[session_id] = asyncio.Queue()
+            session_state.chunk_queues[session_id] = ChunkQueue(session_id, settings.WS_CHUNK_QUEUE_SIZE)
         
         self._receive_task = asyncio.create_task(self._message_receiver(session_id))
 
     async def _message_receiver(self, session_id: str):
         """Фоновая задача для приема всех сообщений от сервера"""
+        finished = False
         try:
             while True:
-                response = await self.stream.read()
+                try:
+                    response = await self.stream.read()
+                except grpc.aio.AioRpcError as e:
+                    if e.code() not in self.RECONNECT_CODES or not await self._reconnect(session_id):
+                        raise
+                    continue
                 
                 if response == grpc.aio.EOF:
                     print("Stream closed by server")
+                    finished = True
                     break
                 
                 if response.HasField('chunk'):
-                    await session_state.chunk_queues[session_id].put(response.chunk)
+                    self.last_chunk = response.chunk.number
+                    await self._enqueue_chunk(session_id, response.chunk)
                     # if response.chunk.is_last:
                     #     break
                 
                 elif response.HasField('session'):
                     parsed = self._parse_session_info(response.session)
-                    await session_state.control_queues[session_id].put(parsed)
+                    if response.session.adaptive or self._internal_replies:
+                        # Сервер сменил битрейт сам или ответил на команду гейтвея - control_stream это не ждёт
+                        if not response.session.adaptive:
+                            self._internal_replies -= 1
+                        if session_id in session_state.active_sessions:
+                            session_state.active_sessions[session_id]["info"] = parsed
+                    else:
+                        await session_state.control_queues[session_id].put(parsed)
         except Exception as e:
             print(f"Error in message receiver: {e}")
         finally:
-            await self._cleanup_session(session_id)
+            # Штатный конец трека: вебсокет дочитывает то, что уже в очереди
+            await self._cleanup_session(session_id, discard=not finished)
+            self._release_channel()
 
-    async def _cleanup_session(self, session_id: str):
-        """Очистка ресурсов сессии"""
-        if session_id in session_state.active_sessions:
-            del session_state.active_sessions[session_id]
-        if session_id in session_state.chunk_queues:
-            del session_state.chunk_queues[session_id]
-        if session_id in session_state.control_queues:
-            del session_state.control_queues[session_id]
+    async def _enqueue_chunk(self, session_id: str, chunk):
+        """
+        Кладёт чанк в ограниченную очередь. Пока она полна, поток gRPC не читается,
+        и сервер упирается в окно кредитов; если клиент не разгружает очередь
+        дольше SLOW_CONSUMER_TIMEOUT, применяется политика медленного клиента.
+        """
+        queue = session_state.chunk_queues[session_id]
+        while True:
+            try:
+                await asyncio.wait_for(queue.put(chunk), timeout=settings.SLOW_CONSUMER_TIMEOUT)
+                return
+            except asyncio.TimeoutError:
+                pass
 
-    async def start_stream(self, track_id: str, user_id: str, bitrate: str, session_id: Optional[str] = None):
-        """Основной метод для старта сессии"""
-        await self._init_stream_connection()
-        
+            action = settings.SLOW_CONSUMER_POLICY
+            lower_bitrate = self._lower_bitrate(session_id) if action == "downgrade" else None
+            if action == "downgrade" and lower_bitrate is None:
+                action = "pause"  # ниже понижать некуда
+            SLOW_CONSUMER_ACTIONS.labels(action=action).inc()
+            logger.warning(f"Slow consumer in session {session_id} ({queue.bytes} bytes queued): {action}")
+
+            if action == "drop":
+                await self._drop_slow_consumer(session_id)
+
+            if action == "downgrade":
+                self._internal_replies += 1
+                await self._write_control("CHANGE_BITRATE", bitrate=lower_bitrate, congestion=True)
+                continue
+
+            # pause: ждём, пока клиент разберёт половину очереди, и продолжаем.
+            # FLOW_PAUSE не трогает паузу пользователя и не требует ответа. Пока ждём,
+            # поток не читается (и ответы на команды тоже), поэтому ожидание ограничено
+            await self._write_control("FLOW_PAUSE")
+
+            async def put_and_drain():
+                await queue.put(chunk)
+                await queue.wait_drained(queue.maxsize // 2)
+
+            try:
+                await asyncio.wait_for(put_and_drain(), timeout=settings.SLOW_CONSUMER_TIMEOUT)
+            except asyncio.TimeoutError:
+                SLOW_CONSUMER_ACTIONS.labels(action="drop").inc()
+                logger.warning(f"Slow consumer in session {session_id} did not drain while paused: drop")
+                await self._drop_slow_consumer(session_id)
+            await self._write_control("FLOW_RESUME")
+            return
+
+    async def _drop_slow_consumer(self, session_id: str):
+        """Останавливает сессию клиента, который не успевает принимать чанки"""
+        await self._write_control("STOP")
+        websocket = session_state.websockets.get(session_id)
+        if websocket is not None:
+            await websocket.close(code=1013, reason="Client is too slow")
+        raise Exception("Session dropped: client is too slow")
+
+    def _lower_bitrate(self, session_id: str) -> Optional[str]:
+        """Ближайший меньший битрейт трека"""
+        session = session_state.active_sessions.get(session_id)
+        if session is None:
+            return None
+        info = session["info"]
+        current = int(info["current_bitrate"])
+        lower = [b for b in info["available_bitrates"] if b.isdigit() and int(b) < current]
+        return max(lower, key=int) if lower else None
+
+    async def _stop_receiver(self):
+        """
+        Останавливает фоновый приём. До Python 3.12 wait_for теряет отмену, если
+        ожидание завершилось одновременно с ней, поэтому отменяем, пока задача не завершится.
+        """
+        task, self._receive_task = self._receive_task, None
+        while task is not None and not task.done():
+            task.cancel()
+            await asyncio.wait({task}, timeout=0.1)
+
+    async def _write_control(self, action: str, bitrate: Optional[str] = None, congestion: Optional[bool] = None):
+        """
+        Команда серверу от самого гейтвея (ответ не ждём)
+
+        :param congestion: смена битрейта из-за медленного клиента (автовыбор на сервере не отключается)
+        """
+        await self.stream.write(pb2.ClientMessage(
+            control=pb2.StreamControl(
+                action=pb2.StreamControl.Action.Value(action),
+                bitrate=bitrate,
+                congestion=congestion,
+            )
+        ))
+
+    async def _reconnect(self, session_id: str) -> bool:
+        """
+        Открывает новый StreamAudio для той же сессии: балансировщик направит его
+        на живую реплику, а сервер продолжит с первого чанка, которого у нас нет.
+        Очередь чанков и вебсокет при этом не трогаются.
+        """
+        delay = settings.STREAM_RECONNECT_BACKOFF
+        for attempt in range(1, settings.STREAM_RECONNECT_ATTEMPTS + 1):
+            await asyncio.sleep(delay)
+            delay *= 2
+            self.stream = self.stub.StreamAudio()
+            try:
+                session_info = await self._open_stream(
+                    session_id=session_id,
+                    resume_chunk=self.last_chunk + 1 if self.last_chunk >= 0 else None,
+                )
+            except Exception as e:
+                logger.warning(f"Reconnect attempt {attempt} for session {session_id} failed: {e}")
+                continue
+
+            if session_id in session_state.active_sessions:
+                session_state.active_sessions[session_id]["info"] = session_info
+            logger.info(f"Session {session_id} reattached at chunk {session_info['current_chunk']}")
+            return True
+
+        logger.error(f"Session {session_id} lost after {settings.STREAM_RECONNECT_ATTEMPTS} reconnect attempts")
+        return False
+
+    async def _open_stream(self, session_id: Optional[str] = None, resume_chunk: Optional[int] = None):
+        """Отправляет StartStream и ждёт первый SessionInfo"""
+        args = self.start_args
         start_msg = pb2.ClientMessage(
             start=pb2.StartStream(
-                track_id=track_id,
-                user_id=user_id,
-                bitrate=bitrate,
-                session_id=session_id
+                track_id=args["track_id"],
+                user_id=args["user_id"],
+                bitrate=args["bitrate"],
+                session_id=session_id,
+                network_type=self._network_type(args.get("network_type")),
+                preferred_chunk_size=args.get("preferred_chunk_size"),
+                resume_chunk=resume_chunk,
             )
         )
         
@@ -110,8 +281,56 @@ class GRPCAudioClient:
         if not response.HasField('session'):
             raise Exception("Expected SessionInfo as first response")
         
-        session_info = self._parse_session_info(response.session)
+        return self._parse_session_info(response.session)
+
+    async def _cleanup_session(self, session_id: str, discard: bool = True):
+        """
+        Очистка ресурсов сессии
+
+        :param discard: сбросить недоставленные чанки (иначе вебсокет их дочитает)
+        """
+        if session_id in session_state.active_sessions:
+            del session_state.active_sessions[session_id]
+        queue = session_state.chunk_queues.pop(session_id, None)
+        if queue is not None:
+            queue.close(discard=discard)
+        if session_id in session_state.control_queues:
+            del session_state.control_queues[session_id]
+
+    async def start_stream(
+        self,
+        track_id: str,
+        user_id: str,
+        bitrate: str,
+        session_id: Optional[str] = None,
+        network_type: Optional[str] = None,
+        preferred_chunk_size: Optional[int] = None,
+        resume_chunk: Optional[int] = None,
+    ):
+        """
+        Основной метод для старта сессии
+
+        :param resume_chunk: при переносе сессии - первый чанк, которого нет у клиента
+        """
+        await self._init_stream_connection()
+        
+        self.start_args = {
+            "track_id": track_id,
+            "user_id": user_id,
+            "bitrate": bitrate,
+            "network_type": network_type,
+            "preferred_chunk_size": preferred_chunk_size,
+        }
+        if resume_chunk is not None:
+            self.last_chunk = resume_chunk - 1
+        try:
+            session_info = await self._open_stream(session_id=session_id, resume_chunk=resume_chunk)
+        except Exception:
+            self.stream = None
+            self._release_channel()
+            raise
         session_id = session_info["session_id"]
+        self.session_id = session_id
         
         # Инициализируем сессию
         session_state.active_sessions[session_id] = {
@@ -124,12 +343,18 @@ class GRPCAudioClient:
         
         return session_info
 
-    async def control_stream(self, action: str, bitrate: Optional[str] = None, chunk_num: Optional[int] = None):
+    async def control_stream(
+        self,
+        action: str,
+        bitrate: Optional[str] = None,
+        chunk_num: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ):
         if not self.stream:
             raise Exception("Stream not started")
         
-        session_id = next(iter(session_state.active_sessions), None)
-        if not session_id:
+        session_id = self.session_id
+        if session_id not in session_state.active_sessions:
             raise Exception("No active session")
         
         action_enum = pb2.StreamControl.Action.Value(action.upper())
@@ -137,7 +362,8 @@ class GRPCAudioClient:
             control=pb2.StreamControl(
                 action=action_enum,
                 bitrate=bitrate,
-                chunk_num=chunk_num
+                chunk_num=chunk_num,
+                chunk_size=chunk_size,
             )
         )
         
@@ -161,28 +387,100 @@ class GRPCAudioClient:
         except asyncio.TimeoutError:
             raise Exception("Timeout waiting for session update")
 
-    async def send_ack(self, received_count: int):
+    async def send_ack(
+        self,
+        received_count: int,
+        last_chunk: Optional[int] = None,
+        queue_depth: Optional[int] = None,
+        send_latency_ms: Optional[float] = None,
+    ):
+        """
+        :param queue_depth: чанков, ждущих отправки в вебсокет
+        :param send_latency_ms: средняя задержка отправки кадра в вебсокет
+        (оба - входные данные для автовыбора битрейта на сервере)
+        """
         if not self.stream:
             raise Exception("Stream not started")
         
-        ack_msg = pb2.ClientMessage(ack=pb2.ChunkAck(received_count=received_count))
-        await self.stream.write(ack_msg)
+        ack_msg = pb2.ClientMessage(ack=pb2.ChunkAck(
+            received_count=received_count,
+            last_chunk=last_chunk,
+            queue_depth=queue_depth,
+            send_latency_ms=send_latency_ms,
+        ))
+        try:
+            await self.stream.write(ack_msg)
+        except grpc.aio.AioRpcError as e:
+            # Поток переоткрывает _message_receiver, новая реплика выдаст кредиты заново
+            logger.warning(f"Ack dropped, stream is down: {e.code()}")
 
-    async def close(self):
-        if self._receive_task:
-            self._receive_task.cancel()
+    async def release(self, session_id: str) -> int:
+        """
+        Отдаёт сессию другому экземпляру: сервер по DETACH сохраняет сессию без STOP,
+        и только после его подтверждения поток закрывается. Возвращает первый чанк,
+        не доставленный клиенту.
+        """
+        queue = session_state.chunk_queues.get(session_id)
+        head = queue.peek() if queue is not None else None
+        resume_chunk = head.number if head is not None else self.last_chunk + 1
+        await self._stop_receiver()
+
+        if self.stream:
             try:
-                await self._receive_task
-            except asyncio.CancelledError:
-                pass
+                confirmed = await asyncio.wait_for(self._detach(), timeout=settings.STREAM_RELEASE_TIMEOUT)
+            except (asyncio.TimeoutError, grpc.aio.AioRpcError) as e:
+                confirmed = False
+                logger.warning(f"Detach of session {session_id} failed: {e}")
+            if not confirmed:
+                logger.warning(f"Session {session_id} released without detach confirmation")
+            self.stream.cancel()
+            self.stream = None
+        self._release_channel()
+        return resume_chunk
+
+    async def stop(self, session_id: str):
+        """
+        Завершает сессию, когда слушатель ушёл посреди трека: сервер по STOP
+        фиксирует окончание прослушивания и удаляет сессию, поток дочитывается до конца.
+        """
+        await self._stop_receiver()
+
+        if self.stream:
+            try:
+                await asyncio.wait_for(self._finish("STOP"), timeout=settings.STREAM_RELEASE_TIMEOUT)
+            except (asyncio.TimeoutError, grpc.aio.AioRpcError) as e:
+                logger.warning(f"Stop of session {session_id} failed: {e}")
+            self.stream.cancel()
+            self.stream = None
+        self._release_channel()
+
+    async def _detach(self) -> bool:
+        """
+        Просит сервер сохранить сессию и дочитывает поток до конца (чанки уже не нужны).
+        Сервер подтверждает сохранение SessionInfo последним сообщением перед EOF.
+        """
+        return await self._finish("DETACH")
+
+    async def _finish(self, action: str) -> bool:
+        """
+        Отправляет завершающую команду и дочитывает поток до EOF.
+        Возвращает True, если последним сообщением сервера был SessionInfo.
+        """
+        await self._write_control(action)
+        confirmed = False
+        while True:
+            response = await self.stream.read()
+            if response == grpc.aio.EOF:
+                return confirmed
+            confirmed = response.HasField('session')
+
+    async def close(self):
+        await self._stop_receiver()
         
         if self.stream:
             await self.stream.done_writing()
         
-        if self.channel:
-            await self.channel.close()
-
-grpc_client = GRPCAudioClient()
+        self._release_channel()
 
 # Модели для FastAPI
 class StartStreamRequest(BaseModel):
@@ -190,71 +488,232 @@ class StartStreamRequest(BaseModel):
     user_id: str
     bitrate: str
     session_id: Optional[str] = None
+    network_type: Optional[str] = None  # "WIFI", "ETHERNET", "CELLULAR"
+    preferred_chunk_size: Optional[int] = None
 
 class ControlStreamRequest(BaseModel):
-    action: str  # "PAUSE", "RESUME", "STOP", "CHANGE_BITRATE", "SEEK"
+    action: str  # "PAUSE", "RESUME", "STOP", "CHANGE_BITRATE", "SEEK", "CHANGE_CHUNK_SIZE"
     bitrate: Optional[str] = None
     chunk_num: Optional[int] = None
+    chunk_size: Optional[int] = None
 
 # WebSocket endpoint для получения чанков
 @router.websocket("/ws/{session_id}")
-async def websocket_chunks(websocket: WebSocket, session_id: str):
+@inject
+async def websocket_chunks(
+    websocket: WebSocket,
+    session_id: str,
+    registry: StreamSessionRegistry = Depends(Provide[Container.session_registry]),
+    channel_pool: GrpcChannelPool = Depends(Provide[Container.streaming_channel_pool]),
+):
     await websocket.accept()
     
     if session_id not in session_state.active_sessions:
-        await websocket.close(code=1008, reason="Session not found")
-        return
+        # Сессия могла быть открыта на другом экземпляре - забираем её себе
+        try:
+            await _adopt_session(session_id, registry, channel_pool)
+        except Exception as e:
+            logger.warning(f"Failed to adopt session {session_id}: {e}")
+            await websocket.close(code=1008, reason="Session not found")
+            return
     
     session_state.websockets[session_id] = websocket
+    # Очередь и клиент держим сами: после конца трека сессию убирают из реестра,
+    # а вебсокет ещё дочитывает очередь
+    queue = session_state.chunk_queues[session_id]
+    client = session_state.active_sessions[session_id]["client"]
     is_artificial = False
     try:
         ack_counter = 0
         last_chunk_number = 0
+        send_time = 0.0
+        sends = 0
         
         while True:
-            # Получаем чанк из очереди
-            chunk = await session_state.chunk_queues[session_id].get()
+            # Получаем чанк из очереди и добираем уже готовые, не дожидаясь новых
+            first = await queue.get()
+            if first is None:
+                break  # сессия закрыта со стороны gRPC
+            batch = [first]
+            batch_bytes = len(batch[0].data)
+            closed = False
+            while (
+                len(batch) < settings.WS_BATCH_MAX_CHUNKS
+                and batch_bytes < settings.WS_BATCH_MAX_BYTES
+                and not batch[-1].is_last
+                and not queue.empty()
+            ):
+                item = queue.get_nowait()
+                if item is None:
+                    closed = True  # отправляем собранное и завершаемся
+                    break
+                batch.append(item)
+                batch_bytes += len(item.data)
+            chunk = batch[-1]
 
             if not is_artificial:
-                await websocket.send_text(str(chunk.number))
+                started = time.monotonic()
+                await websocket.send_bytes(encode_frame(batch))
+                send_time += time.monotonic() - started
+                sends += 1
 
-            ack_counter += 1
+            ack_counter += len(batch)
             
             # Отправляем подтверждение 
             if ack_counter >= 10 or chunk.is_last:
-                await session_state.active_sessions[session_id]["client"].send_ack(ack_counter)
+                # После конца gRPC-потока дочитываем очередь без подтверждений
+                if session_id in session_state.active_sessions:
+                    await client.send_ack(
+                        ack_counter,
+                        last_chunk=chunk.number,
+                        queue_depth=queue.qsize(),
+                        send_latency_ms=send_time * 1000 / sends if sends else None,
+                    )
+                    await registry.touch(session_id)
+                send_time, sends = 0.0, 0
                 ack_counter = 0
  
                 if chunk.is_last:
                     is_artificial = True
+
+            if closed:
+                break
                 
     except WebSocketDisconnect:
         pass
     except Exception as e:
         print(f"WebSocket error: {e}")
     finally:
-        
+        session = session_state.active_sessions.get(session_id)
+        if session is not None and session["client"] is client:
+            # Слушатель ушёл, а gRPC-поток жив: завершаем сессию, а не отсоединяем её
+            await client.stop(session_id)
+
         if session_id in session_state.websockets:
             del session_state.websockets[session_id]
         if session_id in session_state.active_sessions:
             del session_state.active_sessions[session_id]
-        if session_id in session_state.chunk_queues:
+        if session_state.chunk_queues.get(session_id) is queue:
             del session_state.chunk_queues[session_id]
+            queue.close(discard=True)
         if session_id in session_state.control_queues:
             del session_state.control_queues[session_id]
+        try:
+            await registry.unregister(session_id)
+        except Exception as e:
+            logger.warning(f"Failed to unregister session {session_id}: {e}")
+
+
+async def _adopt_session(
+    session_id: str,
+    registry: StreamSessionRegistry,
+    channel_pool: GrpcChannelPool,
+) -> Dict:
+    """
+    Переносит сессию с экземпляра-владельца на этот: владелец закрывает свой
+    gRPC-поток без STOP, а мы продолжаем с первого чанка, не доставленного клиенту
+    """
+    owner = await registry.owner(session_id)
+    if owner is None or owner == registry.instance_id:
+        raise Exception("Session not found")
+
+    released = await registry.forward(owner, {"type": "release", "session_id": session_id})
+    client = GRPCAudioClient(channel_pool)
+    session_data = await client.start_stream(
+        released["track_id"],
+        released["user_id"],
+        released["bitrate"],
+        session_id,
+        released.get("network_type"),
+        released.get("preferred_chunk_size"),
+        resume_chunk=released["resume_chunk"],
+    )
+    await registry.register(session_id, settings.STREAMING_SERVICE_GRPC_URL)
+    logger.info(f"Session {session_id} adopted from instance {owner}")
+    return session_data
+
+
+def _session_response(session_info: Dict) -> Dict:
+    return {
+        "session_id": session_info["session_id"],
+        "current_bitrate": session_info["current_bitrate"],
+        "available_bitrates": session_info["available_bitrates"],
+        "current_chunk": session_info["current_chunk"],
+        "chunk_size": session_info["chunk_size"],
+        "total_chunks": session_info["total_chunks"],
+        "status": session_info["status"],
+        "credit_window": session_info["credit_window"],
+    }
+
+
+async def _control_local(
+    session_id: str,
+    action: str,
+    bitrate: Optional[str] = None,
+    chunk_num: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Dict:
+    """Управление сессией, gRPC-поток которой открыт на этом экземпляре"""
+    client = session_state.active_sessions[session_id]["client"]
+    session_info = await client.control_stream(action, bitrate, chunk_num, chunk_size)
+    
+    if session_info['status'] == 'STOPPED':
+        await client._cleanup_session(session_id)
+        client.stream = None
+    else:
+        # Обновляем информацию
+        session_state.active_sessions[session_id]["info"] = session_info
+    
+    return _session_response(session_info)
+
+
+async def handle_forwarded_command(message: Dict) -> Dict:
+    """Выполняет команду, пересланную другим экземпляром гейтвея"""
+    session_id = message["session_id"]
+    if session_id not in session_state.active_sessions:
+        raise Exception("Session not found")
+
+    command = message["type"]
+    if command == "control":
+        return await _control_local(
+            session_id,
+            message["action"],
+            message.get("bitrate"),
+            message.get("chunk_num"),
+            message.get("chunk_size"),
+        )
+    if command == "info":
+        return _session_response(session_state.active_sessions[session_id]["info"])
+    if command == "release":
+        client = session_state.active_sessions[session_id]["client"]
+        resume_chunk = await client.release(session_id)
+        return dict(client.start_args, resume_chunk=resume_chunk)
+    raise Exception(f"Unknown command {command}")
 
 
 # HTTP endpoint для старта сессии
 @router.post("/start_stream")
-async def start_stream(request: StartStreamRequest):
+@inject
+async def start_stream(
+    request: StartStreamRequest,
+    registry: StreamSessionRegistry = Depends(Provide[Container.session_registry]),
+    channel_pool: GrpcChannelPool = Depends(Provide[Container.streaming_channel_pool]),
+):
     try:
-        # Инициализация клиента вынесена в отдельный middleware или в startup
-        grpc_client = GRPCAudioClient()
+        if request.session_id and request.session_id not in session_state.active_sessions:
+            owner = await registry.owner(request.session_id)
+            if owner is not None and owner != registry.instance_id:
+                return await _adopt_session(request.session_id, registry, channel_pool)
+
+        # Сессия - отдельный поток на общем канале из пула
+        grpc_client = GRPCAudioClient(channel_pool)
         session_data = await grpc_client.start_stream(
             request.track_id,
             request.user_id,
             request.bitrate,
-            request.session_id
+            request.session_id,
+            request.network_type,
+            request.preferred_chunk_size,
         )
         
         session_id = session_data["session_id"]
@@ -262,7 +721,7 @@ async def start_stream(request: StartStreamRequest):
             "info": session_data,
             "client": grpc_client  # Сохраняем клиент в сессии
         }
-        
+        await registry.register(session_id, settings.STREAMING_SERVICE_GRPC_URL)
         
         return session_data
         
@@ -272,52 +731,71 @@ async def start_stream(request: StartStreamRequest):
 
 # HTTP endpoint для управления сессией
 @router.post("/control_stream/{session_id}")
-async def control_stream(session_id: str, request: ControlStreamRequest):
-    if session_id not in session_state.active_sessions:
+@inject
+async def control_stream(
+    session_id: str,
+    request: ControlStreamRequest,
+    registry: StreamSessionRegistry = Depends(Provide[Container.session_registry]),
+):
+    if session_id in session_state.active_sessions:
+        try:
+            session_info = await _control_local(
+                session_id,
+                request.action,
+                request.bitrate,
+                request.chunk_num,
+                request.chunk_size,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        if session_info["status"] == "STOPPED":
+            await registry.unregister(session_id)
+        return session_info
+
+    # Сессия на другом экземпляре - пересылаем команду владельцу
+    owner = await registry.owner(session_id)
+    if owner is None or owner == registry.instance_id:
         raise HTTPException(status_code=404, detail="Session not found")
-    
     try:
-        # Получаем клиент из сессии
-        client = session_state.active_sessions[session_id]["client"]
-        session_info = await client.control_stream(
-            request.action,
-            request.bitrate,
-            request.chunk_num
-        )
-        
-            
-        if session_info['status'] == 'STOPPED':
-            await grpc_client._cleanup_session(session_id)
-            grpc_client.stream = None
-        else:
-        # Обновляем информацию
-            session_state.active_sessions[session_id]["info"] = session_info
-        
-        return {
-            "session_id": session_info["session_id"],
-            "current_bitrate": session_info["current_bitrate"],
-            "available_bitrates": session_info["available_bitrates"],
-            "current_chunk": session_info["current_chunk"],
-            "chunk_size": session_info["chunk_size"],
-            "total_chunks": session_info["total_chunks"],
-            "status": session_info["status"]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        session_info = await registry.forward(owner, {
+            "type": "control",
+            "session_id": session_id,
+            "action": request.action,
+            "bitrate": request.bitrate,
+            "chunk_num": request.chunk_num,
+            "chunk_size": request.chunk_size,
+        })
+    except SessionForwardError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    if session_info["status"] == "STOPPED":
+        await registry.unregister(session_id, owner)
+    return session_info
     
 
 # HTTP endpoint для получения информации о сессии
 @router.get("/session_info/{session_id}")
-async def get_session_info(session_id: str):
-    if session_id not in session_state.active_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session_info = session_state.active_sessions[session_id]["info"]
+@inject
+async def get_session_info(
+    session_id: str,
+    registry: StreamSessionRegistry = Depends(Provide[Container.session_registry]),
+):
+    if session_id in session_state.active_sessions:
+        session_info = session_state.active_sessions[session_id]["info"]
+    else:
+        owner = await registry.owner(session_id)
+        if owner is None or owner == registry.instance_id:
+            raise HTTPException(status_code=404, detail="Session not found")
+        try:
+            session_info = await registry.forward(owner, {"type": "info", "session_id": session_id})
+        except SessionForwardError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+
     return {
         "current_bitrate": session_info["current_bitrate"],
         "available_bitrates": session_info["available_bitrates"],  
         "status": session_info["status"],  
         "current_chunk": session_info["current_chunk"],
         "chunk_size": session_info["chunk_size"],
-        "total_chunks": session_info["total_chunks"]
+        "total_chunks": session_info["total_chunks"],
+        "credit_window": session_info["credit_window"],
     }
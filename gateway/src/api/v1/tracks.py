@@ -8,6 +8,7 @@ from grpc import RpcError, StatusCode
 from fastapi import APIRouter, Depends, HTTPException
 from dependency_injector.wiring import inject, Provide
 from src.core.container import Container
+from src.core.config import settings
 from src.schemas.track import (
     TracksByArtistRequest,
     TracksByGenreRequest,
@@ -28,15 +29,14 @@ from src.schemas.track import (
 )
 from src.protos.user_context.generated import track_search_pb2
 
-from src.services.music_catalog_service import get_track_by_id
+from src.services.music_catalog_service import get_track_by_id, search_tracks
 
 router = APIRouter(prefix="/tracks", tags=["Tracks"])
 
 @router.post("/search", response_model=TrackSearchResponse)
 @inject
-async def search_tracks(
+async def search_tracks_endpoint(
     request: TrackSearchRequest,
-    stub=Depends(Provide[Container.track_search_stub])
 ):
     # Создаем gRPC запрос, преобразуя None в пустые значения
     grpc_request = track_search_pb2.SearchTracksRequest(
@@ -53,7 +53,7 @@ async def search_tracks(
     )
     
     # try:
-    response = stub.Search(grpc_request)
+    response = await search_tracks(grpc_request)
     return TrackSearchResponse(
         tracks=[
             TrackItemResponse(
@@ -89,7 +89,7 @@ async def get_tracks_by_artist_endpoint(
             )
         )
         
-        response = stub.GetTracksByArtist(grpc_request)
+        response = await stub.GetTracksByArtist(grpc_request, timeout=settings.GRPC_CALL_TIMEOUT)
         return TracksPaginationResponse.from_proto(response)
     
     except Exception as e:
@@ -109,7 +109,7 @@ async def get_tracks_by_genre_endpoint(
                 limit=request.limit
             )
         )
-        response = stub.GetTracksByGenre(grpc_request)
+        response = await stub.GetTracksByGenre(grpc_request, timeout=settings.GRPC_CALL_TIMEOUT)
         return TracksPaginationResponse.from_proto(response)
     except Exception as e:
         raise HTTPException(500, detail=str(e))
@@ -121,7 +121,7 @@ async def get_track_by_id_endpoint(
     track_id: int,
 ):
     try:
-        response = get_track_by_id(track_id=track_id)
+        response = await get_track_by_id(track_id=track_id)
         return TrackResponse(
             track_id=response.track_id,
             title=response.title,
@@ -20,7 +20,7 @@ async def change_password_endpoint(
     user_id: str = request.state.user_id
     try:
         logger.debug(f"change password: {request}")
-        change_password(
+        await change_password(
             user_id=user_id,
             old_password=payload.old_password,
             new_password=payload.new_password
@@ -57,7 +57,7 @@ async def get_user_info_endpoint(
     user_id: str = request.state.user_id
     # user_id = int(request.state.user_id)
     try:
-        user_info = get_user_info(
+        user_info = await get_user_info(
             user_id=user_id,
         )
         resp = GetUserInfoResponse(
@@ -1,8 +1,10 @@
 from pydantic_settings import BaseSettings
 import os
+import socket
 import logging
 import re
 from typing import ClassVar
+from pydantic import Field
 
 class Settings(BaseSettings):
 
@@ -25,7 +27,46 @@ class Settings(BaseSettings):
     MUSIC_CATALOG_GRPC_URL: str = "localhost:50053"
     LISTENING_HISTORY_GRPC_URL: str = "localhost:50054"
     STREAMING_SERVICE_GRPC_URL: str = 'localhost:50056'
+    STREAMING_CHANNEL_POOL_SIZE: int = 4  # HTTP/2-соединений к стримингу на экземпляр гейтвея
+
+    # Бинарные кадры WebSocket: сколько готовых чанков склеивать в один кадр (1 - без склейки)
+    WS_BATCH_MAX_CHUNKS: int = 1
+    WS_BATCH_MAX_BYTES: int = 256 * 1024
+
+    # Очередь чанков сессии между gRPC и вебсокетом
+    WS_CHUNK_QUEUE_SIZE: int = 64  # чанков; при заполнении чтение gRPC-потока приостанавливается
+    SLOW_CONSUMER_TIMEOUT: float = 5.0  # секунды заполненной очереди до применения политики (и предел ожидания при "pause")
+    SLOW_CONSUMER_POLICY: str = "downgrade"  # "drop" | "downgrade" | "pause"
     TRACK_SEARCH_GRPC_URL: str = "localhost:50054"  
+
+    # Кеш чтений каталога (трек по id, поиск)
+    CATALOG_CACHE_TTL: float = 5.0  # секунды свежести ответа
+    CATALOG_CACHE_STALE_TTL: float = 60.0  # ещё столько отдаём устаревший ответ, обновляя в фоне
+    CATALOG_CACHE_MAX_ENTRIES: int = 10000
+
+    # Кеш проверенных JWT в AuthMiddleware (записей)
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+
+    # Хеширование паролей в пуле процессов
+    PASSWORD_HASH_WORKERS: int = 0  # 0 - по числу ядер
+    PASSWORD_HASH_MAX_PENDING: int = 64  # сверх этого логины/регистрации отклоняются с 503
+
+    # Вызовы gRPC-сервисов
+    GRPC_CALL_TIMEOUT: float = 5.0  # дедлайн вызова по умолчанию, секунды
+    GRPC_RETRY_MAX_ATTEMPTS: int = 3
+    GRPC_RETRY_INITIAL_BACKOFF: float = 0.1
+    GRPC_RETRY_MAX_BACKOFF: float = 1.0
+
+    # Переподключение к стримингу при обрыве gRPC-потока (остановка пода)
+    STREAM_RECONNECT_ATTEMPTS: int = 5
+    STREAM_RECONNECT_BACKOFF: float = 0.2  # секунды, удваивается с каждой попыткой
+
+    # Реестр стриминговых сессий (несколько воркеров/подов гейтвея)
+    REDIS_URL: str = "redis://localhost:6379/0"
+    GATEWAY_INSTANCE_ID: str = Field(default_factory=lambda: f"{socket.gethostname()}-{os.getpid()}")
+    STREAM_SESSION_TTL: int = 3600  # секунды без активности до удаления записи о сессии
+    STREAM_FORWARD_TIMEOUT: float = 5.0  # ожидание ответа экземпляра-владельца сессии
+    STREAM_RELEASE_TIMEOUT: float = 3.0  # ожидание ответа сервера на DETACH/STOP при закрытии потока (меньше STREAM_FORWARD_TIMEOUT)
     
     # Kafka
     # KAFKA_BOOTSTRAP_SERVERS: str
@@ -1,18 +1,77 @@
 from dependency_injector import containers, providers
-from src.core.dependencies.grpc_clients import (
-    get_user_command_stub, 
-    get_music_catalog_stub,
-    get_track_search_stub
+from src.core.config import settings
+from src.services.session_registry import StreamSessionRegistry
+from src.core.dependencies.channel_pool import GrpcChannelPool
+from src.core.dependencies.grpc_clients import channel_resource
+from src.core.password_utils import password_hasher_resource
+from src.services.read_cache import ReadCache
+from src.protos.user_context.generated import (
+    commands_pb2_grpc,
+    track_pb2_grpc,
+    track_search_pb2_grpc,
+    PlaylistCommands_pb2_grpc,
 )
+from src.protos.listening_history_context.generated import LikeCommands_pb2_grpc
 
 class Container(containers.DeclarativeContainer):
     wiring_config = containers.WiringConfiguration(
-        packages=["src.api.v1"]
+        packages=["src.api.v1", "src.services"]
     )
 
+    # grpc.aio-каналы: по одному на сервис, открываются в init_resources и закрываются в shutdown_resources
+    user_channel = providers.Resource(channel_resource, settings.USER_PROFILE_GRPC_URL)
+
+    music_catalog_channel = providers.Resource(channel_resource, settings.MUSIC_CATALOG_GRPC_URL)
+
+    track_search_channel = providers.Resource(channel_resource, settings.TRACK_SEARCH_GRPC_URL)
+
+    listening_history_channel = providers.Resource(channel_resource, settings.LISTENING_HISTORY_GRPC_URL)
+
     # декларируем gRPC stub как синглтон
-    user_stub = providers.Singleton(get_user_command_stub)
+    user_stub = providers.Singleton(commands_pb2_grpc.UserCommandServiceStub, user_channel)
+
+    music_catalog_stub = providers.Singleton(track_pb2_grpc.TrackQueryServiceStub, music_catalog_channel)
+
+    track_search_stub = providers.Singleton(track_search_pb2_grpc.TrackSearchServiceStub, track_search_channel)
+
+    playlist_stub = providers.Singleton(PlaylistCommands_pb2_grpc.PlaylistCommandServiceStub, music_catalog_channel)
+
+    listening_stub = providers.Singleton(LikeCommands_pb2_grpc.LikeCommandServiceStub, listening_history_channel)
 
-    music_catalog_stub = providers.Singleton(get_music_catalog_stub)
+    # Кеш горячих чтений каталога со stale-while-revalidate и схлопыванием запросов
+    track_cache = providers.Singleton(
+        ReadCache,
+        name="track",
+        ttl=settings.CATALOG_CACHE_TTL,
+        stale_ttl=settings.CATALOG_CACHE_STALE_TTL,
+        max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+    )
+
+    search_cache = providers.Singleton(
+        ReadCache,
+        name="search",
+        ttl=settings.CATALOG_CACHE_TTL,
+        stale_ttl=settings.CATALOG_CACHE_STALE_TTL,
+        max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+    )
+
+    password_hasher = providers.Resource(
+        password_hasher_resource,
+        workers=settings.PASSWORD_HASH_WORKERS or None,
+        max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    )
+
+    streaming_channel_pool = providers.Singleton(
+        GrpcChannelPool,
+        target=settings.STREAMING_SERVICE_GRPC_URL,
+        size=settings.STREAMING_CHANNEL_POOL_SIZE,
+        options=[('grpc.keepalive_time_ms', 10000)],
+    )
 
-    track_search_stub = providers.Singleton(get_track_search_stub)
\ No newline at end of file
+    session_registry = providers.Singleton(
+        StreamSessionRegistry,
+        redis_url=settings.REDIS_URL,
+        instance_id=settings.GATEWAY_INSTANCE_ID,
+        ttl_seconds=settings.STREAM_SESSION_TTL,
+        forward_timeout=settings.STREAM_FORWARD_TIMEOUT,
+    )
@@ -0,0 +1,69 @@
+from typing import List, Optional, Sequence, Tuple
+
+import grpc
+
+from src.core.monitoring import GRPC_CHANNEL_STREAMS
+
+
+class GrpcChannelPool:
+    """
+    Пул grpc.aio-каналов к одному сервису.
+
+    Каждая сессия - отдельный bidi-поток на одном из каналов, а HTTP/2
+    мультиплексирует потоки внутри соединения. Поток занимает наименее
+    загруженный канал (при равенстве - следующий по кругу), так что
+    соединений N, а не по одному на слушателя.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        size: int = 4,
+        options: Optional[Sequence[Tuple[str, object]]] = None,
+    ):
+        """
+        :param target: адрес сервиса
+        :param size: число каналов
+        :param options: опции grpc-канала
+        """
+        self._target = target
+        self._options = list(options or [])
+        self._channels: List[Optional[grpc.aio.Channel]] = [None] * max(1, size)
+        self._streams: List[int] = [0] * len(self._channels)
+        self._next = 0
+
+    @property
+    def target(self) -> str:
+        return self._target
+
+    def acquire(self) -> grpc.aio.Channel:
+        """Канал под новый поток; вернуть через release"""
+        size = len(self._channels)
+        order = [(self._next + i) % size for i in range(size)]
+        slot = min(order, key=lambda i: self._streams[i])
+        self._next = (slot + 1) % size
+
+        if self._channels[slot] is None:
+            # Каналы создаются лениво, уже внутри event loop
+            self._channels[slot] = grpc.aio.insecure_channel(self._target, options=self._options)
+        self._streams[slot] += 1
+        self._report(slot)
+        return self._channels[slot]
+
+    def release(self, channel: grpc.aio.Channel) -> None:
+        for slot, pooled in enumerate(self._channels):
+            if pooled is channel:
+                self._streams[slot] = max(0, self._streams[slot] - 1)
+                self._report(slot)
+                return
+
+    def _report(self, slot: int) -> None:
+        GRPC_CHANNEL_STREAMS.labels(target=self._target, channel=str(slot)).set(self._streams[slot])
+
+    async def close(self) -> None:
+        for slot, channel in enumerate(self._channels):
+            if channel is not None:
+                await channel.close()
+            self._channels[slot] = None
+            self._streams[slot] = 0
+            self._report(slot)
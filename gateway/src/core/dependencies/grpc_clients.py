@@ -1,79 +1,68 @@
+import json
+from typing import AsyncIterator, Sequence
+
 import grpc
-from functools import lru_cache
 
 from src.core.config import settings
-from src.protos.user_context.generated import (
-    commands_pb2_grpc, 
-    track_pb2_grpc, track_search_pb2_grpc, 
-    PlaylistCommands_pb2, PlaylistCommands_pb2_grpc
-)
-from src.protos.listening_history_context.generated import LikeCommands_pb2, LikeCommands_pb2_grpc
-from src.protos.user_context.generated import commands_pb2_grpc, track_pb2_grpc, track_search_pb2_grpc
-
-@lru_cache(maxsize=None)
-def get_track_search_channel() -> grpc.Channel:
-    return grpc.insecure_channel(
-        settings.TRACK_SEARCH_GRPC_URL,
-        options=[('grpc.keepalive_time_ms', 10000)]
-    )
 
-def get_track_search_stub():
-    channel = get_track_search_channel()
-    return track_search_pb2_grpc.TrackSearchServiceStub(channel)
-
-@lru_cache(maxsize=None)  # Кешируем канал на всё время работы приложения
-def get_user_channel() -> grpc.Channel:
-    return grpc.insecure_channel(
-        settings.USER_PROFILE_GRPC_URL,  
-        options=[
-            ('grpc.keepalive_time_ms', 10000),
-            ('grpc.enable_retries', 1),
-            ('grpc.max_receive_message_length', 50 * 1024 * 1024)  # 50MB
-        ]
-    )
+MAX_MESSAGE_LENGTH = 50 * 1024 * 1024  # 50MB
 
-def get_user_command_stub():
-    channel = get_user_channel()
-    return commands_pb2_grpc.UserCommandServiceStub(channel)
+# Методы без побочных эффектов. Записи (RegisterUser, CreatePlaylist, SubscribeToPlaylist,
+# LikeTrack и т.п.) не повторяются: при UNAVAILABLE сервер мог успеть их выполнить
+RETRYABLE_METHODS = [
+    {"service": "music_catalog.TrackQueryService"},
+    {"service": "track.search.TrackSearchService"},
+    {"service": "UserCommandService", "method": "AuthenticateUser"},
+    {"service": "UserCommandService", "method": "GetUserInfo"},
+    {"service": "playlist.PlaylistCommandService", "method": "GetUserPlaylists"},
+    {"service": "playlist.PlaylistCommandService", "method": "GetPlaylistTracks"},
+    {"service": "playlist.PlaylistCommandService", "method": "GetPlaylistSubscribers"},
+    {"service": "LikeCommandService", "method": "GetUserHistory"},
+    {"service": "LikeCommandService", "method": "GetUserLikes"},
+]
 
 
-@lru_cache(maxsize=None)
-def get_music_catalog_channel() -> grpc.Channel:
-    return grpc.insecure_channel(
-        settings.MUSIC_CATALOG_GRPC_URL,
-        options=[
-            ('grpc.keepalive_time_ms', 10000),
-            ('grpc.max_receive_message_length', 50 * 1024 * 1024)
-        ]
-    )
+def _service_config(retry_codes: Sequence[str], methods: Sequence[dict] = RETRYABLE_METHODS) -> str:
+    """
+    Политика повторов для читающих методов: повтор безопасен, даже если
+    сервер успел обработать запрос до обрыва соединения
 
-def get_music_catalog_stub():
-    channel = get_music_catalog_channel()
-    return track_pb2_grpc.TrackQueryServiceStub(channel)
+    :param methods: имена методов в формате service config ({"service", "method"})
+    """
+    return json.dumps({
+        "methodConfig": [{
+            "name": list(methods),
+            "retryPolicy": {
+                "maxAttempts": settings.GRPC_RETRY_MAX_ATTEMPTS,
+                "initialBackoff": f"{settings.GRPC_RETRY_INITIAL_BACKOFF}s",
+                "maxBackoff": f"{settings.GRPC_RETRY_MAX_BACKOFF}s",
+                "backoffMultiplier": 2,
+                "retryableStatusCodes": list(retry_codes),
+            },
+        }]
+    })
 
-@lru_cache(maxsize=None)
-def get_playlist_channel() -> grpc.Channel:
-    return grpc.insecure_channel(
-        settings.MUSIC_CATALOG_GRPC_URL,
-        options=[
-            ('grpc.keepalive_time_ms', 10000),
-            ('grpc.max_receive_message_length', 50 * 1024 * 1024)
-        ]
-    )
 
-def get_listening_history_channel() -> grpc.Channel:
-    return grpc.insecure_channel(
-        settings.LISTENING_HISTORY_GRPC_URL,
+def create_channel(target: str, max_message_length: int = MAX_MESSAGE_LENGTH) -> grpc.aio.Channel:
+    """
+    Асинхронный канал к сервису: не блокирует event loop, повторяет
+    читающие запросы при UNAVAILABLE и держит соединение живым keepalive-пингами
+    """
+    return grpc.aio.insecure_channel(
+        target,
         options=[
             ('grpc.keepalive_time_ms', 10000),
-            ('grpc.max_receive_message_length', 50 * 1024 * 1024)
+            ('grpc.enable_retries', 1),
+            ('grpc.service_config', _service_config(["UNAVAILABLE"])),
+            ('grpc.max_receive_message_length', max_message_length),
         ]
     )
 
-def get_playlist_stub():
-    channel = get_playlist_channel()
-    return PlaylistCommands_pb2_grpc.PlaylistCommandServiceStub(channel)
 
-def get_listening_stub():
-    channel = get_listening_history_channel()
-    return LikeCommands_pb2_grpc.LikeCommandServiceStub(channel)
+async def channel_resource(target: str) -> AsyncIterator[grpc.aio.Channel]:
+    """Канал как ресурс контейнера: создаётся в init_resources, закрывается в shutdown_resources"""
+    channel = create_channel(target)
+    try:
+        yield channel
+    finally:
+        await channel.close()
@@ -0,0 +1,2 @@
+class PasswordHashingOverloaded(RuntimeError):
+    pass
@@ -2,6 +2,7 @@
 
 import jwt
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from pydantic_settings import BaseSettings
 
 class JWTSettings(BaseSettings):
@@ -16,6 +17,10 @@ def create_access_token(user_id: str) -> str:
     payload = {"sub": user_id, "exp": expire}
     return jwt.encode(payload, jwt_settings.SECRET_KEY, algorithm=jwt_settings.ALGORITHM)
 
-def verify_token(token: str) -> str:
+def decode_token(token: str) -> Tuple[str, Optional[float]]:
+    """Проверяет подпись и срок; возвращает (user_id, exp)"""
     payload = jwt.decode(token, jwt_settings.SECRET_KEY, algorithms=[jwt_settings.ALGORITHM])
-    return payload.get("sub")
+    return payload.get("sub"), payload.get("exp")
+
+def verify_token(token: str) -> str:
+    return decode_token(token)[0]
@@ -1,25 +1,101 @@
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from src.core.jwt_utils import verify_token
-import re, jwt
-
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
-        # Пропускаем публичные пути
-        if re.match(r"^/auth", path) or path in ("/health", "/docs", "/openapi.json", "/favicon.ico", "/", "/redoc", "/metrics"):
-            return await call_next(request)
-
-        auth_header = request.headers.get("Authorization")
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import jwt
+from fastapi import status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.config import settings
+from src.core.jwt_utils import decode_token
+
+# Пропускаем публичные пути
+PUBLIC_PATHS = frozenset({"/health", "/docs", "/openapi.json", "/favicon.ico", "/", "/redoc", "/metrics"})
+PUBLIC_PREFIXES = ("/auth",)
+
+
+class TokenCache:
+    """
+    LRU проверенных токенов: sha256(токен) -> (user_id, exp).
+
+    Подпись проверяется один раз, дальше до истечения exp токен
+    принимается по кешу; сам токен в памяти не хранится.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self._max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[str]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        user_id, exp = entry
+        if exp <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return user_id
+
+    def put(self, token: str, user_id: str, exp: float) -> None:
+        key = self._key(token)
+        self._entries[key] = (user_id, exp)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+class AuthMiddleware:
+    """Проверка Bearer-токена (чистый ASGI, без лишней задачи на запрос)"""
+
+    def __init__(self, app: ASGIApp, cache_size: int = settings.AUTH_TOKEN_CACHE_SIZE):
+        self.app = app
+        self._cache = TokenCache(cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path in PUBLIC_PATHS or path.startswith(PUBLIC_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        auth_header = self._header(scope, b"authorization")
         if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
-                                detail="Missing or invalid Authorization header")
+            await self._unauthorized(scope, receive, send, "Missing or invalid Authorization header")
+            return
         token = auth_header[len("Bearer "):]
-        try:
-            user_id = verify_token(token)
-            request.state.user_id = user_id
-        except jwt.PyJWTError:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
-                                detail="Invalid or expired token")
-
-        return await call_next(request)
\ No newline at end of file
+
+        user_id = self._cache.get(token)
+        if user_id is None:
+            try:
+                user_id, exp = decode_token(token)
+            except jwt.PyJWTError:
+                await self._unauthorized(scope, receive, send, "Invalid or expired token")
+                return
+            if exp is not None:
+                self._cache.put(token, user_id, exp)
+
+        scope.setdefault("state", {})["user_id"] = user_id
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _header(scope: Scope, name: bytes) -> Optional[str]:
+        for key, value in scope["headers"]:
+            if key == name:
+                return value.decode("latin-1")
+        return None
+
+    @staticmethod
+    async def _unauthorized(scope: Scope, receive: Receive, send: Send, detail: str) -> None:
+        response = JSONResponse({"detail": detail}, status_code=status.HTTP_401_UNAUTHORIZED)
+        await response(scope, receive, send)
@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 # Метрики
 REQUEST_COUNT = Counter(
@@ -11,4 +11,43 @@ REQUEST_DURATION = Histogram(
     'http_request_duration_seconds',
     'HTTP Request Duration',
     ['method', 'endpoint']
-)
\ No newline at end of file
+)
+
+GRPC_CHANNEL_STREAMS = Gauge(
+    'gateway_grpc_channel_streams',
+    'Active gRPC streams per pooled channel',
+    ['target', 'channel']
+)
+
+SESSION_QUEUE_BYTES = Gauge(
+    'gateway_session_queue_bytes',
+    'Audio bytes buffered for a session between gRPC and WebSocket',
+    ['session_id']
+)
+
+SLOW_CONSUMER_ACTIONS = Counter(
+    'gateway_slow_consumer_actions_total',
+    'Actions taken when a WebSocket client cannot keep up',
+    ['action']
+)
+
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    'gateway_password_hash_queue_wait_seconds',
+    'Time a password hash waits for a free hashing process'
+)
+
+PASSWORD_HASH_PENDING = Gauge(
+    'gateway_password_hash_pending',
+    'Password hashes queued or running'
+)
+
+PASSWORD_HASH_REJECTED = Counter(
+    'gateway_password_hash_rejected_total',
+    'Password hashes rejected because the hashing queue is full'
+)
+
+READ_CACHE_REQUESTS = Counter(
+    'gateway_read_cache_requests_total',
+    'Backend reads served by the gateway read cache',
+    ['cache', 'result']
+)
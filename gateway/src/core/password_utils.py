@@ -1,13 +1,87 @@
 from passlib.hash import bcrypt
 from src.core.config import settings
+from src.core.exceptions import PasswordHashingOverloaded
+from src.core.monitoring import (
+    PASSWORD_HASH_QUEUE_WAIT,
+    PASSWORD_HASH_PENDING,
+    PASSWORD_HASH_REJECTED,
+)
+import asyncio
+import multiprocessing
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Optional
 
 from passlib.hash import pbkdf2_sha256
 
 FIXED_SALT = os.urandom(16).hex()
+PBKDF2_ROUNDS = 310000
 
-def hash_password(password: str) -> str:
+
+def _pbkdf2_hash(password: str, salt: str, rounds: int) -> str:
+    # Соль передаётся явно: в процессах пула FIXED_SALT свой
     return pbkdf2_sha256.using(
-        salt=FIXED_SALT.encode(),
-        rounds=310000 
+        salt=salt.encode(),
+        rounds=rounds
     ).hash(password)
+
+
+def hash_password(password: str) -> str:
+    return _pbkdf2_hash(password, FIXED_SALT, PBKDF2_ROUNDS)
+
+
+class PasswordHasher:
+    """
+    Хеширование паролей в пуле процессов.
+
+    PBKDF2 - сотни миллисекунд чистого CPU на пароль; в пуле он не держит
+    event loop и GIL гейтвея. Одновременно в пул уходит не больше workers
+    задач, остальные ждут; если ждущих больше max_pending, запрос сразу
+    отклоняется, чтобы всплеск логинов не копил бесконечную очередь.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: int = 64):
+        """
+        :param workers: число процессов (по умолчанию - по числу ядер)
+        :param max_pending: предел запросов в очереди и в работе
+        """
+        self._workers = workers or os.cpu_count() or 1
+        self._max_pending = max_pending
+        self._pending = 0
+        self._slots = asyncio.Semaphore(self._workers)
+        # spawn: форк процесса с работающими grpc-каналами небезопасен
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def hash(self, password: str) -> str:
+        if self._pending >= self._max_pending:
+            PASSWORD_HASH_REJECTED.inc()
+            raise PasswordHashingOverloaded("Слишком много одновременных запросов, повторите позже")
+
+        self._pending += 1
+        PASSWORD_HASH_PENDING.set(self._pending)
+        queued_at = time.monotonic()
+        try:
+            async with self._slots:
+                PASSWORD_HASH_QUEUE_WAIT.observe(time.monotonic() - queued_at)
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._executor, _pbkdf2_hash, password, FIXED_SALT, PBKDF2_ROUNDS
+                )
+        finally:
+            self._pending -= 1
+            PASSWORD_HASH_PENDING.set(self._pending)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def password_hasher_resource(workers: Optional[int], max_pending: int) -> AsyncIterator[PasswordHasher]:
+    hasher = PasswordHasher(workers=workers, max_pending=max_pending)
+    try:
+        yield hasher
+    finally:
+        hasher.close()
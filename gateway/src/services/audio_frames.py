@@ -0,0 +1,38 @@
+"""
+Бинарный кадр WebSocket с аудио.
+
+    заголовок кадра:  version:u8  reserved:u8  count:u16
+    на каждый чанк:   number:u32  bitrate:u16  flags:u8  length:u32  data[length]
+
+Все числа - big-endian; bitrate в кбит/с; flags: бит 0 - последний чанк трека.
+"""
+import struct
+from typing import Sequence
+
+FRAME_VERSION = 1
+FLAG_LAST = 0x01
+
+_FRAME_HEADER = struct.Struct(">BBH")
+_CHUNK_HEADER = struct.Struct(">IHBI")
+
+
+def _bitrate_kbps(bitrate: str) -> int:
+    return int(bitrate) if bitrate and bitrate.isdigit() else 0
+
+
+def encode_frame(chunks: Sequence) -> bytes:
+    """
+    Упаковывает один или несколько чанков в кадр
+
+    :param chunks: сообщения AudioChunk (data, number, bitrate, is_last)
+    """
+    parts = [_FRAME_HEADER.pack(FRAME_VERSION, 0, len(chunks))]
+    for chunk in chunks:
+        parts.append(_CHUNK_HEADER.pack(
+            chunk.number,
+            _bitrate_kbps(chunk.bitrate),
+            FLAG_LAST if chunk.is_last else 0,
+            len(chunk.data),
+        ))
+        parts.append(chunk.data)
+    return b"".join(parts)
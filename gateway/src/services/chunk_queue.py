@@ -0,0 +1,76 @@
+import asyncio
+
+from src.core.monitoring import SESSION_QUEUE_BYTES
+
+
+class ChunkQueue(asyncio.Queue):
+    """
+    Ограниченная очередь чанков сессии между gRPC-получателем и вебсокетом.
+
+    Считает объём аудио в очереди (метрика на сессию) и умеет ждать, пока
+    вебсокет её разгрузит. close() ставит в конец значение None: читатель
+    дочитывает оставшиеся чанки и по None завершается. Метрика сессии удаляется
+    при закрытии, даже если читателя уже нет.
+    """
+
+    def __init__(self, session_id: str, maxsize: int = 0):
+        """
+        :param session_id: сессия (метка метрики)
+        :param maxsize: предел очереди в чанках (0 - без ограничения)
+        """
+        super().__init__(maxsize)
+        self._session_id = session_id
+        self._drained = asyncio.Event()
+        self._closed = False
+        self.bytes = 0
+
+    def _put(self, item):
+        super()._put(item)
+        if item is not None:
+            self.bytes += len(item.data)
+            self._update_metric()
+
+    def _get(self):
+        item = super()._get()
+        if item is not None:
+            self.bytes -= len(item.data)
+            self._update_metric()
+        self._drained.set()
+        return item
+
+    def peek(self):
+        """Первый чанк в очереди без извлечения (None - очередь пуста)"""
+        return self._queue[0] if self._queue else None
+
+    async def wait_drained(self, level: int) -> None:
+        """Ждёт, пока в очереди останется не больше level чанков"""
+        while self.qsize() > level:
+            self._drained.clear()
+            await self._drained.wait()
+
+    def close(self, discard: bool = False) -> None:
+        """
+        :param discard: сбросить недоставленные чанки (сессия оборвана или передана),
+        иначе читатель получит None после них
+        """
+        if discard:
+            while not self.empty():
+                self.get_nowait()
+        # None кладётся и в полную очередь: писателей после закрытия нет
+        self._put(None)
+        self._unfinished_tasks += 1
+        self._finished.clear()
+        self._wakeup_next(self._getters)
+        self._closed = True
+        self._remove_metric()
+
+    def _update_metric(self) -> None:
+        # После закрытия серию не заводим заново, пока читатель дочитывает очередь
+        if not self._closed:
+            SESSION_QUEUE_BYTES.labels(session_id=self._session_id).set(self.bytes)
+
+    def _remove_metric(self) -> None:
+        try:
+            SESSION_QUEUE_BYTES.remove(self._session_id)
+        except KeyError:
+            pass
@@ -1,36 +1,59 @@
 from grpc import RpcError
-from src.core.dependencies.grpc_clients import get_music_catalog_stub
-from src.protos.user_context.generated import track_pb2
+from dependency_injector.wiring import inject, Provide
+from src.core.container import Container
+from src.core.config import settings
+from src.protos.user_context.generated import track_pb2, track_search_pb2
+from src.services.read_cache import ReadCache
 
-def get_tracks_by_artist(artist_id: int, offset: int, limit: int):
-    stub = get_music_catalog_stub()
+@inject
+async def get_tracks_by_artist(artist_id: int, offset: int, limit: int, stub=Provide[Container.music_catalog_stub]):
     request = track_pb2.GetTracksByArtistRequest(
         artist_id=artist_id,
         offset=offset,
         limit=limit
     )
     try:
-        return stub.GetTracksByArtist(request)
+        return await stub.GetTracksByArtist(request, timeout=settings.GRPC_CALL_TIMEOUT)
     except RpcError as e:
         raise RuntimeError(f"Music Catalog Service error: {e.code().name}")
 
-def get_tracks_by_genre(genre_id: int, offset: int, limit: int):
-    stub = get_music_catalog_stub()
+@inject
+async def get_tracks_by_genre(genre_id: int, offset: int, limit: int, stub=Provide[Container.music_catalog_stub]):
     request = track_pb2.GetTracksByGenreRequest(
         genre_id=genre_id,
         offset=offset,
         limit=limit
     )
     try:
-        return stub.GetTracksByGenre(request)
+        return await stub.GetTracksByGenre(request, timeout=settings.GRPC_CALL_TIMEOUT)
     except RpcError as e:
         raise RuntimeError(f"Music Catalog Service error: {e.code().name}")
 
 
-def get_track_by_id(track_id: int):
-    stub = get_music_catalog_stub()
+@inject
+async def get_track_by_id(
+    track_id: int,
+    stub=Provide[Container.music_catalog_stub],
+    cache: ReadCache = Provide[Container.track_cache],
+):
     request = track_pb2.GetTrackRequest(
         track_id=track_id,
     )
-    response = stub.GetTrack(request)
-    return response
+    return await cache.get(
+        track_id,
+        lambda: stub.GetTrack(request, timeout=settings.GRPC_CALL_TIMEOUT),
+    )
+
+
+@inject
+async def search_tracks(
+    request: track_search_pb2.SearchTracksRequest,
+    stub=Provide[Container.track_search_stub],
+    cache: ReadCache = Provide[Container.search_cache],
+):
+    # Одинаковые запросы сериализуются в одинаковые байты
+    key = request.SerializeToString(deterministic=True)
+    return await cache.get(
+        key,
+        lambda: stub.Search(request, timeout=settings.GRPC_CALL_TIMEOUT),
+    )
@@ -1,9 +1,11 @@
 import sys
 from grpc import RpcError, StatusCode
-from src.core.dependencies.grpc_clients import get_playlist_stub
+from dependency_injector.wiring import inject, Provide
+from src.core.container import Container
 from src.protos.user_context.generated import PlaylistCommands_pb2, PlaylistCommands_pb2_grpc
 
-def add_playlist(user_id: str, playlist_id: str) -> None:
+@inject
+async def add_playlist(user_id: str, playlist_id: str, stub=Provide[Container.playlist_stub]) -> None:
     """
     Добавление публичного плейлиста через gRPC
 
@@ -11,13 +13,12 @@ def add_playlist(user_id: str, playlist_id: str) -> None:
         ValueError: если неверные креды или плейлист не найден
         RuntimeError: все остальные ошибки
     """
-    stub = get_playlist_stub()
     request = PlaylistCommands_pb2.AddPlaylistRequest(
         user_id=user_id,
         playlist_id=playlist_id
     )
     try:
-        stub.AddPlaylist(request, timeout=5.0)
+        await stub.AddPlaylist(request, timeout=5.0)
     except RpcError as e:
         code = e.code()
         if code == StatusCode.NOT_FOUND:
@@ -30,7 +31,8 @@ def add_playlist(user_id: str, playlist_id: str) -> None:
             raise RuntimeError(f"Ошибка gRPC: {code.name}")
 
 
-def create_playlist(user_id: str, title: str, is_public: bool) -> str:
+@inject
+async def create_playlist(user_id: str, title: str, is_public: bool, stub=Provide[Container.playlist_stub]) -> str:
     """
     Создание плейлиста через gRPC
 
@@ -41,14 +43,13 @@ def create_playlist(user_id: str, title: str, is_public: bool) -> str:
         ValueError: если неверные креды
         RuntimeError: все остальные ошибки
     """
-    stub = get_playlist_stub()
     request = PlaylistCommands_pb2.CreatePlaylistRequest(
         user_id=user_id,
         title=title,
         is_public=is_public
     )
     try:
-        response = stub.CreatePlaylist(request, timeout=10.0)
+        response = await stub.CreatePlaylist(request, timeout=10.0)
         return str(response.playlist_id)
     except RpcError as e:
         code = e.code()
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from src.core.logger import logger
+from src.core.monitoring import READ_CACHE_REQUESTS
+
+T = TypeVar("T")
+Loader = Callable[[], Awaitable[T]]
+
+
+class SingleFlight:
+    """
+    Одновременные одинаковые запросы делят один вызов бэкенда.
+
+    Вызов живёт в отдельной задаче под shield: отмена одного из ожидающих
+    (клиент закрыл соединение) не отменяет запрос для остальных.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, loader: Loader) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(loader())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(future)
+
+    def _finish(self, key: Hashable, future: asyncio.Future) -> None:
+        self._calls.pop(key, None)
+        if not future.cancelled():
+            future.exception()  # ошибку уже получили ожидающие; не даём asyncio ругаться
+
+
+class ReadCache:
+    """
+    Короткоживущий кеш ответов бэкенда со stale-while-revalidate.
+
+    Свежий ответ (моложе ttl) отдаётся сразу. Устаревший, но моложе
+    ttl + stale_ttl, тоже отдаётся сразу, а в фоне один запрос его обновляет.
+    Промах идёт в бэкенд через SingleFlight, так что всплеск одинаковых
+    запросов превращается в один вызов на ключ.
+    """
+
+    def __init__(self, name: str, ttl: float = 5.0, stale_ttl: float = 60.0, max_entries: int = 10000):
+        """
+        :param name: имя кеша (метка метрик)
+        :param ttl: сколько секунд ответ считается свежим
+        :param stale_ttl: сколько ещё секунд можно отдавать устаревший ответ, обновляя его в фоне
+        :param max_entries: предельное число ключей
+        """
+        self._name = name
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[object, float]]" = OrderedDict()
+        self._flight = SingleFlight()
+
+    async def get(self, key: Hashable, loader: Loader) -> T:
+        """
+        :param key: ключ запроса
+        :param loader: корутина-функция, выполняющая запрос к бэкенду
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, loaded_at = entry
+            age = time.monotonic() - loaded_at
+            if age < self._ttl:
+                self._entries.move_to_end(key)
+                READ_CACHE_REQUESTS.labels(cache=self._name, result="hit").inc()
+                return value
+            if age < self._ttl + self._stale_ttl:
+                self._entries.move_to_end(key)
+                READ_CACHE_REQUESTS.labels(cache=self._name, result="stale").inc()
+                if not self._flight.in_flight(key):
+                    refresh = asyncio.ensure_future(self._flight.do(key, lambda: self._load(key, loader)))
+                    refresh.add_done_callback(self._log_refresh_error)
+                return value
+
+        result = "coalesced" if self._flight.in_flight(key) else "miss"
+        READ_CACHE_REQUESTS.labels(cache=self._name, result=result).inc()
+        return await self._flight.do(key, lambda: self._load(key, loader))
+
+    async def _load(self, key: Hashable, loader: Loader) -> T:
+        value = await loader()
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def _log_refresh_error(self, future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Background refresh in {self._name} cache failed: {future.exception()}")
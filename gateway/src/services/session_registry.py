@@ -0,0 +1,177 @@
+import asyncio
+import json
+import math
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+
+import aioredis
+
+from src.core.logger import logger
+
+
+CommandHandler = Callable[[Dict], Awaitable[Dict]]
+
+
+class SessionForwardError(Exception):
+    """Владелец сессии не ответил или вернул ошибку"""
+    pass
+
+
+class StreamSessionRegistry:
+    """
+    Реестр стриминговых сессий в Redis: session_id -> экземпляр гейтвея,
+    который держит gRPC-поток и очередь чанков сессии.
+
+    Команды для чужой сессии пересылаются владельцу через Redis: у каждого
+    экземпляра своя очередь входящих команд, ответ кладётся в ключ запроса.
+    Экземплярам не нужен собственный адрес, поэтому схема работает и для
+    нескольких воркеров uvicorn на одном порту, и для подов за балансировщиком.
+    """
+
+    SESSION_KEY = "gateway:stream_session:{}"
+    INBOX_KEY = "gateway:inbox:{}"
+    REPLY_KEY = "gateway:reply:{}"
+
+    # Удаляем запись, только если она всё ещё наша (сессию мог перехватить другой экземпляр)
+    _UNREGISTER_SCRIPT = """
+    if redis.call('HGET', KEYS[1], 'instance') == ARGV[1] then
+        return redis.call('DEL', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        instance_id: str,
+        ttl_seconds: int = 3600,
+        forward_timeout: float = 5.0,
+    ):
+        """
+        :param redis_url: адрес Redis
+        :param instance_id: идентификатор этого экземпляра гейтвея
+        :param ttl_seconds: время жизни записи о сессии без продления
+        :param forward_timeout: сколько ждать ответа владельца на пересланную команду
+        """
+        self._redis_url = redis_url
+        self._instance_id = instance_id
+        self._ttl = ttl_seconds
+        self._forward_timeout = forward_timeout
+        self._redis = None
+        self._serve_task: Optional[asyncio.Task] = None
+
+    @property
+    def instance_id(self) -> str:
+        return self._instance_id
+
+    @property
+    def client(self):
+        if self._redis is None:
+            raise RuntimeError("Session registry is not connected")
+        return self._redis
+
+    async def start(self, handler: CommandHandler) -> None:
+        """
+        Подключается к Redis и начинает обслуживать пересланные команды
+
+        :param handler: корутина, выполняющая команду над локальной сессией
+        """
+        if self._redis is None:
+            self._redis = await aioredis.from_url(self._redis_url, decode_responses=True)
+            logger.info(f"Stream session registry connected, instance {self._instance_id}")
+        if self._serve_task is None:
+            self._serve_task = asyncio.create_task(self._serve(handler))
+
+    async def close(self) -> None:
+        if self._serve_task is not None:
+            self._serve_task.cancel()
+            try:
+                await self._serve_task
+            except asyncio.CancelledError:
+                pass
+            self._serve_task = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def register(self, session_id: str, backend: str) -> None:
+        """Закрепляет сессию за этим экземпляром"""
+        key = self.SESSION_KEY.format(session_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"instance": self._instance_id, "backend": backend})
+            pipe.expire(key, self._ttl)
+            await pipe.execute()
+
+    async def touch(self, session_id: str) -> None:
+        """Продлевает запись о живой сессии"""
+        await self.client.expire(self.SESSION_KEY.format(session_id), self._ttl)
+
+    async def owner(self, session_id: str) -> Optional[str]:
+        """Экземпляр-владелец сессии (None - сессия не зарегистрирована)"""
+        return await self.client.hget(self.SESSION_KEY.format(session_id), "instance")
+
+    async def unregister(self, session_id: str, instance_id: Optional[str] = None) -> None:
+        """
+        :param instance_id: владелец, чью запись снимаем (по умолчанию - этот экземпляр)
+        """
+        await self.client.eval(
+            self._UNREGISTER_SCRIPT, 1, self.SESSION_KEY.format(session_id), instance_id or self._instance_id
+        )
+
+    async def forward(self, instance_id: str, command: Dict) -> Dict:
+        """
+        Выполняет команду на экземпляре-владельце и возвращает его ответ
+
+        :param instance_id: экземпляр, которому адресована команда
+        :param command: команда (поле "type" и её аргументы)
+        """
+        request_id = uuid.uuid4().hex
+        inbox = self.INBOX_KEY.format(instance_id)
+        message = dict(command, request_id=request_id, deadline=time.time() + self._forward_timeout)
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.rpush(inbox, json.dumps(message))
+            # Очередь умершего экземпляра не копится бесконечно
+            pipe.expire(inbox, math.ceil(self._forward_timeout * 2))
+            await pipe.execute()
+
+        reply = await self.client.blpop(
+            self.REPLY_KEY.format(request_id), timeout=math.ceil(self._forward_timeout)
+        )
+        if reply is None:
+            raise SessionForwardError(f"Instance {instance_id} did not respond")
+
+        result = json.loads(reply[1])
+        if "error" in result:
+            raise SessionForwardError(result["error"])
+        return result
+
+    async def _serve(self, handler: CommandHandler) -> None:
+        inbox = self.INBOX_KEY.format(self._instance_id)
+        while True:
+            try:
+                item = await self.client.blpop(inbox, timeout=1)
+                if item is None:
+                    continue
+                asyncio.create_task(self._execute(handler, json.loads(item[1])))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Session registry inbox error: {e}")
+                await asyncio.sleep(1)
+
+    async def _execute(self, handler: CommandHandler, message: Dict) -> None:
+        if message.get("deadline", 0) < time.time():
+            return  # отправитель уже не ждёт ответа
+
+        try:
+            result = await handler(message)
+        except Exception as e:
+            result = {"error": str(e)}
+
+        reply_key = self.REPLY_KEY.format(message["request_id"])
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.rpush(reply_key, json.dumps(result))
+            pipe.expire(reply_key, math.ceil(self._forward_timeout))
+            await pipe.execute()
@@ -1,16 +1,25 @@
 # gateway/services/user_service.py
 import sys
 from grpc import RpcError, StatusCode
-from src.core.dependencies.grpc_clients import get_user_command_stub, get_listening_stub
+from dependency_injector.wiring import inject, Provide
+from src.core.container import Container
 from src.protos.user_context.generated import commands_pb2, commands_pb2_grpc
 from src.protos.listening_history_context.generated import LikeCommands_pb2, LikeCommands_pb2_grpc
-from src.core.password_utils import hash_password
+from src.core.password_utils import PasswordHasher
+import asyncio
 
 from src.core.logger import logger
 
 from google.protobuf import timestamp_pb2
 
-def register_user(username: str, email: str, password: str) -> str:
+@inject
+async def register_user(
+    username: str,
+    email: str,
+    password: str,
+    stub=Provide[Container.user_stub],
+    hasher: PasswordHasher = Provide[Container.password_hasher],
+) -> str:
     """
     Регистрирует пользователя через gRPC
     
@@ -26,11 +35,10 @@ def register_user(username: str, email: str, password: str) -> str:
         ValueError: Если не пройдена валидация или пользователь существует
         RuntimeError: Для всех остальных ошибок gRPC
     """
-    # 1. Получаем singleton-канал
-    stub = get_user_command_stub()
+    # 1. stub на общем grpc.aio-канале внедряется из контейнера
     
     # 3. Формируем запрос
-    hashed_password = hash_password(password)
+    hashed_password = await hasher.hash(password)
     request = commands_pb2.RegisterUserRequest(
         username=str(username),
         email=str(email),
@@ -41,7 +49,7 @@ def register_user(username: str, email: str, password: str) -> str:
     try:
         # 4. Выполняем вызов
         logger.debug(f"{email}")
-        response = stub.RegisterUser(request, timeout=10.0)
+        response = await stub.RegisterUser(request, timeout=10.0)
         return str(response.user_id)
         
     except RpcError as e:
@@ -55,7 +63,13 @@ def register_user(username: str, email: str, password: str) -> str:
             raise RuntimeError(f"Ошибка gRPC: {e.code().name}")
 
 
-def authenticate_user(username: str, password: str) -> str:
+@inject
+async def authenticate_user(
+    username: str,
+    password: str,
+    stub=Provide[Container.user_stub],
+    hasher: PasswordHasher = Provide[Container.password_hasher],
+) -> str:
     """
     Аутентификация пользователя через gRPC
 
@@ -66,16 +80,15 @@ def authenticate_user(username: str, password: str) -> str:
         ValueError: если неверные креды или пользователь не найден
         RuntimeError: все остальные ошибки
     """
-    stub = get_user_command_stub()
 
-    hashed_password = hash_password(password)
+    hashed_password = await hasher.hash(password)
 
     request = commands_pb2.AuthenticateUserRequest(
         username=username,
         password=hashed_password
     )
     try:
-        response = stub.AuthenticateUser(request, timeout=5.0)
+        response = await stub.AuthenticateUser(request, timeout=5.0)
         return str(response.user_id)
     except RpcError as e:
         if e.code() == StatusCode.NOT_FOUND:
@@ -87,7 +100,14 @@ def authenticate_user(username: str, password: str) -> str:
         else:
             raise RuntimeError(f"Ошибка gRPC: {e.code().name}")
 
-def change_password(user_id: str, old_password: str, new_password: str) -> None:
+@inject
+async def change_password(
+    user_id: str,
+    old_password: str,
+    new_password: str,
+    stub=Provide[Container.user_stub],
+    hasher: PasswordHasher = Provide[Container.password_hasher],
+) -> None:
     """
     Меняет пароль пользователя через gRPC.
     Raises:
@@ -95,17 +115,18 @@ def change_password(user_id: str, old_password: str, new_password: str) -> None:
       RuntimeError: при прочих ошибках
     """
 
-    old_password_hashed = hash_password(old_password)
-    new_password_hashed = hash_password(new_password)
+    old_password_hashed, new_password_hashed = await asyncio.gather(
+        hasher.hash(old_password),
+        hasher.hash(new_password),
+    )
 
-    stub = get_user_command_stub()
     request = commands_pb2.ChangePasswordRequest(
         user_id=user_id,
         old_password=old_password_hashed,
         new_password=new_password_hashed
     )
     try:
-        stub.ChangePassword(request, timeout=5.0)
+        await stub.ChangePassword(request, timeout=5.0)
     except RpcError as e:
         code = e.code()
         if code == StatusCode.INVALID_ARGUMENT:
@@ -117,7 +138,8 @@ def change_password(user_id: str, old_password: str, new_password: str) -> None:
         else:
             raise RuntimeError(f"Ошибка gRPC: {code.name}")
 
-def get_user_info(user_id: str) -> dict:
+@inject
+async def get_user_info(user_id: str, stub=Provide[Container.user_stub]) -> dict:
     """
     Получает информацию о пользователе через gRPC.
     Raises:
@@ -126,13 +148,12 @@ def get_user_info(user_id: str) -> dict:
     """
 
     print(f"Requesting user {user_id} via gRPC")
-    stub = get_user_command_stub()
     request = commands_pb2.GetUserInfoRequest(
         user_id=user_id
     )
     print(request)
     try:
-        response = stub.GetUserInfo(request, timeout=5.0)
+        response = await stub.GetUserInfo(request, timeout=5.0)
         print(f"Received response: {response}")
         return {
             'id' : str(response.user_id),
@@ -153,15 +174,15 @@ def get_user_info(user_id: str) -> dict:
             raise RuntimeError(f"Ошибка gRPC: {code.name}")
         
 
-def get_user_likes(user_id: str, limit: int, offset: int) -> dict:
-    stub = get_listening_stub()
+@inject
+async def get_user_likes(user_id: str, limit: int, offset: int, stub=Provide[Container.listening_stub]) -> dict:
     request = LikeCommands_pb2.GetUserLikesRequest(
         user_id=user_id,
         limit=limit,
         offset=offset,
     )
     try:
-        response = stub.GetUserLikes(request, timeout=5.0)
+        response = await stub.GetUserLikes(request, timeout=5.0)
         return {'tracks' : [track_id for track_id in response.tracks]}
             
     except RpcError as e:
@@ -176,16 +197,16 @@ def get_user_likes(user_id: str, limit: int, offset: int) -> dict:
             raise RuntimeError(f"Ошибка gRPC: {code.name}")
 
 
-def get_user_history(user_id: str, limit: int, offset: int) -> dict:
+@inject
+async def get_user_history(user_id: str, limit: int, offset: int, stub=Provide[Container.listening_stub]) -> dict:
 
-    stub = get_listening_stub()
     request = LikeCommands_pb2.GetUserHistoryRequest(
         user_id=user_id,
         limit=limit,
         offset=offset,
     )
     try:
-        response = stub.GetUserHistory(request, timeout=5.0)
+        response = await stub.GetUserHistory(request, timeout=5.0)
         return {'tracks' : [track_id for track_id in response.tracks]}
             
     except RpcError as e:
@@ -201,14 +222,14 @@ def get_user_history(user_id: str, limit: int, offset: int) -> dict:
 
 
 
-def like_track(user_id: int, track_id: int) -> None:
-    stub = get_listening_stub()
+@inject
+async def like_track(user_id: int, track_id: int, stub=Provide[Container.listening_stub]) -> None:
     request = LikeCommands_pb2.LikeTrackRequest(
         user_id=int(user_id),
         track_id=int(track_id),
     )
     try:
-        stub.LikeTrack(request, timeout=5.0)
+        await stub.LikeTrack(request, timeout=5.0)
     except RpcError as e:
         code = e.code()
         if code == StatusCode.INVALID_ARGUMENT:
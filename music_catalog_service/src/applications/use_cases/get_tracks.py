@@ -3,7 +3,8 @@ from src.domain.cache.cache_repository import CacheRepository, CacheTTL
 from src.domain.cache.serialization import CacheSerializer
 from src.applications.decorators.cache import cached
 from src.core.logger import logger
-from typing import List
+from src.core.exceptions import ValueObjectException
+from typing import List, Tuple
 from src.domain.music_catalog.models import Track
 
 class GetTracksByArtistUseCase:
@@ -34,4 +35,31 @@ class GetTracksByGenreUseCase:
 
     @cached(key_template="tracks:genre:{genre_id}:{offset}:{limit}")
     async def execute(self, genre_id: int, offset: int = 0, limit: int = 50) -> List[Track]:
-        return await self._repo.get_by_genre(genre_id, offset, limit)
\ No newline at end of file
+        return await self._repo.get_by_genre(genre_id, offset, limit)
+
+class GetTracksBatchUseCase:
+    def __init__(self, music_repo: MusicRepository, max_batch_size: int = 1000):
+        """
+        :param music_repo: репозиторий треков
+        :param max_batch_size: максимум треков в одном запросе
+        """
+        self._repo = music_repo
+        self._max_batch_size = max_batch_size
+
+    async def execute(self, track_ids: List[int]) -> Tuple[List[Track], List[int]]:
+        """
+        Загружает треки одним запросом к БД
+
+        :param track_ids: идентификаторы треков
+        :return: найденные треки в порядке запроса (без повторов) и ненайденные id
+        """
+        requested = list(dict.fromkeys(int(track_id) for track_id in track_ids))
+        if len(requested) > self._max_batch_size:
+            raise ValueObjectException(
+                f"Too many tracks requested: {len(requested)} > {self._max_batch_size}"
+            )
+
+        found = {track.track_id: track for track in await self._repo.get_by_ids(requested)}
+        tracks = [found[track_id] for track_id in requested if track_id in found]
+        missing = [track_id for track_id in requested if track_id not in found]
+        return tracks, missing
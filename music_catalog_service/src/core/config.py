@@ -14,6 +14,7 @@ class Settings(BaseSettings):
     # GRPC_TRACK_SERVICE_HOST: str = 'localhost'
     # GRPC_TRACK_SERVICE_PORT: str = '50053'
     GRPC_TIMEOUT: int = 5 # seconds
+    TRACKS_BATCH_MAX_SIZE: int = 1000  # треков в одном GetTracksBatch
     
 
     # Redis
@@ -2,7 +2,11 @@ from dependency_injector import containers, providers
 from faststream.kafka import KafkaBroker
 
 # from src.applications.use_cases.add_track import AddTrackToPlaylistUseCase
-from src.applications.use_cases.get_tracks import GetTracksByArtistUseCase, GetTracksByGenreUseCase
+from src.applications.use_cases.get_tracks import (
+    GetTracksByArtistUseCase,
+    GetTracksByGenreUseCase,
+    GetTracksBatchUseCase,
+)
 from src.applications.use_cases.get_track import GetTrackUseCase
 
 from src.infrastructure.database.repositories.music_repository import PostgresMusicRepository
@@ -170,6 +174,12 @@ class Container(containers.DeclarativeContainer):
         cache_serializer=track_serializer
     )
 
+    get_tracks_batch_use_case = providers.Factory(
+        GetTracksBatchUseCase,
+        music_repo=music_repository,
+        max_batch_size=settings.TRACKS_BATCH_MAX_SIZE
+    )
+
 
     @classmethod
     async def init_resources(cls):
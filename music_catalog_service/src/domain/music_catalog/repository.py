@@ -7,6 +7,11 @@ class MusicRepository(ABC):
     async def get_by_id(self, track_id: int) -> Optional[Track]:
         raise NotImplementedError
     
+    @abstractmethod
+    async def get_by_ids(self, track_ids: List[int]) -> List[Track]:
+        '''returns found tracks by given ids in one query, order is not guaranteed'''
+        raise NotImplementedError
+
     @abstractmethod
     async def get_by_artist(
         self, artist_id: int, offset: int = 0, limit: int = 50
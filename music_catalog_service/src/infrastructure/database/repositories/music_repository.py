@@ -1,4 +1,5 @@
-from sqlalchemy import select, delete, text
+from sqlalchemy import select, delete, text, any_, BigInteger
+from sqlalchemy.dialects.postgresql import array
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -40,6 +41,25 @@ class PostgresMusicRepository(MusicRepository):
         track_orm = result.scalars().first()
         return self._convert_to_domain(track_orm) if track_orm else None
 
+    @ConnectionDecorator()
+    async def get_by_ids(
+        self,
+        track_ids: list[int],
+        session: AsyncSession | None = None
+    ) -> list[Track]:
+        if not track_ids:
+            return []
+        # Один запрос с = ANY(:ids) вместо N запросов get_by_id
+        stmt = (
+            select(TrackORM)
+            .options(
+                selectinload(TrackORM.artists).selectinload(TrackArtistORM.artist),
+                selectinload(TrackORM.genres).selectinload(TrackGenreORM.genre)
+            )
+            .where(TrackORM.track_id == any_(array(track_ids, type_=BigInteger)))
+        )
+        result = await session.execute(stmt)
+        return [self._convert_to_domain(track) for track in result.scalars()]
 
     @ConnectionDecorator()
     async def get_by_artist(
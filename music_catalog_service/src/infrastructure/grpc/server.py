@@ -20,7 +20,8 @@ from src.core.protos.generated import TrackCommands_pb2, TrackCommands_pb2_grpc
 from src.core.di import Container
 from src.applications.use_cases.get_tracks import (
     GetTracksByArtistUseCase,
-    GetTracksByGenreUseCase
+    GetTracksByGenreUseCase,
+    GetTracksBatchUseCase
 )
 from google.protobuf.timestamp_pb2 import Timestamp
 
@@ -29,6 +30,7 @@ class TrackQueryService(TrackCommands_pb2_grpc.TrackQueryServiceServicer):
         self._get_tracks_by_artist_uc = Container.get_tracks_by_artist_use_case()
         self._get_tracks_by_genre_uc = Container.get_tracks_by_genre_use_case()
         self._get_track_uc = Container.get_track_use_case()
+        self._get_tracks_batch_uc = Container.get_tracks_batch_use_case()
 
     async def GetTracksByArtist(self, request, context):
         try:
@@ -92,6 +94,20 @@ class TrackQueryService(TrackCommands_pb2_grpc.TrackQueryServiceServicer):
         except Exception as e:
             await context.abort(grpc.StatusCode.INTERNAL, str(e))
 
+    async def GetTracksBatch(self, request, context: ServicerContext):
+        try:
+            tracks, missing = await self._get_tracks_batch_uc.execute(
+                track_ids=list(request.track_ids),
+            )
+            return TrackCommands_pb2.GetTracksBatchResponse(
+                tracks=[self._convert_track_to_proto(track) for track in tracks],
+                missing_track_ids=missing
+            )
+        except ValueObjectException as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        except Exception as e:
+            await context.abort(grpc.StatusCode.INTERNAL, str(e))
+
     async def VerifyTrackExists(self, request, context: ServicerContext):
         try:
             try:
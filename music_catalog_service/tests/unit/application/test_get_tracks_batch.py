@@ -0,0 +1,76 @@
+# tests/unit/application/test_get_tracks_batch.py
+import sys
+import os
+import unittest
+from unittest.mock import AsyncMock
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from src.applications.use_cases.get_tracks import GetTracksBatchUseCase
+from src.domain.music_catalog.models import Track, ArtistInfo, Genre
+from src.core.exceptions import ValueObjectException
+
+class TestGetTracksBatchUseCase(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.mock_music_repo = AsyncMock()
+
+        self.use_case = GetTracksBatchUseCase(
+            music_repo=self.mock_music_repo,
+            max_batch_size=3
+        )
+
+        # Тестовые данные
+        self.artist = ArtistInfo(artist_id=1, name="Test Artist", is_verified=True)
+        self.genre = Genre(genre_id=1, name="Rock")
+        self.tracks = {
+            track_id: Track(
+                track_id=track_id,
+                title=f"Track {track_id}",
+                duration=300000,
+                artists=[self.artist],
+                genres=[self.genre],
+                explicit=False
+            )
+            for track_id in (1, 2, 3)
+        }
+
+    async def test_tracks_returned_in_request_order(self):
+        """Треки возвращаются в порядке запроса, а не в порядке БД"""
+        self.mock_music_repo.get_by_ids.return_value = [
+            self.tracks[1], self.tracks[2], self.tracks[3]
+        ]
+
+        tracks, missing = await self.use_case.execute([3, 1, 2])
+
+        # Один запрос к репозиторию на весь батч
+        self.mock_music_repo.get_by_ids.assert_awaited_once_with([3, 1, 2])
+        self.assertEqual([t.track_id for t in tracks], [3, 1, 2])
+        self.assertEqual(missing, [])
+
+    async def test_missing_tracks_reported(self):
+        """Ненайденные id возвращаются отдельно"""
+        self.mock_music_repo.get_by_ids.return_value = [self.tracks[2]]
+
+        tracks, missing = await self.use_case.execute([1, 2, 5])
+
+        self.assertEqual(tracks, [self.tracks[2]])
+        self.assertEqual(missing, [1, 5])
+
+    async def test_duplicate_ids_collapsed(self):
+        """Повторяющиеся id запрашиваются и возвращаются один раз"""
+        self.mock_music_repo.get_by_ids.return_value = [self.tracks[1], self.tracks[2]]
+
+        tracks, missing = await self.use_case.execute([2, 1, 2, 1])
+
+        self.mock_music_repo.get_by_ids.assert_awaited_once_with([2, 1])
+        self.assertEqual([t.track_id for t in tracks], [2, 1])
+        self.assertEqual(missing, [])
+
+    async def test_batch_too_large(self):
+        """Слишком большой батч отклоняется без похода в БД"""
+        with pytest.raises(ValueObjectException):
+            await self.use_case.execute([1, 2, 3, 4])
+
+        self.mock_music_repo.get_by_ids.assert_not_called()